@@ -0,0 +1,81 @@
+# src/article.py
+import json
+import sys
+from dataclasses import dataclass, field, fields
+
+
+@dataclass(slots=True)
+class Article:
+    """
+    パイプラインを流れる1記事分のレコード。
+    __slots__ により1記事あたりのメモリを抑え、urlを必須にすることでステージ間での欠落を防ぐ。
+    """
+
+    # RSS収集ステージで設定される項目
+    url: str
+    title: str = ""
+    summary: str = ""
+    image_url: str | None = None
+    # フィードの公開日時（UTC、ISO 8601形式）。フィードに含まれない場合はNone
+    published: str | None = None
+    # 翻訳・要約ステージの結果
+    points: list = field(default_factory=list)
+    comment: str = ""
+    # カテゴリ分類ステージの結果（同じ文字列を共有するためinternする）
+    category: str | None = None
+
+    def __setattr__(self, name, value):
+        if name == "category" and value is not None:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+
+    # 既存のシンク（Notion/Slack）は辞書形式で記事を読むため、読み取り用の互換アクセスを提供する
+    def __getitem__(self, key: str):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        """辞書のgetと同様に値を返す。未設定(None)の場合はdefaultを返す。"""
+        if key not in _FIELD_NAMES:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        """チェックポイント保存用の辞書に変換する。"""
+        return {name: getattr(self, name) for name in _FIELD_NAMES}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Article":
+        """辞書から記事を生成する。urlがない場合はKeyErrorを送出する。"""
+        values = {name: data[name] for name in _FIELD_NAMES if name in data}
+        values["url"] = data["url"]
+        if values.get("points") is None:
+            values["points"] = []
+        return cls(**values)
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Article))
+
+
+def as_article(obj) -> Article:
+    """Articleまたは辞書を受け取り、Articleとして返す。"""
+    if isinstance(obj, Article):
+        return obj
+    return Article.from_dict(obj)
+
+
+def save_articles(path: str, articles: list):
+    """記事のリストをJSON Lines形式のチェックポイントとして保存する。"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(
+            json.dumps(article.to_dict(), ensure_ascii=False) + "\n"
+            for article in articles
+        )
+
+
+def load_articles(path: str) -> list:
+    """save_articles で保存したチェックポイントから記事のリストを復元する。"""
+    with open(path, encoding="utf-8") as f:
+        return [Article.from_dict(json.loads(line)) for line in f if line.strip()]
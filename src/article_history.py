@@ -0,0 +1,226 @@
+# src/article_history.py
+import bisect
+import importlib
+import os
+from datetime import date, timedelta
+
+from . import local_cache
+from .lazy_modules import lazy_import
+from .search_index import fnv1a, tokenize
+from .utils import remove_html_tags
+
+np = lazy_import("numpy")
+
+# 配信した記事の履歴の保存先（キャッシュディレクトリ内の相対パス）
+HISTORY_DIR = "article_history"
+EMBEDDINGS_NAME = os.path.join(HISTORY_DIR, "embeddings.f32")
+ID_TABLE_NAME = os.path.join(HISTORY_DIR, "ids.json")
+# ハッシュトリックの埋め込みの次元数
+HASHING_DIMENSIONS = 1024
+# 配信済みの記事とのコサイン類似度がこの値以上の候補は除外する（NOVELTY_THRESHOLD で変更可能）
+DEFAULT_NOVELTY_THRESHOLD = 0.85
+# 類似度を比較する配信済みの記事の期間（日、NOVELTY_WINDOW_DAYS で変更可能）。
+# これより古い記事は履歴から取り除く
+DEFAULT_NOVELTY_WINDOW_DAYS = 14
+
+
+def normalize_rows(matrix):
+    """行ベクトルをL2ノルムで正規化する（ゼロベクトルはそのまま）。"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class HashingEmbedder:
+    """
+    ハッシュトリックによる埋め込み。検索インデックスと同じ分割のトークンをFNV-1aで次元に
+    割り当てて符号付きで加算し、正規化する。モデルやネットワークを使わず、常に同じ結果になる。
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = HASHING_DIMENSIONS):
+        self.dim = dim
+
+    def embed(self, texts: list):
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = fnv1a(token)
+                rows.append(row)
+                columns.append(digest % self.dim)
+                signs.append(1.0 if digest >> 31 else -1.0)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (rows, columns), signs)
+        return normalize_rows(matrix)
+
+
+# EMBEDDING_BACKEND で名前を指定できる埋め込み
+EMBEDDING_BACKENDS = {"hashing": HashingEmbedder}
+
+
+def load_embedder():
+    """
+    EMBEDDING_BACKEND の埋め込みを返す。EMBEDDING_BACKENDS の名前、または
+    "パッケージ.モジュール:ファクトリ" を指定する。埋め込みは name・dim 属性と、
+    テキストの一覧を (件数, dim) のfloat32の正規化済み行列に変換する embed を持つ。
+    """
+    backend = os.environ.get("EMBEDDING_BACKEND", "hashing")
+    if backend in EMBEDDING_BACKENDS:
+        return EMBEDDING_BACKENDS[backend]()
+    module_name, _, factory = backend.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+def article_text(article) -> str:
+    return remove_html_tags(f"{article.title} {article.summary}")
+
+
+class ArticleHistory:
+    """
+    配信した記事の履歴。埋め込みはfloat32の行列としてファイルに追記してメモリマップで読み、
+    行と同じ順序のIDテーブル（URL・タイトル・カテゴリ・配信日）をJSONで保存する。行は配信日の順に
+    並ぶため、直近の期間の記事は行列の末尾の連続した範囲になり、候補との類似度は
+    1回の行列積で計算できる。
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        threshold: float = DEFAULT_NOVELTY_THRESHOLD,
+        window_days: int = DEFAULT_NOVELTY_WINDOW_DAYS,
+    ):
+        self.embedder = embedder or load_embedder()
+        self.threshold = threshold
+        self.window_days = window_days
+        table = local_cache.load_json(ID_TABLE_NAME, {})
+        if (table.get("backend"), table.get("dim")) != (
+            self.embedder.name,
+            self.embedder.dim,
+        ):
+            # 異なる埋め込みで作った履歴とは比較できないため、空の履歴から始める
+            table = {
+                "backend": self.embedder.name,
+                "dim": self.embedder.dim,
+                "rows": [],
+            }
+        self.table = table
+        # 今回の候補の埋め込み（配信した記事を履歴に追加する際に再利用する）
+        self._candidates = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            threshold=float(
+                os.environ.get("NOVELTY_THRESHOLD", DEFAULT_NOVELTY_THRESHOLD)
+            ),
+            window_days=int(
+                os.environ.get("NOVELTY_WINDOW_DAYS", DEFAULT_NOVELTY_WINDOW_DAYS)
+            ),
+        )
+
+    @property
+    def rows(self) -> list:
+        return self.table["rows"]
+
+    def _since(self, today: date) -> str:
+        return (today - timedelta(days=self.window_days)).isoformat()
+
+    def _start(self, since: str) -> int:
+        return bisect.bisect_left(self.rows, since, key=lambda row: row["date"])
+
+    def matrix(self):
+        """履歴の埋め込み行列（読み取り専用のメモリマップ）を返す。"""
+        if not self.rows:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        try:
+            return np.memmap(
+                local_cache.cache_path(EMBEDDINGS_NAME),
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self.rows), self.embedder.dim),
+            )
+        except (OSError, ValueError):
+            # 埋め込みのファイルが欠けている場合は、履歴がないものとして扱う
+            self.table["rows"] = []
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+
+    def filter_novel(self, articles: list, today: date) -> tuple:
+        """
+        直近の期間に配信した記事と似ている候補を除外し、(残した記事, 除外した記事と
+        類似度・似ている配信済みの記事のタイトルの一覧) を返す。
+        """
+        if not articles:
+            return articles, []
+        vectors = self.embedder.embed([article_text(a) for a in articles])
+        self._candidates = {a.url: vector for a, vector in zip(articles, vectors)}
+        history = self.matrix()[self._start(self._since(today)) :]
+        if self.threshold <= 0 or len(history) == 0:
+            return articles, []
+
+        similarities = vectors @ np.asarray(history).T
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(articles)), best]
+        offset = len(self.rows) - len(history)
+        kept, dropped = [], []
+        for article, score, index in zip(articles, scores.tolist(), best.tolist()):
+            if score >= self.threshold:
+                dropped.append((article, score, self.rows[offset + index]["title"]))
+            else:
+                kept.append(article)
+        return kept, dropped
+
+    def embed_articles(self, articles: list):
+        """記事の埋め込み行列を返す。今回の候補として計算済みの埋め込みは再利用する。"""
+        missing = [a for a in articles if a.url not in self._candidates]
+        if missing:
+            embedded = self.embedder.embed([article_text(a) for a in missing])
+            self._candidates.update(zip((a.url for a in missing), embedded))
+        return np.asarray(
+            [self._candidates[a.url] for a in articles], dtype=np.float32
+        ).reshape(-1, self.embedder.dim)
+
+    def category_matrix(self, category: str, today: date):
+        """直近の期間に配信した、指定したカテゴリの記事の埋め込み行列を返す。"""
+        indices = [
+            index
+            for index in range(self._start(self._since(today)), len(self.rows))
+            if self.rows[index].get("category") == category
+        ]
+        if not indices:
+            return np.zeros((0, self.embedder.dim), dtype=np.float32)
+        return np.asarray(self.matrix()[indices])
+
+    def record(self, articles: list, report_date: str):
+        """配信した記事を履歴に追加し、比較する期間より古い記事を取り除く。"""
+        known = {row["url"] for row in self.rows}
+        articles = [a for a in articles if a.url not in known]
+        new_vectors = self.embed_articles(articles)
+
+        start = self._start(self._since(date.fromisoformat(report_date)))
+        path = local_cache.cache_path(EMBEDDINGS_NAME)
+        local_cache.ensure_parent_dir(path)
+        if start > 0:
+            # 古い行を取り除くため、残す行と新しい行で書き直す
+            kept = np.asarray(self.matrix()[start:])
+            tmp_path = f"{path}.tmp"
+            np.concatenate([kept, new_vectors]).tofile(tmp_path)
+            os.replace(tmp_path, path)
+            del self.rows[:start]
+        elif len(new_vectors):
+            # IDテーブルの行数の位置から書き込み、保存が中断された場合の余分な行を上書きする
+            mode = "r+b" if os.path.exists(path) else "wb"
+            with open(path, mode) as f:
+                f.seek(len(self.rows) * self.embedder.dim * 4)
+                new_vectors.tofile(f)
+                f.truncate()
+        self.rows.extend(
+            {
+                "url": a.url,
+                "title": a.title,
+                "category": a.category,
+                "date": report_date,
+            }
+            for a in articles
+        )
+        local_cache.save_json(ID_TABLE_NAME, self.table)
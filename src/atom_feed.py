@@ -0,0 +1,204 @@
+# src/atom_feed.py
+import hashlib
+import html
+import json
+import os
+import uuid
+from datetime import UTC, datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from .report_model import REPORT_TITLE, Report
+
+# 静的サイト内のフィードの保存先と、フィードの状態（エントリ）の保存先
+FEEDS_DIR = "feeds"
+FEED_STATE_DIR = os.path.join("_data", "feeds")
+# フィードに載せる最新のエントリ数（レポートのフィードはレポート数、カテゴリのフィードは記事数）
+MAX_REPORT_ENTRIES = 20
+MAX_CATEGORY_ENTRIES = 50
+
+
+def entry_id(key: str) -> str:
+    """エントリの恒久的なID。同じレポート・記事は何度生成しても同じIDになる。"""
+    return f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, key)}"
+
+
+def _timestamp(now: datetime) -> str:
+    return now.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _report_content(report: Report, closing_comment: str) -> str:
+    parts = []
+    for category in report.categories:
+        parts.append(f"<h2>{html.escape(category.name)}</h2><ul>")
+        for article in category.articles:
+            parts.append(
+                f'<li><a href="{html.escape(article.url)}">{html.escape(article.title)}</a>'
+                f" - {html.escape(article.summary)}</li>"
+            )
+        parts.append("</ul>")
+    if closing_comment:
+        parts.append(f"<p>{html.escape(closing_comment)}</p>")
+    return "".join(parts)
+
+
+def _article_content(article) -> str:
+    points = "".join(f"<li>{html.escape(p)}</li>" for p in article.points)
+    return f"<p>{html.escape(article.summary)}</p>" + (
+        f"<ul>{points}</ul>" if points else ""
+    )
+
+
+class FeedWriter:
+    """
+    レポートのAtomフィードと、カテゴリごとのAtomフィードを生成する。
+    エントリはフィードごとの状態ファイルに保存し、新しいエントリを先頭に追加して
+    件数の上限で切り詰めるため、過去のレポートを読み直さずに更新できる。
+    エントリのIDは固定で、内容が変わらない限り updated も変わらないため、
+    フィードの内容（と静的ホスティングのETag・Last-Modified）は変化がある場合のみ変わる。
+    """
+
+    def __init__(self, root: str, base_url: str | None = None):
+        self.root = root
+        base_url = base_url if base_url is not None else os.environ.get("SITE_BASE_URL")
+        # SITE_BASE_URL がない場合は、フィード（feeds/）からの相対URLにする
+        self.base_url = base_url.rstrip("/") + "/" if base_url else "../"
+
+    def _state_path(self, name: str) -> str:
+        return os.path.join(self.root, FEED_STATE_DIR, f"{name}.json")
+
+    def _load(self, name: str) -> list:
+        try:
+            with open(self._state_path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def _save(self, name: str, entries: list):
+        path = self._state_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _update(
+        self, name: str, date: str, new_entries: list, max_entries: int, now: str
+    ) -> list:
+        """
+        同じレポート日付のエントリを new_entries で置き換え、日付の新しい順に並べて保存する。
+        内容が変わらないエントリは以前の updated を、再生成したエントリは published を引き継ぐ。
+        """
+        previous = {}
+        entries = []
+        for entry in self._load(name):
+            if entry["date"] == date:
+                previous[entry["id"]] = entry
+            else:
+                entries.append(entry)
+        for entry in new_entries:
+            entry["hash"] = hashlib.sha256(
+                json.dumps(entry, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            old = previous.get(entry["id"])
+            entry["published"] = old["published"] if old else now
+            entry["updated"] = (
+                old["updated"] if old and old["hash"] == entry["hash"] else now
+            )
+        # 新しいレポートのエントリは先頭に入り、再生成の場合は元の位置に戻る
+        entries = sorted(
+            [*new_entries, *entries], key=lambda e: e["date"], reverse=True
+        )
+        entries = entries[:max_entries]
+        self._save(name, entries)
+        return entries
+
+    def add_report(
+        self,
+        report: Report,
+        closing_comment: str,
+        category_slugs: dict,
+        now: datetime | None = None,
+    ) -> dict:
+        """
+        レポートをフィードに追加し、{サイト内のパス: フィードのXML} を返す。
+        category_slugs には今回のカテゴリに加え、同じ日付の以前のレポートにあった
+        カテゴリも含める（消えたカテゴリのフィードから記事を取り除くため）。
+        """
+        now = _timestamp(now or datetime.now(UTC))
+        date = report.report_date
+        report_url = f"{self.base_url}reports/{date}.html"
+        entries = self._update(
+            "reports",
+            date,
+            [
+                {
+                    "id": entry_id(f"report:{date}"),
+                    "date": date,
+                    "title": report.title,
+                    "link": report_url,
+                    "content": _report_content(report, closing_comment),
+                }
+            ],
+            MAX_REPORT_ENTRIES,
+            now,
+        )
+        feeds = {
+            f"{FEEDS_DIR}/atom.xml": self._render(
+                REPORT_TITLE, "atom.xml", entry_id("feed:reports"), entries
+            )
+        }
+
+        categories = {category.name: category for category in report.categories}
+        for name, slug in category_slugs.items():
+            category = categories.get(name)
+            articles = category.articles if category is not None else ()
+            entries = self._update(
+                f"categories/{slug}",
+                date,
+                [
+                    {
+                        "id": entry_id(f"article:{date}:{article.url}"),
+                        "date": date,
+                        "title": article.title,
+                        "link": article.url,
+                        "content": _article_content(article),
+                    }
+                    for article in articles
+                ],
+                MAX_CATEGORY_ENTRIES,
+                now,
+            )
+            feeds[f"{FEEDS_DIR}/{slug}.xml"] = self._render(
+                f"{REPORT_TITLE} - {name}",
+                f"{slug}.xml",
+                entry_id(f"feed:category:{slug}"),
+                entries,
+            )
+        return feeds
+
+    def _render(self, title: str, file_name: str, feed_id: str, entries: list) -> str:
+        # エントリがない場合も、フィードの更新日時が生成のたびに変わらないよう固定する
+        updated = max((e["updated"] for e in entries), default="1970-01-01T00:00:00Z")
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f"<id>{feed_id}</id>",
+            f"<title>{escape(title)}</title>",
+            f"<updated>{updated}</updated>",
+            f'<link rel="self" href={quoteattr(f"{self.base_url}{FEEDS_DIR}/{file_name}")}/>',
+            f'<link rel="alternate" href={quoteattr(f"{self.base_url}index.html")}/>',
+            f"<author><name>{escape(REPORT_TITLE)}</name></author>",
+        ]
+        for entry in entries:
+            lines += [
+                "<entry>",
+                f"<id>{entry['id']}</id>",
+                f"<title>{escape(entry['title'])}</title>",
+                f'<link rel="alternate" href={quoteattr(entry["link"])}/>',
+                f"<published>{entry['published']}</published>",
+                f"<updated>{entry['updated']}</updated>",
+                f'<content type="html">{escape(entry["content"])}</content>',
+                "</entry>",
+            ]
+        lines.append("</feed>")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,70 @@
+# src/deadline.py
+import math
+import os
+import time
+from datetime import datetime, timedelta
+
+from .run_summary import run_summary
+
+# 各ステージを実行するために必要な残り時間（秒）。
+# 残り時間がこれを下回ると、優先度の低い処理から順に縮退させる。
+STAGE_RESERVES = {
+    "enrich": 240,  # 記事の翻訳・要約（残りの選定と配信の時間を確保する）
+    "select": 120,  # LLMによる選定（不足時はローカルで選定する）
+    "images": 150,  # 画像キーワード生成とUnsplash検索
+    "closing_comment": 60,  # LLMによるクロージングコメント（不足時は定型文）
+}
+
+
+class RunDeadline:
+    """実行全体の締め切り。各ステージは allows() で残り時間を確認してから処理を行う。"""
+
+    def __init__(self, budget_seconds: float, clock=time.monotonic):
+        self._clock = clock
+        self._deadline = clock() + budget_seconds
+
+    @classmethod
+    def from_env(cls, now: datetime | None = None) -> "RunDeadline":
+        """
+        RUN_TIME_BUDGET_MINUTES（実行時間の上限）と RUN_DEADLINE（"HH:MM"、ローカル時刻）から
+        締め切りを決める。両方指定された場合は早い方を採用し、どちらもなければ締め切りはない。
+        開始時点ですでに過ぎている RUN_DEADLINE（同じ日の手動の再実行など）は無視する。
+        """
+        budget = math.inf
+        budget_minutes = os.environ.get("RUN_TIME_BUDGET_MINUTES")
+        if budget_minutes:
+            budget = float(budget_minutes) * 60
+        deadline_at = os.environ.get("RUN_DEADLINE")
+        if deadline_at:
+            until_deadline = seconds_until(deadline_at, now or datetime.now())
+            if until_deadline > 0:
+                budget = min(budget, until_deadline)
+            else:
+                print(
+                    f"締め切り時刻 {deadline_at} を過ぎて開始したため、締め切りを適用しません。"
+                )
+        return cls(budget)
+
+    def remaining(self) -> float:
+        return self._deadline - self._clock()
+
+    def allows(self, stage: str) -> bool:
+        """ステージを実行するのに十分な残り時間があるかを返す。"""
+        return self.remaining() >= STAGE_RESERVES[stage]
+
+    def degrade(self, stage: str, reason: str):
+        """縮退した処理を記録し、実行サマリーに出力されるようにする。"""
+        print(f"  - 締め切りが近いため縮退します [{stage}]: {reason}")
+        run_summary.add_degradation(stage, reason)
+
+
+def seconds_until(deadline_at: str, now: datetime) -> float:
+    """
+    "HH:MM" 形式の時刻までの秒数を返す。
+    12時間以上前の時刻は翌日の締め切りとみなす（手動実行など）。
+    """
+    hour, minute = (int(part) for part in deadline_at.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target < now - timedelta(hours=12):
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
@@ -0,0 +1,99 @@
+# src/fast_atom.py
+import io
+import re
+import xml.etree.ElementTree as ET
+from datetime import UTC, datetime
+
+# Googleアラートのフィード（Atom）の要素名
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ENTRY = f"{_ATOM}entry"
+_TITLE = f"{_ATOM}title"
+_LINK = f"{_ATOM}link"
+_SUMMARY = f"{_ATOM}summary"
+_CONTENT = f"{_ATOM}content"
+_PUBLISHED = f"{_ATOM}published"
+_UPDATED = f"{_ATOM}updated"
+_ATOM_NAMESPACE = b'"http://www.w3.org/2005/Atom"'
+
+# ルート要素の判定に読む先頭のバイト数と、XML宣言・コメントの後の最初の要素名
+SNIFF_BYTES = 2048
+_ROOT_PATTERN = re.compile(rb"<(?![?!])([A-Za-z_][\w.-]*)")
+
+
+def is_atom_feed(content: bytes) -> bool:
+    """ルート要素が名前空間付きの <feed>（Atom）かを、先頭のバイト列だけで判定する。"""
+    if not isinstance(content, bytes):
+        return False
+    head = content[:SNIFF_BYTES]
+    match = _ROOT_PATTERN.search(head)
+    return match is not None and match.group(1) == b"feed" and _ATOM_NAMESPACE in head
+
+
+def _iso_utc(text: str | None) -> str | None:
+    """RFC 3339の日時をUTCのISO 8601形式（秒まで）に変換する。"""
+    if not text:
+        return None
+    text = text.strip()
+    # Googleアラートの日時はすでにこの形式のため、変換せずにそのまま返す
+    if len(text) == 20 and text.endswith("Z") and text[10] == "T":
+        return text
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _text(element) -> str:
+    # type="xhtml" の場合は子要素にテキストが入る
+    if len(element):
+        return "".join(element.itertext())
+    return element.text or ""
+
+
+def _entry(element) -> tuple:
+    title = link = summary = content = published = updated = None
+    for child in element:
+        tag = child.tag
+        if tag == _TITLE:
+            title = _text(child)
+        elif tag == _LINK:
+            if link is None and child.get("rel", "alternate") == "alternate":
+                link = child.get("href")
+        elif tag == _SUMMARY:
+            summary = _text(child)
+        elif tag == _CONTENT:
+            content = _text(child)
+        elif tag == _PUBLISHED:
+            published = child.text
+        elif tag == _UPDATED:
+            updated = child.text
+    return (
+        title if title is not None else "タイトルなし",
+        link or "#",
+        summary if summary is not None else content or "",
+        _iso_utc(published) or _iso_utc(updated),
+    )
+
+
+def parse_atom(content: bytes) -> list | None:
+    """
+    Atomフィードを逐次パースし、エントリごとの (title, link, summary, published) を返す。
+    title・summary はfeedparserと同じく、type="html" の場合もタグを含むHTMLのまま返す。
+    Atom以外のフィードや、XMLとして読めないフィードの場合は None を返す
+    （呼び出し側でfeedparserにフォールバックする）。
+    """
+    if not is_atom_feed(content):
+        return None
+    entries = []
+    try:
+        for _, element in ET.iterparse(io.BytesIO(content), events=("end",)):
+            if element.tag == _ENTRY:
+                entries.append(_entry(element))
+                # 処理済みのエントリを解放し、大きなフィードでもメモリを増やさない
+                element.clear()
+    except (ET.ParseError, ValueError, LookupError):
+        return None
+    return entries
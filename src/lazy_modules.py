@@ -0,0 +1,24 @@
+# src/lazy_modules.py
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    モジュールを遅延読み込みする。属性に初めてアクセスした時点で実際にimportされる。
+    起動時に重いSDK（google.generativeai、feedparserなど）を読み込まないために使用する。
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent_name, _, child_name = name.rpartition(".")
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+    return module
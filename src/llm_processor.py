@@ -1,13 +1,17 @@
 # llm_processor.py
 # llm_processor.py
-import os
-import google.generativeai as genai
+import functools
 import json
-import requests  # 追加
-from langdetect import detect, DetectorFactory
+import os
+
+from .article import as_article
+from .lazy_modules import lazy_import
+
+# 起動を速くするため、重いSDKは実際に使用する時点で読み込む
+genai = lazy_import("google.generativeai")
 
-# langdetectの決定論的モードを有効にする
-DetectorFactory.seed = 0
+# LLMでクロージングコメントを生成できない（または生成しない）場合の定型文
+FALLBACK_CLOSING_COMMENT = "今日のAIニュースレポートはいかがでしたか？ぜひコミュニティで感想や意見を共有し、議論を深めましょう！"
 
 
 def initialize_gemini():
@@ -26,6 +30,21 @@ def list_available_gemini_models():
             print(f"  {m.name}")
 
 
+@functools.cache
+def _load_langdetect():
+    from langdetect import DetectorFactory
+    from langdetect import detect as langdetect_detect
+
+    # langdetectの決定論的モードを有効にする（言語プロファイルは初回のdetect時に読み込まれる）
+    DetectorFactory.seed = 0
+    return langdetect_detect
+
+
+def detect(text: str) -> str:
+    """langdetectで言語コードを判定する。"""
+    return _load_langdetect()(text)
+
+
 def is_foreign_language(text: str) -> bool:
     """
     langdetectを使用してテキストが日本語以外であるかを判定する。
@@ -130,11 +149,12 @@ def select_and_summarize_articles_with_gemini(articles: list, categories: list)
     Gemini-2.5-flashを使用して、カテゴリごとに記事を選定し、最大3記事に絞り込み、
     初学者向けのポイントと会話を促すコメントを生成する。
     """
+    articles = [as_article(article) for article in articles]
     selected_articles = []
     model = genai.GenerativeModel("models/gemini-2.5-flash")
 
     for category in categories:
-        category_articles = [a for a in articles if a.get("category") == category]
+        category_articles = [a for a in articles if a.category == category]
         if not category_articles:
             continue
 
@@ -142,7 +162,9 @@ def select_and_summarize_articles_with_gemini(articles: list, categories: list)
         # ここでは、LLMに選定を依頼するプロンプトを作成
         articles_info = ""
         for i, article in enumerate(category_articles):
-            articles_info += f"記事{i + 1} - タイトル: {article['title']}, 要約: {article['summary']}\n"
+            articles_info += (
+                f"記事{i + 1} - タイトル: {article.title}, 要約: {article.summary}\n"
+            )
 
         prompt = f"""以下の{category}カテゴリの記事の中から、データサイエンス、データエンジニアリング、データ分析の学習者にとって最も有用で、会話のきっかけになりそうな記事を最大3つ選んでください。
 記事の選定基準としてIT、エンジニアリングの分野であること、初学者にとって理解しやすい内容であること、実用的な情報が含まれていることを考慮してください。
@@ -185,22 +207,27 @@ def select_and_summarize_articles_with_gemini(articles: list, categories: list)
 
             selected_json = json.loads(json_str)
             for selected_item in selected_json:
-                # 元の記事からURLを取得し、選定された記事情報に追加
+                # LLMの出力を元の記事に対応付け、選定結果（ポイントなど）を元の記事に書き込む
                 original_article = next(
                     (
                         a
                         for a in category_articles
-                        if a["title"] == selected_item["title"]
+                        if a.title == selected_item.get("title")
                     ),
                     None,
                 )
-                if original_article:
-                    selected_item["url"] = original_article["url"]
-                    selected_articles.append(selected_item)
-                else:
+                if original_article is None:
                     print(
-                        f"警告: 選定された記事 '{selected_item['title']}' の元のURLが見つかりませんでした。"
+                        f"警告: 選定された記事 '{selected_item.get('title')}' の元のURLが見つかりませんでした。"
                     )
+                    continue
+                if any(a is original_article for a in selected_articles):
+                    continue
+                if selected_item.get("summary"):
+                    original_article.summary = selected_item["summary"]
+                if selected_item.get("points"):
+                    original_article.points = selected_item["points"]
+                selected_articles.append(original_article)
         except json.JSONDecodeError as e:
             print(
                 f"Gemini APIからのJSON応答のパース中にエラーが発生しました: {e}. 応答: {response_text[:200]}..."
@@ -230,52 +257,6 @@ def generate_image_keywords_with_gemini(title: str, summary: str, category: str)
         return ""
 
 
-def search_image_from_unsplash(keywords: str) -> str | None:
-    """
-    Unsplash APIを使用して、キーワードに基づいて画像を検索し、画像URLを返す。
-    """
-    unsplash_access_key = os.environ.get("UNSPLASH_ACCESS_KEY")
-    if not unsplash_access_key:
-        print(
-            "警告: UNSPLASH_ACCESS_KEY 環境変数が設定されていません。Unsplashからの画像検索をスキップします。"
-        )
-        return None
-
-    if not keywords:
-        return None
-
-    try:
-        headers = {"Authorization": f"Client-ID {unsplash_access_key}"}
-        params = {
-            "query": keywords,
-            "orientation": "landscape",  # 横長の画像を優先
-            "per_page": 1,
-        }
-        response = requests.get(
-            "https://api.unsplash.com/search/photos",
-            headers=headers,
-            params=params,
-            timeout=5,
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        if data and data["results"]:
-            # 最初の結果のregularサイズの画像URLを返す
-            return data["results"][0]["urls"]["regular"]
-        else:
-            print(
-                f"Unsplashでキーワード '{keywords}' に一致する画像が見つかりませんでした。"
-            )
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Unsplash API呼び出し中にエラーが発生しました: {e}")
-        return None
-    except Exception as e:
-        print(f"Unsplashからの画像検索中に予期せぬエラーが発生しました: {e}")
-        return None
-
-
 def generate_closing_comment_with_gemini(articles: list) -> str:
     """
     Gemini-2.5-flashを使用して、選定された記事のリストに基づいて、
@@ -299,4 +280,4 @@ def generate_closing_comment_with_gemini(articles: list) -> str:
         print(
             f"Gemini API呼び出し中にクロージングコメント生成エラーが発生しました: {e}"
         )
-        return "今日のAIニュースレポートはいかがでしたか？ぜひコミュニティで感想や意見を共有し、議論を深めましょう！"  # フォールバックコメント
+        return FALLBACK_CLOSING_COMMENT
@@ -0,0 +1,47 @@
+# src/local_cache.py
+import json
+import os
+
+# 実行間で引き継ぐ状態の保存先（GitHub Actionsでは actions/cache で復元する）
+DEFAULT_CACHE_DIR = ".cache"
+
+
+def cache_dir() -> str:
+    """キャッシュディレクトリのパスを返す。CACHE_DIR 環境変数で変更できる。"""
+    return os.environ.get("CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(cache_dir(), name)
+
+
+def load_json(name: str, default=None):
+    """キャッシュからJSONを読み込む。存在しない・壊れている場合はdefaultを返す。"""
+    try:
+        with open(cache_path(name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def ensure_parent_dir(path: str):
+    """ファイルを保存するディレクトリを作成する。"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+
+def save_json(name: str, data):
+    """JSONをキャッシュに保存する。書き込み途中で中断しても壊れないよう置き換えで保存する。"""
+    path = cache_path(name)
+    ensure_parent_dir(path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def remove(name: str):
+    """キャッシュを削除する。存在しない場合は何もしない。"""
+    try:
+        os.remove(cache_path(name))
+    except FileNotFoundError:
+        pass
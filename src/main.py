@@ -1,15 +1,30 @@
+import argparse
+import functools
+import itertools
 import os
-from datetime import datetime
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 from dotenv import load_dotenv
 
 # 他のスクリプトから関数をインポート
-from .rss_single_fetch import fetch_all_entries
+from . import local_cache
+from .article import as_article
+from .article_history import ArticleHistory
+from .deadline import RunDeadline
+from .lazy_modules import lazy_import
+from .rss_single_fetch import fetch_all_entries, select_recent_entries
 from .write_to_notion import (
+    create_notion_client,
     create_notion_report_page,
     ensure_notion_database_properties,
+    expected_article_properties_config,
 )
-from notion_client import Client
+from .notion_articles import upsert_article_rows
 from .llm_processor import (
+    FALLBACK_CLOSING_COMMENT,
     initialize_gemini,
     translate_and_summarize_with_gemini,
     is_foreign_language,
@@ -17,193 +32,693 @@ from .llm_processor import (
     select_and_summarize_articles_with_gemini,
     generate_closing_comment_with_gemini,
     generate_image_keywords_with_gemini,
-    search_image_from_unsplash,
 )
-from .send_slack_message import send_slack_message
-from .utils import remove_html_tags
+from .outbox import DeliveryError, Outbox, drain
+from .preselect import preselect_for_prompt
+from .prioritize import prioritize_articles
+from .profiling import create_profiler
+from .run_summary import reset_run_summary, run_summary
+from .report_model import build_report
+from .send_slack_message import (
+    load_slack_targets,
+    render_slack_groups,
+    send_slack_message,
+)
+from .unsplash import search_image_from_unsplash
+from .utils import clean_article_texts, remove_html_tags
+
+asyncio = lazy_import("asyncio")
 
 load_dotenv()  # .envファイルを読み込む
 
+# 締め切りが近い場合でも、選定と配信ができるように最低限要約する記事数
+MIN_ENRICHED_ARTICLES = 6
+# LLMを使わずに選定する場合の、カテゴリごとの最大記事数
+MAX_ARTICLES_PER_CATEGORY = 3
+# 配信に失敗した項目を、実行中に再試行し続ける最大秒数（OUTBOX_DRAIN_SECONDS で変更可能）
+OUTBOX_DRAIN_SECONDS = 60
+# --flush-outbox で再配信を試みる最大秒数
+FLUSH_OUTBOX_SECONDS = 10
+# 画像を取得する記事の範囲（IMAGE_FETCH_MODE で変更可能）と、画像を並行に取得する記事数
+DEFAULT_IMAGE_FETCH_MODE = "displayed"
+IMAGE_FETCH_CONCURRENCY = 4
+# 前回成功した実行の収集開始日時の保存先（この日時より後に公開された記事のみを収集する）
+LAST_COLLECTION_NAME = "last_collection.json"
+# 前回の実行の記録がない場合に収集する期間（時間）。月・水・金の実行間隔の最大に合わせる
+DEFAULT_COLLECT_WINDOW_HOURS = 72
 
-def main():
-    # 現在のレポート日付を環境変数として設定
-    os.environ["REPORT_DATE"] = datetime.now().strftime("%Y-%m-%d")
+CATEGORIES = [
+    "データサイエンス",
+    "データエンジニアリング",
+    "データ分析",
+    "人工知能",
+    "プログラミング",
+    "パフォーマンス最適化",
+]
 
-    # Gemini APIの初期化
-    try:
-        initialize_gemini()
-    except ValueError as e:
-        print(f"エラー: Gemini APIの初期化に失敗しました - {e}")
-        return
 
-    print(f"[{datetime.now()}] --- 1. AIニュースの収集 開始 ---")  # 追加
-    # 1. AIニュースの収集
-    # GoogleアラートのRSSフィードのURLを環境変数から取得
-    google_alerts_rss_urls_str = os.environ.get("GOOGLE_ALERTS_RSS_URLS")
-    if not google_alerts_rss_urls_str:
-        print(
-            "エラー: GOOGLE_ALERTS_RSS_URLS 環境変数が設定されていません。GoogleアラートのRSSフィードURLを設定してください。"
-        )
-        return
-    rss_feed_urls = [
-        url.strip() for url in google_alerts_rss_urls_str.split(",") if url.strip()
-    ]
+def parse_args(argv=None):
+    """コマンドライン引数を解析する。"""
+    parser = argparse.ArgumentParser(
+        description="AIニュースレポートを生成し、NotionとSlackに配信します。"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="各ステージをcProfileとtracemallocで計測し、結果を実行ディレクトリに出力します。",
+    )
+    parser.add_argument(
+        "--run-dir",
+        default=None,
+        help="プロファイル結果などの出力先ディレクトリ（既定: runs/YYYYmmdd-HHMMSS）",
+    )
+    parser.add_argument(
+        "--flush-outbox",
+        action="store_true",
+        help="フィードの収集やGeminiを使わずに、未配信のSlack通知・Notionレポートを再配信します。",
+    )
+    return parser.parse_args(argv)
 
+
+def _iso_utc(moment: datetime) -> str:
+    return moment.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def collection_since(now: datetime) -> str:
+    """
+    収集する記事の公開日時の下限を返す。COLLECT_WINDOW_HOURS が設定されている場合は
+    その期間、設定されていない場合は前回成功した実行の収集開始日時
+    （記録がない場合は DEFAULT_COLLECT_WINDOW_HOURS）を使う。
+    """
+    window_hours = float(os.environ.get("COLLECT_WINDOW_HOURS", "0"))
+    if window_hours <= 0:
+        last_collection = local_cache.load_json(LAST_COLLECTION_NAME, {})
+        if last_collection.get("started_at"):
+            return last_collection["started_at"]
+        window_hours = DEFAULT_COLLECT_WINDOW_HOURS
+    return _iso_utc(now - timedelta(hours=window_hours))
+
+
+def record_successful_collection(started_at: str):
+    """レポートを配信できた実行の収集開始日時を、次回の収集の下限として保存する。"""
+    local_cache.save_json(LAST_COLLECTION_NAME, {"started_at": started_at})
+
+
+def collect_articles(rss_feed_urls: list, since: str | None = None) -> list:
+    """
+    RSSフィードから since より後に公開された記事を収集し、タイトルからHTMLタグを
+    まとめて除去する。MAX_ENTRIES_PER_FEED が設定されている場合は、フィードごとに
+    新しい記事からその件数までに絞る。除外した件数はLLMの処理の前に出力する。
+    """
+    max_entries = int(os.environ.get("MAX_ENTRIES_PER_FEED", "0"))
     all_articles = []
+    dropped_old = dropped_over_cap = 0
     for url in rss_feed_urls:
         print(f"Fetching articles from: {url}")
-        articles = fetch_all_entries(url)
+        articles = [as_article(article) for article in fetch_all_entries(url)]
+        articles, too_old, over_cap = select_recent_entries(
+            articles, since, max_entries
+        )
+        dropped_old += too_old
+        dropped_over_cap += over_cap
         all_articles.extend(articles)
 
-    if not all_articles:
-        print("No articles fetched. Exiting.")
-        return
-    print(f"[{datetime.now()}] --- 1. AIニュースの収集 終了 ---")
-
+    if dropped_old:
+        run_summary.incr("feed_entries_dropped_old", dropped_old)
+    if dropped_over_cap:
+        run_summary.incr("feed_entries_dropped_over_cap", dropped_over_cap)
     print(
-        f"[{datetime.now()}] --- 2. ニュースの翻訳と要約、カテゴリ分類、選定 開始 ---"
+        f"収集した記事: {len(all_articles)}件"
+        f"（{since or '指定なし'}以前の公開で除外: {dropped_old}件、"
+        f"フィードごとの上限で除外: {dropped_over_cap}件）"
     )
-    # 2. ニュースの翻訳と要約、カテゴリ分類、選定
-    categories = [
-        "データサイエンス",
-        "データエンジニアリング",
-        "データ分析",
-        "人工知能",
-        "プログラミング",
-        "パフォーマンス最適化",
-    ]
+    return clean_article_texts(all_articles, fields=("title",))
 
-    processed_articles_with_llm_info = []
-    for article in all_articles:
-        # 記事タイトルからHTMLタグを除去
-        article["title"] = remove_html_tags(article["title"])
 
-        print(f"Processing article: {article['title']}")
+def _report_day():
+    return datetime.strptime(os.environ["REPORT_DATE"], "%Y-%m-%d").date()
 
-        llm_result = {"summary": article["summary"], "points": [], "comment": ""}
+
+def filter_reported_articles(all_articles: list, history: ArticleHistory) -> list:
+    """直近に配信した記事と似ている記事（別の媒体の同じニュースなど）を、LLMの処理の前に除外する。"""
+    novel_articles, dropped = history.filter_novel(all_articles, _report_day())
+    for article, similarity, reported_title in dropped:
+        print(
+            f"  - 配信済みの記事と類似のため除外: {article.title}"
+            f"（類似度 {similarity:.2f}: {reported_title}）"
+        )
+    if dropped:
+        run_summary.incr("articles_dropped_reported", len(dropped))
+    print(f"配信済みの記事と類似のため除外した記事: {len(dropped)}件")
+    return novel_articles
+
+
+def enrich_articles(all_articles: list, deadline=None) -> list:
+    """
+    各記事の翻訳・要約・ポイント生成とカテゴリ分類を行う。
+    記事はLLMを使わないスコアの高い順に処理するため、MAX_ENRICH_ARTICLES の上限や
+    締め切りによる打ち切りが発生しても、優先度の低い記事から順にスキップされる。
+    """
+    ordered_articles = prioritize_articles(all_articles, CATEGORIES)
+    max_enrich_articles = int(os.environ.get("MAX_ENRICH_ARTICLES", "0"))
+    if max_enrich_articles > 0:
+        ordered_articles = itertools.islice(ordered_articles, max_enrich_articles)
+
+    processed_articles_with_llm_info = []
+    for index, article in enumerate(ordered_articles):
+        if (
+            deadline is not None
+            and index >= MIN_ENRICHED_ARTICLES
+            and not deadline.allows("enrich")
+        ):
+            deadline.degrade(
+                "enrich",
+                f"優先度の低い残りの記事の要約・分類をスキップしました（{index}件を処理）",
+            )
+            break
+        print(f"Processing article: {article.title}")
 
         # 言語検出と翻訳・要約・ポイント・コメント生成
-        if is_foreign_language(article["summary"]):
-            print(f"  - 記事を翻訳・要約・ポイント・コメント生成中: {article['title']}")
-            llm_result = translate_and_summarize_with_gemini(article["summary"])
-            article["summary"] = remove_html_tags(llm_result["summary"])
-            article["points"] = llm_result["points"]
-            # article["comment"] = llm_result["comment"]
+        if is_foreign_language(article.summary):
+            print(f"  - 記事を翻訳・要約・ポイント・コメント生成中: {article.title}")
         else:
-            print(f"  - 記事は日本語であるため翻訳はスキップ: {article['title']}")
             # 日本語記事でもポイントとコメントを生成
-            llm_result = translate_and_summarize_with_gemini(article["summary"])
-            article["summary"] = remove_html_tags(llm_result["summary"])
-            article["points"] = llm_result["points"]
-            # article["comment"] = llm_result["comment"]
+            print(f"  - 記事は日本語であるため翻訳はスキップ: {article.title}")
+        llm_result = translate_and_summarize_with_gemini(article.summary)
+        article.summary = remove_html_tags(llm_result["summary"])
+        article.points = llm_result["points"]
+        article.comment = llm_result.get("comment", "")
 
         # カテゴリ分類
-        predicted_category = categorize_article_with_gemini(
-            article["title"], article["summary"]
+        article.category = categorize_article_with_gemini(
+            article.title, article.summary
         )
-        article["category"] = predicted_category
 
         processed_articles_with_llm_info.append(article)
+    return processed_articles_with_llm_info
+
 
+def select_articles_locally(articles: list, categories: list) -> list:
+    """LLMを使わずに、カテゴリごとに優先度の高い順（要約した順）に最大3記事を選定する。"""
+    selected_articles = []
+    for category in categories:
+        category_articles = [a for a in articles if a.category == category]
+        selected_articles.extend(category_articles[:MAX_ARTICLES_PER_CATEGORY])
+    return selected_articles
+
+
+def select_articles(articles: list, deadline=None, history=None) -> list:
+    """
+    記事を選定する。締め切りが近い場合はLLMを使わずにローカルで選定する。
+    LLMで選定する場合は、カテゴリごとに埋め込みで上位の記事に絞ってからプロンプトに載せる。
+    """
+    if deadline is not None and not deadline.allows("select"):
+        deadline.degrade("select", "LLMによる選定をスキップし、ローカルで選定しました")
+        return select_articles_locally(articles, CATEGORIES)
+    if history is not None:
+        candidates = preselect_for_prompt(articles, CATEGORIES, history, _report_day())
+        print(
+            f"LLMによる選定の候補: {len(candidates)}件（{len(articles)}件から絞り込み）"
+        )
+        articles = candidates
+    return [
+        as_article(article)
+        for article in select_and_summarize_articles_with_gemini(articles, CATEGORIES)
+    ]
+
+
+def image_target_articles(final_articles_for_report: list) -> list:
+    """
+    画像を取得する記事を返す（IMAGE_FETCH_MODE で変更可能）。
+    - displayed（既定）: シンクが表示する記事のみ。画像を表示するのはNotionレポートの
+      カバー（先頭の記事の画像）のみのため、先頭の記事
+    - all: すべての記事
+    - none: 取得しない
+    """
+    mode = os.environ.get("IMAGE_FETCH_MODE", DEFAULT_IMAGE_FETCH_MODE)
+    if mode == "all":
+        return list(final_articles_for_report)
+    if mode == "none":
+        return []
+    return list(final_articles_for_report[:1])
+
+
+def fetch_article_image(article):
+    """記事の画像キーワードをLLMで生成し、Unsplashで画像を検索して設定する。"""
     print(
-        f"[{datetime.now()}] --- 2. ニュースの翻訳と要約、カテゴリ分類、選定 終了 ---"
+        f"  - 画像URLが見つかりません。LLMでキーワード生成後、Unsplashで検索します: {article.title}"
     )
-
-    print(f"[{datetime.now()}] --- 3. LLMによる記事選定と絞り込み 開始 ---")
-    # 3. LLMによる記事選定と絞り込み
-    final_articles_for_report = select_and_summarize_articles_with_gemini(
-        processed_articles_with_llm_info, categories
+    image_keywords = generate_image_keywords_with_gemini(
+        article.title, article.summary, article.category
     )
+    if image_keywords:
+        image_url = search_image_from_unsplash(image_keywords)
+        if image_url:
+            article.image_url = image_url
+            print(f"  - Unsplashから画像URLを取得しました: {image_url}")
+        else:
+            print(
+                f"  - Unsplashでキーワード '{image_keywords}' に一致する画像が見つかりませんでした。"
+            )
+    else:
+        print("  - LLMで画像キーワードを生成できませんでした。")
 
-    if not final_articles_for_report:
-        print("No articles selected for the report. Exiting.")
+
+def fetch_report_images(final_articles_for_report: list, deadline=None):
+    """画像を表示する記事について、Unsplashから画像を並行に検索・取得する。"""
+    if deadline is not None and not deadline.allows("images"):
+        deadline.degrade("images", "画像キーワード生成とUnsplash検索をスキップしました")
         return
+    # image_urlがまだ設定されていない記事のみ
+    articles = [
+        article
+        for article in image_target_articles(final_articles_for_report)
+        if not article.image_url
+    ]
+    if not articles:
+        return
+    with ThreadPoolExecutor(max_workers=IMAGE_FETCH_CONCURRENCY) as executor:
+        list(executor.map(fetch_article_image, articles))
 
-    # 追加: 選定されたすべての記事に対してUnsplashから画像を検索・取得
-    print(f"[{datetime.now()}] --- 3.5. Unsplashからの画像取得 開始 ---")
-    for article in final_articles_for_report:
-        if not article.get("image_url"):  # image_urlがまだ設定されていない場合のみ
-            print(
-                f"  - 画像URLが見つかりません。LLMでキーワード生成後、Unsplashで検索します: {article['title']}"
-            )
-            image_keywords = generate_image_keywords_with_gemini(
-                article["title"], article["summary"], article["category"]
-            )
-            if image_keywords:
-                image_url = search_image_from_unsplash(image_keywords)
-                if image_url:
-                    article["image_url"] = image_url
-                    print(f"  - Unsplashから画像URLを取得しました: {image_url}")
-                else:
-                    print(
-                        f"  - Unsplashでキーワード '{image_keywords}' に一致する画像が見つかりませんでした。"
-                    )
-            else:
-                print("  - LLMで画像キーワードを生成できませんでした。")
-    print(f"[{datetime.now()}] --- 3.5. Unsplashからの画像取得 終了 ---")
-
-    print(f"[{datetime.now()}] --- Notionレポートの作成 開始 ---")
 
+def prepare_notion_client():
+    """Notionクライアントを作成し、データベースのプロパティを準備する。失敗時はNoneを返す。"""
     notion_api_key = os.environ.get("NOTION_API_KEY")
     if not notion_api_key:
         print(
             "エラー: NOTION_API_KEY 環境変数が設定されていません。Notion APIキーを設定してください。"
         )
-        return
+        return None
 
     notion_database_id = os.environ.get("NOTION_DATABASE_ID")
     if not notion_database_id:
         print(
             "エラー: NOTION_DATABASE_ID 環境変数が設定されていません。NotionデータベースIDを設定してください。"
         )
-        return
+        return None
 
-    notion = Client(auth=notion_api_key, notion_version="2022-06-28")
+    notion = create_notion_client(notion_api_key)
     if not ensure_notion_database_properties(notion, notion_database_id):
         print(
             "エラー: Notionデータベースのプロパティの準備に失敗しました。Notionページ作成をスキップします。"
         )
-        return
+        return None
+    return notion
+
+
+def notion_report_key(report_date: str) -> str:
+    return f"notion_report:{report_date}"
 
+
+def deliver_notion_report(notion, item, articles: list, report):
+    """アウトボックスのNotionレポートを配信し、ページのURLを返す。"""
     print("Creating Notion report page...")
     # create_notion_report_page 関数呼び出し時に、記事のimage_urlがカバー画像として利用されることを想定
     notion_report_url = create_notion_report_page(
         notion,
+        articles,
+        cover_image_url=item.payload["cover_image_url"],
+        report_date=item.payload["report_date"],
+        report=report,
+    )
+    if not notion_report_url:
+        raise DeliveryError("Notionレポートページを作成できませんでした")
+    return notion_report_url
+
+
+def deliver_slack_message(outbox: Outbox, item, articles: list, groups: list):
+    """
+    アウトボックスのSlack通知を1つの配信先に配信する。Webhook URLは保存せず、配信時の
+    環境変数から配信先名で引く。メッセージは全配信先で共通の groups を使う。
+    分割送信の途中で失敗した場合は、送信済みの通数を記録して次回は続きから送る。
+    """
+    targets = {target.name: target for target in load_slack_targets()}
+    target = targets.get(item.payload["target"])
+    if target is None:
+        raise DeliveryError(
+            f"Slackの配信先 '{item.payload['target']}' のWebhook URLが設定されていません"
+        )
+    print(f"Sending Slack message to {target.name}...")
+    started = time.perf_counter()
+    sent = send_slack_message(
+        target.webhook_url,
+        target.channel,
+        outbox.get(item.depends_on).result,
+        articles,
+        item.payload["report_date"],
+        item.payload["closing_comment"],
+        start_part=item.progress,
+        on_part_sent=lambda count: outbox.set_progress(item.key, count),
+        groups=groups,
+        target=target,
+    )
+    run_summary.add_delivery(
+        f"slack:{target.name}", bool(sent), time.perf_counter() - started
+    )
+    if not sent:
+        raise DeliveryError("Slack通知の送信に失敗しました")
+
+
+def record_reported_articles(history, articles: list, report_date: str):
+    """配信したNotionレポートの記事を履歴に追加し、次回以降の既出の記事の除外に使う。"""
+    try:
+        (history or ArticleHistory.from_env()).record(articles, report_date)
+    except OSError as e:
+        print(f"警告: 配信した記事の履歴を保存できませんでした - {e}")
+
+
+def delivery_handlers(outbox: Outbox, get_notion, history=None) -> dict:
+    """
+    アウトボックスの項目の種類ごとの配信関数を返す。Notionクライアントは必要になるまで作らない。
+    レポートのモデルとSlackのメッセージは、NotionとSlackの全配信先で共有するため
+    レポート（Notionレポートの冪等キー）ごとに一度だけ組み立てる。
+    Notionレポートを配信できた記事のみを、配信した記事の履歴に追加する。
+    """
+    reports = {}
+    slack_groups = {}
+    lock = threading.Lock()
+
+    def report_for(report_key: str, payload: dict):
+        with lock:
+            if report_key not in reports:
+                articles = [as_article(article) for article in payload["articles"]]
+                reports[report_key] = (
+                    articles,
+                    build_report(articles, payload["report_date"]),
+                )
+            return reports[report_key]
+
+    def notion_report(item):
+        notion = get_notion()
+        if notion is None:
+            raise DeliveryError("Notionクライアントを準備できませんでした")
+        articles, report = report_for(item.key, item.payload)
+        notion_report_url = deliver_notion_report(notion, item, articles, report)
+        record_reported_articles(history, articles, item.payload["report_date"])
+        return notion_report_url
+
+    def slack(item):
+        articles, report = report_for(item.depends_on, item.payload)
+        notion_report_url = outbox.get(item.depends_on).result
+        with lock:
+            cache_key = (item.depends_on, notion_report_url)
+            if cache_key not in slack_groups:
+                slack_groups[cache_key] = render_slack_groups(
+                    report, notion_report_url, item.payload["closing_comment"]
+                )
+            groups = slack_groups[cache_key]
+        deliver_slack_message(outbox, item, articles, groups)
+
+    return {"notion_report": notion_report, "slack": slack}
+
+
+def publish_article_rows(notion, final_articles_for_report: list):
+    """NOTION_ARTICLES_DATABASE_ID が設定されている場合、記事を1記事1行で書き込む。"""
+    articles_database_id = os.environ.get("NOTION_ARTICLES_DATABASE_ID")
+    if not articles_database_id:
+        return
+    print("Writing articles to the Notion articles database...")
+    if not ensure_notion_database_properties(
+        notion,
+        articles_database_id,
+        expected_properties_config=expected_article_properties_config(),
+    ):
+        print(
+            "エラー: 記事一覧データベースのプロパティの準備に失敗しました。記事行の書き込みをスキップします。"
+        )
+        return
+    upsert_article_rows(
+        notion,
+        articles_database_id,
         final_articles_for_report,
-        cover_image_url=final_articles_for_report[0].get("image_url"),
-    )
-    print(f"[{datetime.now()}] --- Notionレポートの作成 終了 ---")
-
-    print(f"[{datetime.now()}] --- 4. Slack通知メッセージの作成と送信 開始 ---")
-    # 4. Slack通知メッセージの作成と送信
-    slack_webhook_url = os.environ.get("SLACK_WEBHOOK_URL")
-    slack_channel = os.environ.get(
-        "SLACK_CHANNEL", "#ai-news"
-    )  # 設定されていない場合は#ai-newsをデフォルトとする
-
-    # クロージングコメントを生成
-    closing_comment = generate_closing_comment_with_gemini(final_articles_for_report)
-
-    if slack_webhook_url and notion_report_url:
-        print("Sending Slack message...")
-        send_slack_message(
-            slack_webhook_url,
-            slack_channel,
-            notion_report_url,
-            final_articles_for_report,
-            os.environ.get("REPORT_DATE"),
-            closing_comment,
+        os.environ.get("REPORT_DATE"),
+    )
+
+
+def publish_static_site_archive(final_articles_for_report: list, closing_comment: str):
+    """SITE_DIR が設定されている場合、静的サイトのアーカイブにレポートを追加する。"""
+    if not os.environ.get("SITE_DIR"):
+        return
+    from .static_site import publish_static_site
+
+    print("Updating the static site archive...")
+    report = build_report(final_articles_for_report, os.environ.get("REPORT_DATE"))
+    try:
+        publish_static_site(report, closing_comment)
+    except OSError as e:
+        print(f"エラー: 静的サイトの更新に失敗しました - {e}")
+
+
+def generate_closing_comment(final_articles_for_report: list, deadline=None) -> str:
+    """クロージングコメントを生成する。締め切りが近い場合は定型文を使う。"""
+    if deadline is not None and not deadline.allows("closing_comment"):
+        deadline.degrade("closing_comment", "定型のクロージングコメントを使用しました")
+        return FALLBACK_CLOSING_COMMENT
+    return generate_closing_comment_with_gemini(final_articles_for_report)
+
+
+def enqueue_report_deliveries(
+    outbox: Outbox,
+    final_articles_for_report: list,
+    closing_comment: str,
+    notion_available: bool,
+) -> bool:
+    """
+    NotionレポートとSlack通知をアウトボックスに登録し、Notionレポートを登録したかを返す。
+    Notionレポートは日付単位で上書きされるため再実行時も配信し直し、Slack通知は
+    日付と配信先ごとに一度だけ送る。Slack通知はNotionレポートの配信を待ち、
+    複数の配信先へは並行に送られる。
+    """
+    report_date = os.environ.get("REPORT_DATE")
+    articles = [as_article(article).to_dict() for article in final_articles_for_report]
+    notion_key = notion_report_key(report_date)
+    if notion_available:
+        outbox.enqueue(
+            notion_key,
+            "notion_report",
+            {
+                "articles": articles,
+                "cover_image_url": articles[0]["image_url"],
+                "report_date": report_date,
+            },
+            redeliver=True,
         )
+
+    slack_targets = load_slack_targets()
+    if slack_targets and notion_available:
+        for target in slack_targets:
+            outbox.enqueue(
+                f"slack:{report_date}:{target.name}",
+                "slack",
+                {
+                    "target": target.name,
+                    "articles": articles,
+                    "report_date": report_date,
+                    "closing_comment": closing_comment,
+                },
+                depends_on=notion_key,
+            )
     else:
         print(
             "Skipping Slack notification. SLACK_WEBHOOK_URL or Notion report URL not available."
         )
-        if not slack_webhook_url:
+        if not slack_targets:
             print(
                 "To enable Slack notifications, please set the SLACK_WEBHOOK_URL environment variable."
             )
-    print(f"[{datetime.now()}] --- 4. Slack通知メッセージの作成と送信 終了 ---")
+    return notion_available
+
+
+def report_undelivered(outbox: Outbox):
+    pending = outbox.pending_count()
+    if pending:
+        print(
+            f"警告: 未配信の項目が{pending}件あります。--flush-outbox で再配信できます。"
+        )
+
+
+def deliver_outbox(outbox: Outbox, get_notion, deadline=None, history=None):
+    """
+    アウトボックスの項目を配信する。失敗した項目は OUTBOX_DRAIN_SECONDS 秒
+    （締め切りまでの残り時間の方が短い場合はその時間）までバックオフしながら再試行する。
+    """
+    wait_seconds = float(os.environ.get("OUTBOX_DRAIN_SECONDS", OUTBOX_DRAIN_SECONDS))
+    if deadline is not None:
+        wait_seconds = min(wait_seconds, max(deadline.remaining(), 0))
+    drain(
+        outbox,
+        delivery_handlers(outbox, get_notion, history),
+        wait_seconds=wait_seconds,
+    )
+    report_undelivered(outbox)
+
+
+def flush_outbox():
+    """フィードの収集やGeminiを使わずに、アウトボックスに残った未配信の項目を再配信する。"""
+    outbox = Outbox()
+    pending = outbox.pending_count()
+    if not pending:
+        print("未配信の項目はありません。")
+        return
+    print(f"未配信の{pending}件を再配信します...")
+    drain(
+        outbox,
+        delivery_handlers(outbox, functools.cache(prepare_notion_client)),
+        wait_seconds=FLUSH_OUTBOX_SECONDS,
+        ignore_schedule=True,
+    )
+    report_undelivered(outbox)
+
+
+async def publish_report(
+    final_articles_for_report: list, deadline=None, history=None
+) -> bool:
+    """
+    画像取得・Notion・Slackの配信を依存関係に沿って並行に実行し、Notionレポートを
+    配信したか、再配信できるようアウトボックスに登録したかを返す。
+    - 画像取得、Notionのスキーマ確認、クロージングコメント生成は互いに独立
+    - 記事一覧データベースへの書き込みはスキーマ確認のみを待つ
+    - 静的サイトの更新はクロージングコメントのみを待つ
+    - NotionレポートとSlack通知はすべてを待ってアウトボックスに登録し、順に配信する
+      （Notionレポートはカバー画像を、Slack通知はNotionのURLを使う）
+    """
+    images = asyncio.create_task(
+        asyncio.to_thread(fetch_report_images, final_articles_for_report, deadline)
+    )
+    notion_ready = asyncio.create_task(asyncio.to_thread(prepare_notion_client))
+    closing_comment = asyncio.create_task(
+        asyncio.to_thread(generate_closing_comment, final_articles_for_report, deadline)
+    )
+
+    async def article_rows():
+        notion = await notion_ready
+        if notion is not None:
+            await asyncio.to_thread(
+                publish_article_rows, notion, final_articles_for_report
+            )
+
+    async def static_site():
+        await asyncio.to_thread(
+            publish_static_site_archive,
+            final_articles_for_report,
+            await closing_comment,
+        )
+
+    rows = asyncio.create_task(article_rows())
+    site = asyncio.create_task(static_site())
+    notion = await notion_ready
+    await images
+    outbox = Outbox()
+    report_queued = enqueue_report_deliveries(
+        outbox, final_articles_for_report, await closing_comment, notion is not None
+    )
+    await asyncio.to_thread(deliver_outbox, outbox, lambda: notion, deadline, history)
+    await rows
+    await site
+    return report_queued
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    run_dir = args.run_dir or os.path.join(
+        "runs", datetime.now().strftime("%Y%m%d-%H%M%S")
+    )
+    profiler = create_profiler(args.profile, run_dir)
+    summary = reset_run_summary()
+    deadline = RunDeadline.from_env()
+    try:
+        if args.flush_outbox:
+            flush_outbox()
+        else:
+            run_pipeline(profiler, deadline)
+    finally:
+        summary.report()
+        if profiler.enabled:
+            profiler.write_summary()
+
+
+def run_pipeline(profiler, deadline):
+    # 現在のレポート日付を環境変数として設定
+    os.environ["REPORT_DATE"] = datetime.now().strftime("%Y-%m-%d")
+
+    # Gemini APIの初期化
+    try:
+        initialize_gemini()
+    except ValueError as e:
+        print(f"エラー: Gemini APIの初期化に失敗しました - {e}")
+        return
+
+    print(f"[{datetime.now()}] --- 1. AIニュースの収集 開始 ---")  # 追加
+    # 1. AIニュースの収集
+    # GoogleアラートのRSSフィードのURLを環境変数から取得
+    google_alerts_rss_urls_str = os.environ.get("GOOGLE_ALERTS_RSS_URLS")
+    if not google_alerts_rss_urls_str:
+        print(
+            "エラー: GOOGLE_ALERTS_RSS_URLS 環境変数が設定されていません。GoogleアラートのRSSフィードURLを設定してください。"
+        )
+        return
+    rss_feed_urls = [
+        url.strip() for url in google_alerts_rss_urls_str.split(",") if url.strip()
+    ]
+
+    collection_started_at = datetime.now(UTC)
+    with profiler.stage("collect"):
+        all_articles = collect_articles(
+            rss_feed_urls, collection_since(collection_started_at)
+        )
+
+    if not all_articles:
+        print("No articles fetched. Exiting.")
+        return
+
+    history = ArticleHistory.from_env()
+    with profiler.stage("novelty"):
+        all_articles = filter_reported_articles(all_articles, history)
+    if not all_articles:
+        print("No new articles after filtering reported ones. Exiting.")
+        return
+    print(f"[{datetime.now()}] --- 1. AIニュースの収集 終了 ---")
+
+    print(
+        f"[{datetime.now()}] --- 2. ニュースの翻訳と要約、カテゴリ分類、選定 開始 ---"
+    )
+    # 2. ニュースの翻訳と要約、カテゴリ分類、選定
+    with profiler.stage("enrich"):
+        processed_articles_with_llm_info = enrich_articles(all_articles, deadline)
+    print(
+        f"[{datetime.now()}] --- 2. ニュースの翻訳と要約、カテゴリ分類、選定 終了 ---"
+    )
+
+    print(f"[{datetime.now()}] --- 3. LLMによる記事選定と絞り込み 開始 ---")
+    # 3. LLMによる記事選定と絞り込み
+    with profiler.stage("select"):
+        final_articles_for_report = select_articles(
+            processed_articles_with_llm_info, deadline, history
+        )
+
+    if not final_articles_for_report:
+        print("No articles selected for the report. Exiting.")
+        return
+
+    # 画像取得・Notionレポートの作成・Slack通知は、依存関係に沿って並行に実行する
+    print(
+        f"[{datetime.now()}] --- 3.5〜4. 画像取得・Notionレポート作成・Slack通知 開始 ---"
+    )
+    with profiler.stage("publish"):
+        report_queued = asyncio.run(
+            publish_report(final_articles_for_report, deadline, history)
+        )
+    if report_queued:
+        # 配信できなかったNotionレポートはアウトボックスに残り再配信されるため、収集済みとする
+        record_successful_collection(_iso_utc(collection_started_at))
+    else:
+        print(
+            "警告: Notionレポートを配信・登録できなかったため、次回も同じ期間の記事を収集します。"
+        )
+    print(
+        f"[{datetime.now()}] --- 3.5〜4. 画像取得・Notionレポート作成・Slack通知 終了 ---"
+    )
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+# src/notion_articles.py
+from concurrent.futures import ThreadPoolExecutor
+
+from . import local_cache
+from .run_summary import run_summary
+from .write_to_notion import (
+    NOTION_APPEND_CONCURRENCY,
+    PROP_ABSTRACT,
+    PROP_CATEGORY,
+    PROP_DATE,
+    PROP_NAME,
+    PROP_POINTS,
+    PROP_URL,
+    rich_text,
+)
+
+# 記事URLから作成済みのNotionページIDを引くためのインデックス
+ARTICLE_INDEX_NAME = "notion_article_index.json"
+
+
+def article_properties(article, report_date_str: str) -> dict:
+    """記事一覧データベースの1行分のプロパティを組み立てる。"""
+    points = "\n".join(f"・{point}" for point in article.get("points", []))
+    properties = {
+        PROP_NAME: {"title": rich_text(article.title or "タイトルなし")},
+        PROP_URL: {"url": article.get("url")},
+        PROP_ABSTRACT: {"rich_text": rich_text(article.get("summary", ""))},
+        PROP_POINTS: {"rich_text": rich_text(points)},
+        PROP_DATE: {"date": {"start": report_date_str}},
+    }
+    category = article.get("category")
+    if category:
+        # selectの選択肢はカンマを含められないため置き換える
+        properties[PROP_CATEGORY] = {"select": {"name": category.replace(",", " ")}}
+    return properties
+
+
+def _upsert_article(notion, database_id: str, page_id, properties: dict):
+    """
+    既知のページは更新し、未登録（または削除済み）の場合は新規作成する。
+    (ページID, 作成したかどうか) を返す。
+    """
+    from notion_client.errors import APIResponseError
+
+    if page_id:
+        try:
+            notion.pages.update(page_id=page_id, properties=properties)
+            return page_id, False
+        except APIResponseError as e:
+            if e.code != "object_not_found":
+                raise
+    response = notion.pages.create(
+        parent={"database_id": database_id}, properties=properties
+    )
+    return response["id"], True
+
+
+def upsert_article_rows(notion, database_id: str, articles: list, report_date_str):
+    """
+    選定された記事を記事一覧データベースに1記事1行で書き込む。
+    URLとページIDのインデックスをローカルに保存し、既出の記事は作成ではなく更新にする。
+    書き込みはレート制限の範囲で並列に行い、成功した件数を返す。
+    """
+    import httpx
+    from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+    index = local_cache.load_json(ARTICLE_INDEX_NAME, {})
+    url_to_page = index.setdefault(database_id, {})
+
+    def upsert(article):
+        url = article.get("url")
+        properties = article_properties(article, report_date_str)
+        return url, _upsert_article(
+            notion, database_id, url_to_page.get(url), properties
+        )
+
+    written = 0
+    with ThreadPoolExecutor(max_workers=NOTION_APPEND_CONCURRENCY) as executor:
+        futures = [executor.submit(upsert, article) for article in articles]
+        for article, future in zip(articles, futures):
+            try:
+                url, (page_id, created) = future.result()
+            except (HTTPResponseError, RequestTimeoutError, httpx.HTTPError) as e:
+                print(f"  - 記事行の書き込みに失敗しました: {article.title} ({e})")
+                run_summary.incr("notion_article_rows_failed")
+                continue
+            url_to_page[url] = page_id
+            run_summary.incr(
+                "notion_article_rows_created"
+                if created
+                else "notion_article_rows_updated"
+            )
+            written += 1
+
+    local_cache.save_json(ARTICLE_INDEX_NAME, index)
+    print(f"記事一覧データベースに{written}/{len(articles)}件の記事を書き込みました。")
+    return written
@@ -0,0 +1,157 @@
+# src/notion_rate_limit.py
+import random
+import threading
+import time
+
+from .run_summary import run_summary
+
+# Notion APIの平均リクエストレート（リクエスト/秒）
+NOTION_REQUESTS_PER_SECOND = 3.0
+# 失敗時の最大再試行回数と、指数バックオフの初回・最大の待ち時間（秒）
+MAX_RETRIES = 4
+BASE_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+# 再送しても結果が変わらないメソッド（サーバーエラーやタイムアウト時に再試行してよい）
+IDEMPOTENT_METHODS = frozenset({"retrieve", "query", "list", "update", "delete"})
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+# request() で直接呼び出す、読み取り専用のPOSTエンドポイント（パスの末尾）
+READ_ONLY_POST_PATHS = ("/query", "search")
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット。acquire() はトークンが補充されるまで待機する。"""
+
+    def __init__(
+        self,
+        rate: float = NOTION_REQUESTS_PER_SECOND,
+        capacity: float | None = None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ消費する。待機した秒数を返す。"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+
+class RateLimitedNotionClient:
+    """
+    notion_client.Client をラップし、すべてのAPI呼び出しをトークンバケットで平準化する。
+    429はRetry-Afterに従って再試行し、サーバーエラーとタイムアウトは冪等なメソッドのみ
+    指数バックオフで再試行する。スロットリングと再試行の回数は実行サマリーに記録する。
+    """
+
+    def __init__(
+        self,
+        client,
+        bucket: TokenBucket | None = None,
+        max_retries: int = MAX_RETRIES,
+        sleep=time.sleep,
+    ):
+        self._client = client
+        self._bucket = bucket or TokenBucket(sleep=sleep)
+        self._max_retries = max_retries
+        self._sleep = sleep
+
+    def __getattr__(self, name):
+        return _proxy_attribute(self, name, getattr(self._client, name))
+
+    def call(self, method_name: str, method, /, *args, **kwargs):
+        from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+        attempt = 0
+        while True:
+            if self._bucket.acquire() > 0:
+                run_summary.incr("notion_throttled")
+            try:
+                return method(*args, **kwargs)
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                delay = self._retry_delay(
+                    is_idempotent(method_name, kwargs), e, attempt
+                )
+                if delay is None or attempt >= self._max_retries:
+                    raise
+                attempt += 1
+                run_summary.incr("notion_retries")
+                print(
+                    f"  - Notion APIの {method_name} を {delay:.1f}秒後に再試行します ({attempt}/{self._max_retries}): {e}"
+                )
+                self._sleep(delay)
+
+    def _retry_delay(self, idempotent: bool, error, attempt: int):
+        """再試行までの待ち時間を返す。再試行すべきでない場合はNoneを返す。"""
+        status = getattr(error, "status", None)
+        if status == 429:
+            # 429はリクエストが処理されていないため、どのメソッドでも再試行できる
+            run_summary.incr("notion_rate_limited")
+            retry_after = _retry_after_seconds(error)
+            if retry_after is not None:
+                return retry_after
+        elif not idempotent or (
+            status is not None and status not in RETRYABLE_STATUSES
+        ):
+            return None
+        delay = min(MAX_RETRY_DELAY, BASE_RETRY_DELAY * 2**attempt)
+        return delay + random.uniform(0, delay * 0.1)
+
+
+def is_idempotent(method_name: str, kwargs: dict) -> bool:
+    """
+    再送しても結果が変わらない呼び出しかを返す。request() の場合は、GETと
+    読み取り専用のPOST（データベースのクエリと検索）のみ冪等とみなす。
+    """
+    if method_name != "request":
+        return method_name in IDEMPOTENT_METHODS
+    method = str(kwargs.get("method", "GET")).upper()
+    path = str(kwargs.get("path", "")).rstrip("/")
+    return method == "GET" or (method == "POST" and path.endswith(READ_ONLY_POST_PATHS))
+
+
+class _EndpointProxy:
+    """エンドポイント（pages, blocks.children など）の呼び出しをクライアントの call() に通す。"""
+
+    def __init__(self, owner: RateLimitedNotionClient, target):
+        self._owner = owner
+        self._target = target
+
+    def __getattr__(self, name):
+        return _proxy_attribute(self._owner, name, getattr(self._target, name))
+
+
+def _proxy_attribute(owner: RateLimitedNotionClient, name: str, attr):
+    if not callable(attr):
+        return _EndpointProxy(owner, attr)
+
+    def call(*args, **kwargs):
+        return owner.call(name, attr, *args, **kwargs)
+
+    return call
+
+
+def _retry_after_seconds(error):
+    headers = getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
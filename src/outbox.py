@@ -0,0 +1,264 @@
+# src/outbox.py
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from . import local_cache
+from .lazy_modules import lazy_import
+from .run_summary import run_summary
+
+sqlite3 = lazy_import("sqlite3")
+
+OUTBOX_NAME = "outbox.sqlite3"
+# 配信に失敗した場合の最大試行回数と、再試行までの待ち時間（秒）
+MAX_DELIVERY_ATTEMPTS = 8
+BASE_RETRY_DELAY = 5.0
+MAX_RETRY_DELAY = 3600.0
+# 同時に配信する項目数（複数のSlack配信先への投稿を並行に行う）
+DELIVERY_CONCURRENCY = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    depends_on TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    progress INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class DeliveryError(Exception):
+    """配信に失敗し、後で再試行すべきことを示す例外。"""
+
+
+@dataclass(slots=True)
+class OutboxItem:
+    key: str
+    kind: str
+    payload: dict
+    depends_on: str | None
+    status: str
+    attempts: int
+    next_attempt_at: float
+    progress: int
+    result: str | None
+
+
+class Outbox:
+    """
+    Slack・Notionへの配信内容を冪等キー付きでSQLiteに保存する、永続的なアウトボックス。
+    配信に失敗した項目は指数バックオフで再試行され、--flush-outbox で再配信できる。
+    """
+
+    def __init__(self, path: str | None = None, clock=time.time):
+        self.path = path or local_cache.cache_path(OUTBOX_NAME)
+        self.clock = clock
+        self._lock = threading.Lock()
+        local_cache.ensure_parent_dir(self.path)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        key: str,
+        kind: str,
+        payload: dict,
+        depends_on: str | None = None,
+        redeliver: bool = False,
+    ) -> bool:
+        """
+        配信内容を登録する。同じキーが未配信の場合は内容を置き換え、配信済みの場合は
+        redeliver=True のときのみ再配信する。新たに配信が必要になった場合はTrueを返す。
+        """
+        encoded = json.dumps(payload, ensure_ascii=False)
+        resettable = "status != 'delivered'" if not redeliver else "1"
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                f"""
+                INSERT INTO outbox (idempotency_key, kind, payload, depends_on, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(idempotency_key) DO UPDATE SET
+                    payload = excluded.payload,
+                    depends_on = excluded.depends_on,
+                    status = 'pending',
+                    attempts = 0,
+                    next_attempt_at = 0,
+                    last_error = NULL
+                WHERE progress = 0 AND {resettable}
+                """,
+                (key, kind, encoded, depends_on, self.clock()),
+            )
+            return cursor.rowcount > 0
+
+    def get(self, key: str) -> OutboxItem | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT idempotency_key, kind, payload, depends_on, status, attempts,"
+                " next_attempt_at, progress, result FROM outbox WHERE idempotency_key = ?",
+                (key,),
+            ).fetchone()
+        return _to_item(row) if row else None
+
+    def due_items(self, ignore_schedule: bool = False) -> list:
+        """配信時刻を過ぎた未配信の項目を登録順に返す。"""
+        due_at = float("inf") if ignore_schedule else self.clock()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT idempotency_key, kind, payload, depends_on, status, attempts,"
+                " next_attempt_at, progress, result FROM outbox"
+                " WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id",
+                (due_at,),
+            ).fetchall()
+        return [_to_item(row) for row in rows]
+
+    def pending_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def next_attempt_at(self) -> float | None:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def set_progress(self, key: str, progress: int):
+        """複数回に分けて送る配信で、送信済みの件数を記録する（再試行時は続きから送る）。"""
+        self._update(key, "progress = ?", progress)
+
+    def defer(self, key: str, until: float):
+        """依存先の配信を待つため、試行回数を増やさずに次の試行時刻を遅らせる。"""
+        self._update(key, "next_attempt_at = ?", until)
+
+    def mark_delivered(self, key: str, result: str | None = None):
+        self._update(key, "status = 'delivered', result = ?", result)
+
+    def mark_dead(self, key: str, error: str):
+        self._update(key, "status = 'dead', last_error = ?", error)
+
+    def mark_failed(self, key: str, error: str):
+        """失敗を記録し、次の試行時刻を指数バックオフで設定する。上限を超えると破棄する。"""
+        item = self.get(key)
+        attempts = item.attempts + 1
+        if attempts >= MAX_DELIVERY_ATTEMPTS:
+            self.mark_dead(key, error)
+            return
+        delay = min(MAX_RETRY_DELAY, BASE_RETRY_DELAY * 2 ** (attempts - 1))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?"
+                " WHERE idempotency_key = ?",
+                (attempts, self.clock() + delay, error, key),
+            )
+
+    def _update(self, key: str, assignments: str, value):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"UPDATE outbox SET {assignments} WHERE idempotency_key = ?",
+                (value, key),
+            )
+
+
+def _to_item(row) -> OutboxItem:
+    key, kind, payload, depends_on, status, *counters, result = row
+    return OutboxItem(
+        key, kind, json.loads(payload), depends_on, status, *counters, result
+    )
+
+
+def _deliver(outbox: Outbox, handlers: dict, item: OutboxItem) -> bool:
+    try:
+        result = handlers[item.kind](item)
+    # 配信の処理は呼び出し側が登録するため、どの例外でも失敗として記録して再試行の対象にする
+    except Exception as e:  # noqa: BLE001
+        print(f"  - 配信に失敗しました [{item.key}]: {e}")
+        outbox.mark_failed(item.key, str(e))
+        run_summary.incr("outbox_failed")
+        return False
+    outbox.mark_delivered(item.key, result)
+    run_summary.incr("outbox_delivered")
+    return True
+
+
+def deliver_due(
+    outbox: Outbox,
+    handlers: dict,
+    ignore_schedule: bool = False,
+    max_workers: int = DELIVERY_CONCURRENCY,
+) -> int:
+    """
+    配信時刻を過ぎた項目を配信し、配信できた件数を返す。
+    依存先のない項目（または依存先が配信済みの項目）は並行に配信し、同じ回で配信される
+    依存先を待つ項目はその後に配信する。依存先が未配信のまま残った項目は待機し、
+    依存先が破棄された場合は一緒に破棄する。
+    """
+    delivered = 0
+    items = outbox.due_items(ignore_schedule)
+    while items:
+        batch_keys = {item.key for item in items}
+        ready, waiting = [], []
+        for item in items:
+            dependency = outbox.get(item.depends_on) if item.depends_on else None
+            if dependency is None or dependency.status == "delivered":
+                ready.append(item)
+            elif dependency.status == "dead":
+                outbox.mark_dead(
+                    item.key, f"依存先 {item.depends_on} の配信に失敗しました"
+                )
+            elif dependency.key in batch_keys:
+                waiting.append(item)
+            else:
+                outbox.defer(item.key, dependency.next_attempt_at)
+        if not ready:
+            for item in waiting:
+                outbox.defer(item.key, outbox.get(item.depends_on).next_attempt_at)
+            break
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            delivered += sum(
+                executor.map(lambda item: _deliver(outbox, handlers, item), ready)
+            )
+        items = waiting
+    return delivered
+
+
+def drain(
+    outbox: Outbox,
+    handlers: dict,
+    wait_seconds: float = 0,
+    ignore_schedule: bool = False,
+    sleep=time.sleep,
+) -> bool:
+    """
+    未配信の項目がなくなるか wait_seconds を使い切るまで、バックオフに従って配信を繰り返す。
+    すべて配信できた場合はTrueを返す。
+    """
+    give_up_at = outbox.clock() + wait_seconds
+    deliver_due(outbox, handlers, ignore_schedule)
+    while outbox.pending_count():
+        next_attempt_at = outbox.next_attempt_at()
+        if next_attempt_at > give_up_at:
+            return False
+        sleep(max(next_attempt_at - outbox.clock(), 0))
+        deliver_due(outbox, handlers)
+    return True
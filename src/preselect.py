@@ -0,0 +1,84 @@
+# src/preselect.py
+import os
+from datetime import date
+
+from .article_history import ArticleHistory, normalize_rows
+from .lazy_modules import lazy_import
+from .prioritize import CATEGORY_KEYWORDS
+
+np = lazy_import("numpy")
+
+# LLMによる選定のプロンプトに載せる、カテゴリごとの記事数（SELECTION_PROMPT_ARTICLES で変更可能）
+SELECTION_PROMPT_ARTICLES = 8
+# MMRでのカテゴリとの関連度の重み（残りは、選んだ記事と似ていないことの重み）
+MMR_RELEVANCE_WEIGHT = 0.7
+
+
+def selection_prompt_articles() -> int:
+    return int(os.environ.get("SELECTION_PROMPT_ARTICLES", SELECTION_PROMPT_ARTICLES))
+
+
+def category_profiles(history: ArticleHistory, categories: list, today: date):
+    """
+    カテゴリごとの「理想の記事」のプロファイル（正規化した埋め込み）の行列を返す。
+    カテゴリ名とキーワードの埋め込みと、直近に配信したそのカテゴリの記事の重心を等しい重みで合わせる。
+    """
+    seeds = history.embedder.embed(
+        [f"{c} {' '.join(CATEGORY_KEYWORDS.get(c, ()))}" for c in categories]
+    )
+    profiles = seeds.copy()
+    for index, category in enumerate(categories):
+        reported = history.category_matrix(category, today)
+        if len(reported):
+            profiles[index] += normalize_rows(reported.mean(axis=0, keepdims=True))[0]
+    return normalize_rows(profiles)
+
+
+def mmr_order(
+    relevance, vectors, count: int, relevance_weight: float = MMR_RELEVANCE_WEIGHT
+) -> list:
+    """
+    MMR（Maximal Marginal Relevance）で count 件を選び、選んだ順のインデックスを返す。
+    関連度が高く、すでに選んだ記事と似ていない記事を優先する。
+    """
+    count = min(count, len(relevance))
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    order = []
+    for _ in range(count):
+        scores = relevance_weight * relevance - (1 - relevance_weight) * redundancy
+        index = int(np.argmax(np.where(available, scores, -np.inf)))
+        order.append(index)
+        available[index] = False
+        redundancy = np.maximum(redundancy, vectors @ vectors[index])
+    return order
+
+
+def preselect_for_prompt(
+    articles: list,
+    categories: list,
+    history: ArticleHistory,
+    today: date,
+    count: int | None = None,
+) -> list:
+    """
+    カテゴリごとに、プロファイルとの関連度と多様性（MMR）で上位 count 件に絞った記事を返す。
+    LLMによる選定のプロンプトの大きさを、フィードの記事数によらず一定にするために使う。
+    """
+    count = count or selection_prompt_articles()
+    vectors = history.embed_articles(articles)
+    profiles = category_profiles(history, categories, today)
+    candidates = []
+    for index, category in enumerate(categories):
+        members = [
+            i for i, article in enumerate(articles) if article.category == category
+        ]
+        if len(members) <= count:
+            candidates.extend(articles[i] for i in members)
+            continue
+        member_vectors = vectors[members]
+        relevance = member_vectors @ profiles[index]
+        candidates.extend(
+            articles[members[i]] for i in mmr_order(relevance, member_vectors, count)
+        )
+    return candidates
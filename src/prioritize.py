@@ -0,0 +1,136 @@
+# src/prioritize.py
+import heapq
+import math
+import re
+from datetime import UTC, datetime
+from urllib.parse import parse_qs, urlparse
+
+from .utils import remove_html_tags
+
+# 公開からこの時間（時間）が経過するごとに新しさのスコアが半分になる
+RECENCY_HALF_LIFE_HOURS = 24
+# 公開日時が不明な記事の新しさのスコア
+UNKNOWN_RECENCY = 0.5
+
+# 情報源ドメインごとの重み（記載のないドメインは1.0）
+SOURCE_DOMAIN_WEIGHTS = {
+    "arxiv.org": 1.5,
+    "github.blog": 1.3,
+    "aws.amazon.com": 1.3,
+    "cloud.google.com": 1.3,
+    "blog.google": 1.3,
+    "openai.com": 1.3,
+    "anthropic.com": 1.3,
+    "huggingface.co": 1.3,
+    "techcrunch.com": 1.2,
+    "zenn.dev": 1.1,
+    "qiita.com": 1.1,
+    "note.com": 0.8,
+    "prtimes.jp": 0.7,
+}
+
+# カテゴリとの関連度を判定するキーワード（カテゴリ名そのものも照合する）
+CATEGORY_KEYWORDS = {
+    "データサイエンス": ["data science", "統計", "機械学習", "machine learning"],
+    "データエンジニアリング": ["data engineering", "etl", "データ基盤", "pipeline"],
+    "データ分析": ["analytics", "分析", "bi", "dashboard"],
+    "人工知能": ["ai", "llm", "生成ai", "gpt", "gemini", "claude", "deep learning"],
+    "プログラミング": ["python", "rust", "typescript", "プログラミング", "sdk"],
+    "パフォーマンス最適化": ["performance", "latency", "高速化", "最適化", "benchmark"],
+}
+
+# スコアの各要素の重み
+RECENCY_WEIGHT = 2.0
+KEYWORD_WEIGHT = 0.5
+MAX_KEYWORD_MATCHES = 4
+DUPLICATE_WEIGHT = 0.5
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def source_domain(url: str) -> str:
+    """
+    記事の情報源ドメインを返す。
+    GoogleアラートのリダイレクトURLの場合は、url パラメータの転送先ドメインを返す。
+    """
+    parsed = urlparse(url)
+    if parsed.netloc.endswith("google.com") and parsed.path == "/url":
+        target = parse_qs(parsed.query).get("url")
+        if target:
+            parsed = urlparse(target[0])
+    domain = parsed.netloc.lower()
+    return domain.removeprefix("www.")
+
+
+def domain_weight(domain: str) -> float:
+    """ドメイン（またはその親ドメイン）の重みを返す。"""
+    parts = domain.split(".")
+    for i in range(len(parts) - 1):
+        weight = SOURCE_DOMAIN_WEIGHTS.get(".".join(parts[i:]))
+        if weight is not None:
+            return weight
+    return 1.0
+
+
+def recency_score(published: str | None, now: datetime) -> float:
+    """公開日時からの経過時間に応じて 0〜1 の新しさのスコアを返す。"""
+    if not published:
+        return UNKNOWN_RECENCY
+    try:
+        published_at = datetime.fromisoformat(published)
+    except ValueError:
+        return UNKNOWN_RECENCY
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=UTC)
+    age_hours = max((now - published_at).total_seconds() / 3600, 0.0)
+    return 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+
+def keyword_matches(text: str, categories: list) -> int:
+    """タイトルと概要に含まれるカテゴリ関連キーワードの数を返す。"""
+    text = text.lower()
+    words = set(_WORD_PATTERN.findall(text))
+    matches = 0
+    for category in categories:
+        for keyword in [category, *CATEGORY_KEYWORDS.get(category, [])]:
+            # 英数字のキーワードは単語単位で、それ以外は部分一致で照合する
+            if keyword.isascii() and keyword.isalnum():
+                matches += keyword in words
+            else:
+                matches += keyword in text
+    return matches
+
+
+def score_article(article, categories: list, duplicate_count: int, now: datetime):
+    """LLMを呼ぶ前に、新しさ・情報源・キーワード・重複数から記事の優先度を計算する。"""
+    text = remove_html_tags(f"{article.title} {article.summary}")
+    matches = min(keyword_matches(text, categories), MAX_KEYWORD_MATCHES)
+    return (
+        RECENCY_WEIGHT * recency_score(article.published, now)
+        + domain_weight(source_domain(article.url))
+        + KEYWORD_WEIGHT * matches
+        + DUPLICATE_WEIGHT * math.log2(duplicate_count)
+    )
+
+
+def _dedupe_key(article) -> str:
+    return " ".join(remove_html_tags(article.title).lower().split()) or article.url
+
+
+def prioritize_articles(articles: list, categories: list, now: datetime | None = None):
+    """
+    同じ記事（タイトルが同一）を1件にまとめ、優先度の高い順に記事を返すジェネレータ。
+    複数のフィードに現れた記事ほど優先度が上がる。同点の場合は元の順序を保つ。
+    """
+    now = now or datetime.now(UTC)
+    groups = {}
+    for article in articles:
+        groups.setdefault(_dedupe_key(article), []).append(article)
+
+    heap = []
+    for index, group in enumerate(groups.values()):
+        score = score_article(group[0], categories, len(group), now)
+        heap.append((-score, index, group[0]))
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
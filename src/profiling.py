@@ -0,0 +1,176 @@
+# src/profiling.py
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from .lazy_modules import lazy_import
+
+# 計測用のモジュールは --profile 指定時のみ読み込む
+cProfile = lazy_import("cProfile")
+pstats = lazy_import("pstats")
+tracemalloc = lazy_import("tracemalloc")
+
+# 1行あたりのフレームの深さの上限（collapsed stack出力用）
+MAX_STACK_DEPTH = 64
+# この値（マイクロ秒）未満のスタックはフレームグラフに出力しない
+MIN_STACK_WEIGHT_US = 1
+
+
+class NullProfiler:
+    """--profile 未指定時に使う、何もしないプロファイラ。"""
+
+    enabled = False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def write_summary(self):
+        return None
+
+
+class StageProfiler:
+    """
+    パイプラインのステージごとにcProfileとtracemallocで計測し、
+    ソート済みの統計、フレームグラフ用のcollapsed stack、メモリ確保の上位を run_dir に書き出す。
+    """
+
+    enabled = True
+
+    def __init__(self, run_dir: str, top_n: int = 15):
+        self.run_dir = run_dir
+        self.top_n = top_n
+        self.results = []
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name: str):
+        profiler = cProfile.Profile()
+        tracemalloc.start(25)
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._write_stage_reports(name, profiler, snapshot, peak_bytes, elapsed)
+
+    def _stage_path(self, name: str, suffix: str) -> str:
+        index = len(self.results) + 1
+        return os.path.join(self.run_dir, f"{index:02d}_{name}.{suffix}")
+
+    def _write_stage_reports(self, name, profiler, snapshot, peak_bytes, elapsed):
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(self._stage_path(name, "pstats"))
+
+        for sort_key in ("cumulative", "tottime"):
+            with open(self._stage_path(name, f"{sort_key}.txt"), "w") as f:
+                pstats.Stats(profiler, stream=f).sort_stats(sort_key).print_stats(50)
+
+        with open(self._stage_path(name, "collapsed"), "w") as f:
+            f.writelines(
+                f"{stack} {weight}\n"
+                for stack, weight in sorted(collapse_stacks(stats).items())
+            )
+
+        with open(self._stage_path(name, "alloc.txt"), "w") as f:
+            f.write(f"peak traced memory: {peak_bytes / 1024:.1f} KiB\n")
+            f.writelines(
+                f"{stat}\n" for stat in snapshot.statistics("lineno")[: self.top_n]
+            )
+
+        self.results.append(
+            {
+                "name": name,
+                "elapsed": elapsed,
+                "peak_bytes": peak_bytes,
+                "hot_functions": hot_functions(stats, self.top_n),
+            }
+        )
+
+    def write_summary(self) -> str:
+        """ステージごとの所要時間・ピークメモリ・ホット関数の上位をまとめて出力する。"""
+        lines = []
+        for result in self.results:
+            lines.append(
+                f"[{result['name']}] {result['elapsed']:.3f}s, "
+                f"peak {result['peak_bytes'] / 1024:.1f} KiB"
+            )
+            for label, tottime, cumtime, calls in result["hot_functions"]:
+                lines.append(
+                    f"  {tottime:8.4f}s self {cumtime:8.4f}s cum {calls:7d} calls  {label}"
+                )
+        summary = "\n".join(lines)
+        with open(os.path.join(self.run_dir, "profile_summary.txt"), "w") as f:
+            f.write(summary + "\n")
+        print(f"--- プロファイル結果 ({self.run_dir}) ---")
+        print(summary)
+        return summary
+
+
+def create_profiler(enabled: bool, run_dir: str):
+    """--profile の有無に応じてプロファイラを返す。無効時は計測コストのないNullProfilerを返す。"""
+    if not enabled:
+        return NullProfiler()
+    return StageProfiler(run_dir)
+
+
+def _frame_label(func) -> str:
+    filename, lineno, funcname = func
+    if filename == "~":
+        return funcname
+    return f"{os.path.basename(filename)}:{lineno}:{funcname}".replace(";", ",")
+
+
+def hot_functions(stats: "pstats.Stats", top_n: int) -> list:
+    """自己時間(tottime)の大きい順に (ラベル, tottime, cumtime, 呼び出し回数) を返す。"""
+    rows = [
+        (_frame_label(func), tt, ct, nc)
+        for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top_n]
+
+
+def collapse_stacks(stats: "pstats.Stats") -> dict:
+    """
+    cProfileの呼び出し元グラフから、flamegraph.pl / speedscope で読める
+    collapsed stack形式（"a;b;c 重みμs"）を組み立てる。
+    各関数の自己時間は、呼び出し元ごとの累積時間の比率で按分する。
+    """
+    callees = {}
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        known_callers = [caller for caller in callers if caller in stats.stats]
+        if not known_callers:
+            roots.append(func)
+        for caller in known_callers:
+            edge_ct = callers[caller][3]
+            callees.setdefault(caller, []).append((func, edge_ct))
+
+    collapsed = {}
+
+    def walk(func, stack, fraction):
+        _cc, _nc, tt, _ct, _callers = stats.stats[func]
+        stack = stack + [_frame_label(func)]
+        weight = int(tt * fraction * 1_000_000)
+        if weight >= MIN_STACK_WEIGHT_US:
+            key = ";".join(stack)
+            collapsed[key] = collapsed.get(key, 0) + weight
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_ct in callees.get(func, []):
+            callee_ct = stats.stats[callee][3]
+            if callee_ct <= 0 or _frame_label(callee) in stack:
+                continue
+            callee_fraction = fraction * min(edge_ct / callee_ct, 1.0)
+            if callee_ct * callee_fraction * 1_000_000 < MIN_STACK_WEIGHT_US:
+                continue
+            walk(callee, stack, callee_fraction)
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return collapsed
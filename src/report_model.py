@@ -0,0 +1,161 @@
+# src/report_model.py
+from dataclasses import dataclass
+
+from .utils import (
+    NOTION_TEXT_BUDGET,
+    SLACK_SECTION_BUDGET,
+    normalize_text,
+    truncate_text,
+    utf16_length,
+)
+
+# カテゴリが設定されていない記事の見出し
+DEFAULT_CATEGORY = "その他"
+REPORT_TITLE = "AIニュースレポート"
+
+_SLACK_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_MARKDOWN_ESCAPES = str.maketrans({char: f"\\{char}" for char in "\\`*_[]<>|#"})
+
+
+def escape_slack(text: str) -> str:
+    """Slackのmrkdwnで制御文字として扱われる &, <, > をエスケープする。"""
+    return text.translate(_SLACK_ESCAPES)
+
+
+def escape_markdown(text: str) -> str:
+    return text.translate(_MARKDOWN_ESCAPES)
+
+
+def truncate_mrkdwn(text: str, limit: int) -> str:
+    """
+    Slackのmrkdwnを limit 文字以内に切り詰める。切り詰めた場合は末尾に「…」を付け、
+    リンク（<url|title>）やエスケープ（&amp; など）の途中で切れる場合はその手前で切る。
+    """
+    if len(text) <= limit:
+        return text
+    truncated = truncate_text(text, limit - 1, ellipsis="")
+    if truncated.rfind("<") > truncated.rfind(">"):
+        truncated = truncated[: truncated.rfind("<")]
+    if truncated.rfind("&") > truncated.rfind(";"):
+        truncated = truncated[: truncated.rfind("&")]
+    return truncated + "…"
+
+
+@dataclass(slots=True, frozen=True)
+class ReportArticle:
+    """
+    レポートに載せる1記事分の表示用データ。
+    テキストはNFKC正規化してNotionの上限に収めたもので、各シンクのエスケープ済みテキスト
+    （Slackの要約は記事のsectionが上限に収まる長さ）と長さは、組み立て時に一度だけ計算する。
+    """
+
+    title: str
+    url: str
+    summary: str
+    points: tuple
+    image_url: str | None
+    # Notion（UTF-16で数える）の上限判定用の長さ
+    title_length: int
+    summary_length: int
+    # Slackのmrkdwn用にエスケープしたテキスト
+    slack_title: str
+    slack_summary: str
+    slack_points: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class ReportCategory:
+    name: str
+    articles: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class Report:
+    """
+    選定後の記事をカテゴリ順にまとめたレポート。Notion・Slack・Markdownの各レンダラーは
+    このモデルを1回走査するだけで出力を組み立てる。
+    """
+
+    report_date: str
+    categories: tuple
+    article_count: int
+
+    @property
+    def title(self) -> str:
+        return f"{REPORT_TITLE} - {self.report_date}"
+
+    def articles(self):
+        for category in self.categories:
+            yield from category.articles
+
+
+def _fit(text: str) -> str:
+    return NOTION_TEXT_BUDGET.fit(normalize_text(text))
+
+
+def slack_article_heading(url: str, slack_title: str) -> str:
+    """Slackの記事のsectionで、要約の前に置く見出し（リンク付きのタイトル）。"""
+    return f"*<{url}|{slack_title}>*\n"
+
+
+def _report_article(article) -> ReportArticle:
+    title = _fit(article.get("title", "タイトルなし"))
+    url = article.get("url", "#")
+    summary = _fit(article.get("summary", ""))
+    points = tuple(_fit(point) for point in article.get("points") or ())
+    slack_title = escape_slack(title)
+    # 見出しと要約を合わせたsectionが上限に収まるよう、要約の側を切り詰める
+    summary_budget = SLACK_SECTION_BUDGET.limit - len(
+        slack_article_heading(url, slack_title)
+    )
+    return ReportArticle(
+        title=title,
+        url=url,
+        summary=summary,
+        points=points,
+        image_url=article.get("image_url"),
+        title_length=utf16_length(title),
+        summary_length=utf16_length(summary),
+        slack_title=slack_title,
+        slack_summary=truncate_mrkdwn(escape_slack(summary), max(summary_budget, 0)),
+        slack_points=tuple(escape_slack(point) for point in points),
+    )
+
+
+def build_report(articles, report_date: str) -> Report:
+    """記事（Articleまたは辞書）を、初出順のカテゴリごとにまとめたレポートを組み立てる。"""
+    categories = {}
+    count = 0
+    for article in articles:
+        category = article.get("category", DEFAULT_CATEGORY)
+        categories.setdefault(category, []).append(_report_article(article))
+        count += 1
+    return Report(
+        report_date=report_date,
+        categories=tuple(
+            ReportCategory(name, tuple(items)) for name, items in categories.items()
+        ),
+        article_count=count,
+    )
+
+
+def render_markdown(
+    report: Report, notion_report_url: str | None = None, closing_comment: str = ""
+) -> str:
+    """レポートをMarkdownに変換する。"""
+    lines = [f"# {report.title}", ""]
+    for category in report.categories:
+        lines += [f"## {escape_markdown(category.name)}", ""]
+        for article in category.articles:
+            lines.append(f"### [{escape_markdown(article.title)}]({article.url})")
+            lines.append("")
+            if article.summary:
+                lines += [article.summary, ""]
+            if article.points:
+                lines += [f"- {point}" for point in article.points]
+                lines.append("")
+    if notion_report_url:
+        lines += [f"[Notionで詳細を見る]({notion_report_url})", ""]
+    if closing_comment:
+        lines += [closing_comment, ""]
+    return "\n".join(lines)
@@ -1,40 +1,89 @@
-# rss_single_fetch.py
-import requests
-import feedparser
-
-
-def fetch_all_entries(url: str):
-    """
-    RSSフィードから全ての記事を取得してリスト形式で返す
-    """
-    all_articles = []
-    try:
-        response = requests.get(
-            url, timeout=10, headers={"User-Agent": "RSSFetcher/1.0"}
-        )
-        response.raise_for_status()
-    except Exception as e:
-        print(f"RSS取得エラー: {e}")
-        return []
-
-    feed = feedparser.parse(response.content)
-    if not feed.entries:
-        print("記事が見つかりませんでした。")
-        return []
-
-    for entry in feed.entries:
-        title = entry.get("title", "タイトルなし")
-        link = entry.get("link", "#")
-        summary = entry.get("summary", "")
-        image_url = None  # image_urlはUnsplashから取得するため、ここではNoneのまま
-
-        article = {
-            "title": title,
-            "url": link,
-            "summary": summary,
-            "image_url": image_url,
-        }
-        all_articles.append(article)
-
-        print(f"取得記事: {article['title']} ({article['url']})")
-    return all_articles
+# rss_single_fetch.py
+import time
+
+from .article import Article
+from .fast_atom import parse_atom
+from .lazy_modules import lazy_import
+
+requests = lazy_import("requests")
+feedparser = lazy_import("feedparser")
+
+
+def fetch_all_entries(url: str):
+    """
+    RSSフィードから全ての記事を取得してリスト形式で返す
+    """
+    all_articles = []
+    try:
+        response = requests.get(
+            url, timeout=10, headers={"User-Agent": "RSSFetcher/1.0"}
+        )
+        response.raise_for_status()
+    except Exception as e:
+        print(f"RSS取得エラー: {e}")
+        return []
+
+    # Googleアラート（Atom）は専用のパーサーで読み、それ以外はfeedparserで読む
+    entries = parse_atom(response.content)
+    if entries is None:
+        entries = [
+            _feedparser_fields(entry)
+            for entry in feedparser.parse(response.content).entries
+        ]
+    if not entries:
+        print("記事が見つかりませんでした。")
+        return []
+
+    for title, link, summary, published in entries:
+        article = Article(
+            url=link,
+            title=title,
+            summary=summary,
+            image_url=None,  # image_urlはUnsplashから取得するため、ここではNoneのまま
+            published=published,
+        )
+        all_articles.append(article)
+
+        print(f"取得記事: {article['title']} ({article['url']})")
+    return all_articles
+
+
+def select_recent_entries(
+    articles: list, since: str | None = None, max_entries: int = 0
+) -> tuple:
+    """
+    since（UTCのISO 8601）より後に公開された記事（Article）のみを残し、max_entries が正の場合は
+    新しい順にその件数までに絞る。公開日時のない記事は除外せず、上限では最後に回す。
+    (残した記事, 古いため除外した件数, 上限を超えたため除外した件数) を返す。
+    """
+    # 公開日時はどちらのパーサーでもUTCの同じ形式のため、文字列のまま比較できる
+    recent = [
+        article
+        for article in articles
+        if since is None or article.published is None or article.published > since
+    ]
+    too_old = len(articles) - len(recent)
+    over_cap = 0
+    if 0 < max_entries < len(recent):
+        recent.sort(key=lambda article: article.published or "", reverse=True)
+        over_cap = len(recent) - max_entries
+        recent = recent[:max_entries]
+    return recent, too_old, over_cap
+
+
+def _feedparser_fields(entry) -> tuple:
+    """feedparserのエントリから (title, link, summary, published) を取り出す。"""
+    return (
+        entry.get("title", "タイトルなし"),
+        entry.get("link", "#"),
+        entry.get("summary", ""),
+        _published_iso(entry),
+    )
+
+
+def _published_iso(entry):
+    """フィードの公開日時（なければ更新日時）をUTCのISO 8601形式で返す。"""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", parsed)
@@ -0,0 +1,55 @@
+# src/run_summary.py
+import threading
+
+
+class RunSummary:
+    """1回の実行で発生したイベント件数や縮退（スキップした処理）を集計し、最後にまとめて出力する。"""
+
+    def __init__(self):
+        self.counters = {}
+        self.degraded = []
+        self.deliveries = []
+        # 配信フェーズでは複数のスレッドから記録されるため、更新はロックで保護する
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_degradation(self, stage: str, reason: str):
+        with self._lock:
+            self.degraded.append((stage, reason))
+
+    def add_delivery(self, target: str, ok: bool, seconds: float):
+        """配信先ごとの配信結果と所要時間を記録する。"""
+        with self._lock:
+            self.deliveries.append((target, ok, seconds))
+
+    def report(self) -> str:
+        lines = ["--- 実行サマリー ---"]
+        for name, value in self.counters.items():
+            lines.append(f"  {name}: {value}")
+        if self.deliveries:
+            lines.append("  配信結果:")
+            for target, ok, seconds in self.deliveries:
+                status = "成功" if ok else "失敗"
+                lines.append(f"    - [{target}] {status} ({seconds:.2f}秒)")
+        if self.degraded:
+            lines.append("  縮退した処理:")
+            for stage, reason in self.degraded:
+                lines.append(f"    - [{stage}] {reason}")
+        else:
+            lines.append("  縮退した処理: なし")
+        summary = "\n".join(lines)
+        print(summary)
+        return summary
+
+
+# 各モジュールから参照する実行単位のサマリー。main() の開始時にリセットされる。
+run_summary = RunSummary()
+
+
+def reset_run_summary() -> RunSummary:
+    """実行サマリーを初期化して返す。"""
+    run_summary.__init__()
+    return run_summary
@@ -0,0 +1,217 @@
+# src/search_index.py
+import json
+import os
+import re
+import unicodedata
+
+from .report_model import Report
+
+# 静的サイト内の検索インデックスの保存先
+SEARCH_DIR = "search"
+# トークンを振り分けるシャード数（ブラウザは検索語のトークンを含むシャードのみを読み込む）
+INDEX_SHARDS = 64
+# 記事の表示用データ（タイトル・URL・日付）を1ファイルにまとめる件数
+DOCS_PER_SHARD = 500
+
+# 英数字は単語単位、それ以外（日本語など）は文字のバイグラムに分割する
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[^\W\da-z_]+")
+
+
+def tokenize(text: str) -> set:
+    """テキストを、NFKC正規化と小文字化をしてから検索用のトークンに分割する。"""
+    tokens = set()
+    for run in _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if run.isascii() or len(run) == 1:
+            tokens.add(run)
+        else:
+            tokens.update(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def fnv1a(token: str) -> int:
+    """トークンの32ビットのFNV-1aハッシュ（実行やプロセスによらず同じ値になる）。"""
+    digest = 0x811C9DC5
+    for byte in token.encode("utf-8"):
+        digest = ((digest ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return digest
+
+
+def shard_of(token: str, shards: int = INDEX_SHARDS) -> int:
+    """トークンのシャード番号を返す。ブラウザでも同じ計算ができるようFNV-1aを使う。"""
+    return fnv1a(token) % shards
+
+
+def _article_tokens(title: str, summary: str, points) -> set:
+    return tokenize(" ".join([title, summary, *points]))
+
+
+class SearchIndex:
+    """
+    静的サイト用の転置インデックス（トークン→記事IDの昇順リスト）。
+    インデックスはトークンのシャードごとのJSONに分けて保存し、1回の更新では今回の記事の
+    トークンを含むシャードと、最後の記事データのシャードのみを読み書きする。
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, SEARCH_DIR)
+        self.meta = self._load("meta.json", {"shards": INDEX_SHARDS, "next_id": 0})
+        self._index_shards = {}
+        self._doc_shards = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _load(self, name: str, default):
+        try:
+            with open(self._path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return default
+
+    def _save(self, name: str, data):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _index_shard(self, token: str) -> dict:
+        shard = shard_of(token, self.meta["shards"])
+        if shard not in self._index_shards:
+            self._index_shards[shard] = self._load(f"index/{shard:02x}.json", {})
+        return self._index_shards[shard]
+
+    def _doc_shard(self, doc_id: int) -> list:
+        shard = doc_id // DOCS_PER_SHARD
+        if shard not in self._doc_shards:
+            self._doc_shards[shard] = self._load(f"docs/{shard}.json", [])
+        return self._doc_shards[shard]
+
+    def _remove_report(self, report_date: str):
+        """同じ日付のレポートを置き換えるため、以前に登録した記事をインデックスから外す。"""
+        for doc_id in self._load(f"reports/{report_date}.json", []):
+            doc = self._doc_shard(doc_id)[doc_id % DOCS_PER_SHARD]
+            if doc is None:
+                continue
+            for token in _article_tokens(*doc["text"]):
+                postings = self._index_shard(token).get(token, [])
+                if doc_id in postings:
+                    postings.remove(doc_id)
+                    if not postings:
+                        del self._index_shard(token)[token]
+            self._doc_shard(doc_id)[doc_id % DOCS_PER_SHARD] = None
+
+    def add_report(self, report: Report) -> int:
+        """レポートの記事をインデックスに追加し、追加した記事数を返す。"""
+        self._remove_report(report.report_date)
+        doc_ids = []
+        for article in report.articles():
+            doc_id = self.meta["next_id"]
+            self.meta["next_id"] += 1
+            doc_ids.append(doc_id)
+            text = [article.title, article.summary, list(article.points)]
+            self._doc_shard(doc_id).append(
+                {
+                    "title": article.title,
+                    "url": article.url,
+                    "date": report.report_date,
+                    "text": text,
+                }
+            )
+            for token in _article_tokens(*text):
+                # IDは単調に増えるため、末尾に追加するだけで昇順が保たれる
+                self._index_shard(token).setdefault(token, []).append(doc_id)
+
+        for shard, postings in self._index_shards.items():
+            self._save(f"index/{shard:02x}.json", postings)
+        for shard, docs in self._doc_shards.items():
+            self._save(f"docs/{shard}.json", docs)
+        self._save(f"reports/{report.report_date}.json", doc_ids)
+        self._save("meta.json", self.meta)
+        return len(doc_ids)
+
+    def search(self, query: str) -> list:
+        """すべてのトークンを含む記事を、新しい順に返す（ブラウザの検索と同じ処理）。"""
+        result = None
+        for token in tokenize(query):
+            postings = set(self._index_shard(token).get(token, []))
+            result = postings if result is None else result & postings
+        return [
+            self._doc_shard(doc_id)[doc_id % DOCS_PER_SHARD]
+            for doc_id in sorted(result or (), reverse=True)
+        ]
+
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>記事検索</title>
+</head>
+<body>
+<nav><a href="index.html">AIニュースレポート</a></nav>
+<h1>記事検索</h1>
+<input id="q" type="search" placeholder="キーワード">
+<ul id="results"></ul>
+<script>
+const SHARDS = __SHARDS__, DOCS_PER_SHARD = __DOCS_PER_SHARD__;
+const cache = {};
+const load = (path) => cache[path] ??= fetch(path).then((r) => (r.ok ? r.json() : null));
+function tokenize(text) {
+  const tokens = new Set();
+  const runs = text.normalize("NFKC").toLowerCase().match(/[a-z0-9]+|[^\\P{L}a-z]+/gu) || [];
+  for (const run of runs) {
+    const chars = [...run];
+    if (/^[\\x00-\\x7f]+$/.test(run) || chars.length === 1) tokens.add(run);
+    else for (let i = 0; i < chars.length - 1; i++) tokens.add(chars[i] + chars[i + 1]);
+  }
+  return [...tokens];
+}
+function shardOf(token) {
+  let h = 0x811c9dc5;
+  for (const b of new TextEncoder().encode(token)) h = Math.imul(h ^ b, 0x01000193) >>> 0;
+  return (h % SHARDS).toString(16).padStart(2, "0");
+}
+async function search(query) {
+  let ids = null;
+  for (const token of tokenize(query)) {
+    const shard = (await load(`search/index/${shardOf(token)}.json`)) || {};
+    const postings = new Set(shard[token] || []);
+    ids = ids === null ? postings : new Set([...ids].filter((id) => postings.has(id)));
+  }
+  const docs = [];
+  for (const id of [...(ids || [])].sort((a, b) => b - a).slice(0, 100)) {
+    const shard = await load(`search/docs/${Math.floor(id / DOCS_PER_SHARD)}.json`);
+    if (shard && shard[id % DOCS_PER_SHARD]) docs.push(shard[id % DOCS_PER_SHARD]);
+  }
+  return docs;
+}
+document.getElementById("q").addEventListener("change", async (event) => {
+  const list = document.getElementById("results");
+  list.replaceChildren();
+  for (const doc of await search(event.target.value)) {
+    const item = document.createElement("li");
+    // http(s)以外のURL（javascript: など）はリンクにしない
+    if (/^https?:/i.test(doc.url)) {
+      const link = document.createElement("a");
+      link.href = doc.url;
+      link.textContent = doc.title;
+      item.append(link);
+    } else {
+      item.append(doc.title);
+    }
+    item.append(`（${doc.date}）`);
+    list.append(item);
+  }
+});
+</script>
+</body>
+</html>
+"""
+
+
+def render_search_page() -> str:
+    return SEARCH_PAGE.replace("__SHARDS__", str(INDEX_SHARDS)).replace(
+        "__DOCS_PER_SHARD__", str(DOCS_PER_SHARD)
+    )
@@ -1,105 +1,307 @@
-import requests
+import functools
 import json
 import os
+import time
+from dataclasses import dataclass
 
+from .lazy_modules import lazy_import
+from .report_model import (
+    Report,
+    build_report,
+    escape_slack,
+    slack_article_heading,
+    truncate_mrkdwn,
+)
+from .utils import SLACK_HEADER_BUDGET, SLACK_SECTION_BUDGET
 
-def send_slack_message(
-    webhook_url, channel, notion_report_url, news_articles, report_date, closing_comment
-):
-    message_blocks = [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": f"AIニュースレポート - {report_date}",
-                "emoji": True,
-            },
+requests = lazy_import("requests")
+
+# Slackの上限: 1メッセージあたりのブロック数と、sectionのテキストの文字数
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_SECTION_TEXT = SLACK_SECTION_BUDGET.limit
+SLACK_MAX_HEADER_TEXT = SLACK_HEADER_BUDGET.limit
+# 送信失敗時の最大再試行回数と、指数バックオフの初回の待ち時間（秒）
+SLACK_MAX_RETRIES = 3
+SLACK_RETRY_BASE_DELAY = 1.0
+SLACK_TIMEOUT = 10
+# 配信先ごとの表示オプションで取り除くブロックの block_id の接頭辞
+POINTS_BLOCK_ID = "points"
+CLOSING_COMMENT_BLOCK_ID = "closing_comment"
+
+
+@dataclass(slots=True)
+class SlackTarget:
+    """
+    通知の配信先（Webhookとチャンネル）と、配信先ごとの表示オプション。
+    - include_points: 初学者向けポイントを表示する
+    - include_closing_comment: クロージングコメントを表示する
+    - mention: 1通目の先頭に付けるメンション（例: "<!here>"）
+    """
+
+    name: str
+    webhook_url: str
+    channel: str
+    include_points: bool = True
+    include_closing_comment: bool = True
+    mention: str | None = None
+
+
+def load_slack_targets() -> list:
+    """
+    配信先の一覧を環境変数から読み込む。SLACK_TARGETS にJSONの配列が設定されている場合は
+    その配信先を、設定されていない場合は SLACK_WEBHOOK_URL と SLACK_CHANNEL の1件を返す。
+    Webhook URLは webhook_url で直接、または webhook_env でそれを格納する環境変数名を指定する。
+    """
+    targets_json = os.environ.get("SLACK_TARGETS")
+    if not targets_json:
+        webhook_url = os.environ.get("SLACK_WEBHOOK_URL")
+        if not webhook_url:
+            return []
+        # 設定されていない場合は#ai-newsをデフォルトとする
+        channel = os.environ.get("SLACK_CHANNEL", "#ai-news")
+        return [SlackTarget(name=channel, webhook_url=webhook_url, channel=channel)]
+
+    targets = []
+    for config in json.loads(targets_json):
+        webhook_url = config.get("webhook_url") or os.environ.get(
+            config.get("webhook_env", "")
+        )
+        if not webhook_url:
+            print(
+                f"警告: Slackの配信先 '{config.get('name')}' のWebhook URLが設定されていないため、スキップします。"
+            )
+            continue
+        targets.append(
+            SlackTarget(
+                name=config["name"],
+                webhook_url=webhook_url,
+                channel=config.get("channel", "#ai-news"),
+                include_points=config.get("include_points", True),
+                include_closing_comment=config.get("include_closing_comment", True),
+                mention=config.get("mention"),
+            )
+        )
+    return targets
+
+
+@functools.cache
+def _session():
+    """接続を再利用するため、Webhookへの送信は1つのセッションで行う。"""
+    return requests.Session()
+
+
+def _section(text: str, block_id: str | None = None) -> dict:
+    block = {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": truncate_mrkdwn(text, SLACK_MAX_SECTION_TEXT),
         },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "データサイエンス、データエンジニアリング、データ分析の学習者の皆さん、最新のAIニュースで知識をアップデートし、日々の学習に活かしましょう！今日のニュースが、皆さんの次のステップへのヒントになることを願っています。",
+    }
+    if block_id:
+        block["block_id"] = block_id
+    return block
+
+
+def build_message_groups(
+    notion_report_url, news_articles, report_date, closing_comment
+) -> list:
+    """記事の一覧からレポートを組み立て、Slackのメッセージのグループに変換する。"""
+    return render_slack_groups(
+        build_report(news_articles, report_date), notion_report_url, closing_comment
+    )
+
+
+def render_slack_groups(report: Report, notion_report_url, closing_comment) -> list:
+    """
+    メッセージのブロックを、分割時に同じメッセージに収めるまとまり（グループ）ごとに返す。
+    カテゴリ見出しは最初の記事と同じグループにする。配信先ごとのオプションで取り除けるよう、
+    ポイントとクロージングコメントのブロックには block_id を付ける。
+    """
+    groups = [
+        [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": SLACK_HEADER_BUDGET.fit(report.title),
+                    "emoji": True,
+                },
             },
-        },
-        {"type": "divider"},
+            _section(
+                "データサイエンス、データエンジニアリング、データ分析の学習者の皆さん、最新のAIニュースで知識をアップデートし、日々の学習に活かしましょう！今日のニュースが、皆さんの次のステップへのヒントになることを願っています。"
+            ),
+            {"type": "divider"},
+        ]
     ]
 
-    # カテゴリごとにニュースを整理
-    categories = {}
-    for article in news_articles:
-        category = article.get("category", "その他")
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(article)
-
-    for category, articles in categories.items():
-        message_blocks.append(
-            {"type": "section", "text": {"type": "mrkdwn", "text": f"*【{category}】*"}}
-        )
-        for article in articles:
-            message_blocks.append(
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*<{article['url']}|{article['title']}>*\n{article['summary']}",
-                    },
-                }
+    article_number = 0
+    for category in report.categories:
+        category_heading = _section(f"*【{escape_slack(category.name)}】*")
+        for index, article in enumerate(category.articles):
+            article_number += 1
+            group = [category_heading] if index == 0 else []
+            group.append(
+                _section(
+                    slack_article_heading(article.url, article.slack_title)
+                    + article.slack_summary
+                )
             )
-            if article.get("points"):
-                points_list_formatted = [f"- {p}" for p in article["points"]]
+            if article.slack_points:
                 points_text_block = "*初学者向けポイント:*\n" + "\n".join(
-                    points_list_formatted
+                    f"- {point}" for point in article.slack_points
                 )
-                message_blocks.append(
-                    {
-                        "type": "section",
-                        "text": {"type": "mrkdwn", "text": points_text_block},
-                    }
+                group.append(
+                    _section(
+                        points_text_block,
+                        block_id=f"{POINTS_BLOCK_ID}-{article_number}",
+                    )
                 )
-            # 個別の記事に対する「会話を促すコメント」のブロックは削除
-
-            message_blocks.append({"type": "divider"})
+            group.append({"type": "divider"})
+            groups.append(group)
 
+    footer = []
     if notion_report_url:
-        message_blocks.append(
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"Notionで詳細を見る: <{notion_report_url}|AIニュースレポート - {report_date}>",
-                },
-            }
+        footer.append(
+            _section(f"Notionで詳細を見る: <{notion_report_url}|{report.title}>")
         )
-
     # クロージングコメントを追加
     if closing_comment:
-        message_blocks.append(
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": closing_comment,
-                },
-            }
-        )
+        footer.append(_section(closing_comment, block_id=CLOSING_COMMENT_BLOCK_ID))
+    if footer:
+        groups.append(footer)
+    return groups
+
+
+def apply_target_options(groups: list, target: SlackTarget) -> list:
+    """組み立て済みのグループから、配信先のオプションに応じてブロックを取り除く・追加する。"""
+    excluded = []
+    if not target.include_points:
+        excluded.append(POINTS_BLOCK_ID)
+    if not target.include_closing_comment:
+        excluded.append(CLOSING_COMMENT_BLOCK_ID)
+    if excluded:
+        prefixes = tuple(excluded)
+        groups = [
+            [
+                block
+                for block in group
+                if not block.get("block_id", "").startswith(prefixes)
+            ]
+            for group in groups
+        ]
+        groups = [group for group in groups if group]
+    if target.mention:
+        groups = [[_section(target.mention)], *groups]
+    return groups
+
 
-    slack_data = {"channel": channel, "blocks": message_blocks}
+def pack_messages(groups: list, max_blocks: int = SLACK_MAX_BLOCKS) -> list:
+    """グループを分割せずに、できるだけ少ないメッセージに順番に詰める。"""
+    messages = []
+    current = []
+    for group in groups:
+        for start in range(0, len(group), max_blocks):
+            chunk = group[start : start + max_blocks]
+            if current and len(current) + len(chunk) > max_blocks:
+                messages.append(current)
+                current = []
+            current.extend(chunk)
+    if current:
+        messages.append(current)
+    return messages
 
-    try:
-        response = requests.post(
-            webhook_url,
-            data=json.dumps(slack_data),
-            headers={"Content-Type": "application/json"},
+
+def _retry_delay(response, attempt: int):
+    """再試行までの待ち時間を返す。再試行すべきでない場合はNoneを返す。"""
+    if response is not None and response.status_code == 429:
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            pass
+    elif response is not None and response.status_code < 500:
+        return None
+    return SLACK_RETRY_BASE_DELAY * 2**attempt
+
+
+def post_to_slack(webhook_url: str, payload: dict) -> bool:
+    """Webhookにペイロードを送信する。429はRetry-Afterに従い、5xxと通信エラーは再試行する。"""
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        response = None
+        try:
+            response = _session().post(
+                webhook_url,
+                data=json.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=SLACK_TIMEOUT,
+            )
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Slack通知の送信中にエラーが発生しました: {e}")
+            print(f"レスポンス: {response.text if response is not None else 'N/A'}")
+            delay = _retry_delay(response, attempt)
+            if delay is None or attempt == SLACK_MAX_RETRIES:
+                return False
+            print(
+                f"  - {delay:.1f}秒後に再送します ({attempt + 1}/{SLACK_MAX_RETRIES})"
+            )
+            time.sleep(delay)
+    return False
+
+
+def send_slack_message(
+    webhook_url,
+    channel,
+    notion_report_url,
+    news_articles,
+    report_date,
+    closing_comment,
+    start_part: int = 0,
+    on_part_sent=None,
+    groups=None,
+    target: SlackTarget | None = None,
+):
+    """
+    レポートをSlackに送信する。ブロック数の上限を超える場合は複数のメッセージに分け、
+    順番に送信する（Incoming Webhookはスレッドに返信できないため、続きは後続の投稿になる）。
+    start_part 通目までは送信済みとしてスキップし、送信するごとに on_part_sent(送信済み件数) を呼ぶ。
+    複数の配信先に送る場合は、build_message_groups で一度だけ組み立てた groups と
+    配信先の target を渡す。
+    """
+    if groups is None:
+        groups = build_message_groups(
+            notion_report_url, news_articles, report_date, closing_comment
         )
-        response.raise_for_status()
-        print("Slack通知が正常に送信されました。")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Slack通知の送信中にエラーが発生しました: {e}")
-        print(f"レスポンス: {response.text if response else 'N/A'}")
-        return False
+    if target is not None:
+        groups = apply_target_options(groups, target)
+    # 2通目以降の先頭に「続き」の見出しを付けるため、1ブロック分の余裕を残して詰める
+    messages = pack_messages(groups, SLACK_MAX_BLOCKS - 1)
+    title = f"AIニュースレポート - {report_date}"
+
+    for index, message_blocks in enumerate(messages, start=1):
+        if index <= start_part:
+            continue
+        if index > 1:
+            continuation = {
+                "type": "context",
+                "elements": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"{title}（続き {index}/{len(messages)}）",
+                    }
+                ],
+            }
+            message_blocks = [continuation, *message_blocks]
+        slack_data = {"channel": channel, "text": title, "blocks": message_blocks}
+        if not post_to_slack(webhook_url, slack_data):
+            print(f"Slack通知の送信に失敗しました（{index}/{len(messages)}通目）。")
+            return False
+        if on_part_sent is not None:
+            on_part_sent(index)
+
+    print(f"Slack通知が正常に送信されました（{len(messages)}通）。")
+    return True
 
 
 if __name__ == "__main__":
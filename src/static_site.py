@@ -0,0 +1,265 @@
+# src/static_site.py
+import hashlib
+import html
+import json
+import os
+import re
+
+from .atom_feed import FeedWriter
+from .report_model import REPORT_TITLE, Report, render_markdown
+from .search_index import SearchIndex, render_search_page
+
+# 静的サイトの出力先（SITE_DIR で変更可能）
+DEFAULT_SITE_DIR = "site"
+# インクリメンタルビルドの状態（ページのハッシュや一覧のデータ）の保存先（サイト内の相対パス）
+DATA_DIR = "_data"
+# 月をまたいで更新されるページ（トップページ・カテゴリのトップ）のハッシュ
+MANIFEST_NAME = "manifest.json"
+# トップページに載せる最新レポートの件数
+INDEX_RECENT_REPORTS = 30
+
+_SLUG_PATTERN = re.compile(r"[^\w-]+")
+# 記事へのリンクとして出力するURL（javascript: などはリンクにしない）
+_LINK_URL_PATTERN = re.compile(r"https?://", re.IGNORECASE)
+
+
+def site_dir() -> str:
+    return os.environ.get("SITE_DIR", DEFAULT_SITE_DIR)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def category_slug(name: str) -> str:
+    """カテゴリ名をファイル名に使えるスラッグに変換する（日本語はそのまま残す）。"""
+    return _SLUG_PATTERN.sub("-", name).strip("-").lower() or "other"
+
+
+class SiteBuilder:
+    """
+    レポートのアーカイブをMarkdown/HTMLの静的サイトとしてインクリメンタルに生成する。
+    ページのハッシュと一覧用のデータを _data/ に保存し、1回の更新では新しいレポートの
+    ページ、そのレポートに関係するカテゴリの月別ページとフィード、月別アーカイブ、
+    トップページ、レポートのフィードと検索インデックスのみを生成する。ページと
+    マニフェストはどちらも月単位・件数上限付きのデータから生成するため、
+    アーカイブが増えても1回の更新にかかる時間は変わらない。
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = root or site_dir()
+        self.manifest = self._load(MANIFEST_NAME, {"pages": {}})
+        self.written = []
+
+    def _data_path(self, name: str) -> str:
+        return os.path.join(self.root, DATA_DIR, name)
+
+    def _load(self, name: str, default):
+        try:
+            with open(self._data_path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return default
+
+    def _save(self, name: str, data):
+        self._write(os.path.join(DATA_DIR, name), json.dumps(data, ensure_ascii=False))
+
+    def _write(self, relative_path: str, content: str):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _write_page(self, manifest: dict, relative_path: str, content: str):
+        """内容のハッシュがマニフェストと同じページは書き込まない。"""
+        digest = content_hash(content)
+        if manifest["pages"].get(relative_path) == digest:
+            return
+        self._write(relative_path, content)
+        manifest["pages"][relative_path] = digest
+        self.written.append(relative_path)
+
+    def add_report(self, report: Report, closing_comment: str = "") -> list:
+        """
+        レポートをサイトに追加（同じ日付のレポートは置き換え）し、書き込んだページの
+        一覧を返す。内容が前回と同じ場合は何もしない。
+        """
+        markdown = render_markdown(report, closing_comment=closing_comment)
+        digest = content_hash(markdown)
+        date = report.report_date
+        month = date[:7]
+        month_manifest_name = f"manifests/{month}.json"
+        month_manifest = self._load(month_manifest_name, {"reports": {}, "pages": {}})
+        previous = month_manifest["reports"].get(date, {})
+        if previous.get("hash") == digest:
+            return []
+
+        slugs = {c.name: category_slug(c.name) for c in report.categories}
+        self._write_page(month_manifest, f"reports/{date}.md", markdown)
+        self._write_page(
+            month_manifest,
+            f"reports/{date}.html",
+            render_report_html(report, closing_comment, slugs),
+        )
+
+        # 今回のレポートから消えたカテゴリも、そのページから記事を取り除くため更新する
+        names = dict(previous.get("categories", {}))
+        names.update({slug: name for name, slug in slugs.items()})
+        for slug, name in names.items():
+            self._update_category(month_manifest, slug, name, month, report)
+
+        self._update_archive(month_manifest, report, month)
+        feeds = FeedWriter(self.root).add_report(
+            report, closing_comment, {name: slug for slug, name in names.items()}
+        )
+        for path, feed in feeds.items():
+            self._write_page(self.manifest, path, feed)
+        SearchIndex(self.root).add_report(report)
+        self._write_page(self.manifest, "search.html", render_search_page())
+        month_manifest["reports"][date] = {
+            "hash": digest,
+            "categories": {slug: name for name, slug in slugs.items()},
+        }
+        self._save(month_manifest_name, month_manifest)
+        self._save(MANIFEST_NAME, self.manifest)
+        return self.written
+
+    def _update_category(
+        self, month_manifest: dict, slug: str, name: str, month: str, report: Report
+    ):
+        data_name = f"categories/{slug}/{month}.json"
+        entries = self._load(data_name, {})
+        category = next((c for c in report.categories if c.name == name), None)
+        if category is None:
+            entries.pop(report.report_date, None)
+        else:
+            entries[report.report_date] = [
+                {"title": a.title, "url": a.url, "summary": a.summary}
+                for a in category.articles
+            ]
+        self._save(data_name, entries)
+
+        months_name = f"categories/{slug}/months.json"
+        months = self._load(months_name, [])
+        if month not in months:
+            months = sorted([*months, month], reverse=True)
+            self._save(months_name, months)
+        page = render_category_html(name, month, entries, months)
+        self._write_page(month_manifest, f"categories/{slug}/{month}.html", page)
+        if month == months[0]:
+            self._write_page(self.manifest, f"categories/{slug}/index.html", page)
+
+    def _update_archive(self, month_manifest: dict, report: Report, month: str):
+        summary = {
+            "date": report.report_date,
+            "title": report.title,
+            "articles": report.article_count,
+            "categories": [c.name for c in report.categories],
+        }
+        month_name = f"months/{month}.json"
+        reports = [
+            r for r in self._load(month_name, []) if r["date"] != summary["date"]
+        ]
+        reports = sorted([*reports, summary], key=lambda r: r["date"], reverse=True)
+        self._save(month_name, reports)
+
+        months = self._load("months.json", [])
+        if month not in months:
+            months = sorted([*months, month], reverse=True)
+            self._save("months.json", months)
+        self._write_page(
+            month_manifest, f"archive/{month}.html", render_archive_html(month, reports)
+        )
+
+        recent = [
+            r for r in self._load("recent.json", []) if r["date"] != summary["date"]
+        ]
+        recent = sorted([*recent, summary], key=lambda r: r["date"], reverse=True)
+        recent = recent[:INDEX_RECENT_REPORTS]
+        self._save("recent.json", recent)
+        self._write_page(self.manifest, "index.html", render_index_html(recent, months))
+
+
+def publish_static_site(report: Report, closing_comment: str = "") -> list:
+    """SITE_DIR にレポートを追加し、書き込んだページの一覧を返す。"""
+    builder = SiteBuilder()
+    written = builder.add_report(report, closing_comment)
+    print(f"静的サイトを更新しました（{len(written)}ページ）: {builder.root}")
+    return written
+
+
+def _page(title: str, body: str, depth: int) -> str:
+    root = "../" * depth
+    return (
+        "<!DOCTYPE html>\n"
+        '<html lang="ja">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{html.escape(title)}</title>\n"
+        '<link rel="alternate" type="application/atom+xml" '
+        f'href="{root}feeds/atom.xml">\n'
+        "</head>\n<body>\n"
+        f'<nav><a href="{root}index.html">{REPORT_TITLE}</a></nav>\n'
+        f"<h1>{html.escape(title)}</h1>\n{body}</body>\n</html>\n"
+    )
+
+
+def article_link(url: str, title: str) -> str:
+    """http(s)のURLはリンクに、それ以外のURLはタイトルのみのテキストにする。"""
+    if not _LINK_URL_PATTERN.match(url or ""):
+        return html.escape(title)
+    return f'<a href="{html.escape(url)}">{html.escape(title)}</a>'
+
+
+def render_report_html(report: Report, closing_comment: str, slugs: dict) -> str:
+    parts = []
+    for category in report.categories:
+        href = f"../categories/{slugs[category.name]}/index.html"
+        parts.append(f'<h2><a href="{href}">{html.escape(category.name)}</a></h2>\n')
+        for article in category.articles:
+            parts.append(
+                f"<h3>{article_link(article.url, article.title)}</h3>\n"
+                f"<p>{html.escape(article.summary)}</p>\n"
+            )
+            if article.points:
+                items = "".join(f"<li>{html.escape(p)}</li>" for p in article.points)
+                parts.append(f"<ul>{items}</ul>\n")
+    if closing_comment:
+        parts.append(f"<p>{html.escape(closing_comment)}</p>\n")
+    return _page(report.title, "".join(parts), depth=1)
+
+
+def render_category_html(name: str, month: str, entries: dict, months: list) -> str:
+    parts = []
+    for date in sorted(entries, reverse=True):
+        parts.append(f'<h2><a href="../../reports/{date}.html">{date}</a></h2>\n<ul>\n')
+        for article in entries[date]:
+            parts.append(f"<li>{article_link(article['url'], article['title'])}</li>\n")
+        parts.append("</ul>\n")
+    links = " ".join(f'<a href="{m}.html">{m}</a>' for m in months)
+    parts.append(f"<nav>{links}</nav>\n")
+    return _page(f"{name}（{month}）", "".join(parts), depth=2)
+
+
+def render_archive_html(month: str, reports: list) -> str:
+    items = "".join(
+        f'<li><a href="../reports/{r["date"]}.html">{html.escape(r["title"])}</a>'
+        f"（{r['articles']}件）</li>\n"
+        for r in reports
+    )
+    return _page(f"{month}のレポート", f"<ul>\n{items}</ul>\n", depth=1)
+
+
+def render_index_html(recent: list, months: list) -> str:
+    items = "".join(
+        f'<li><a href="reports/{r["date"]}.html">{html.escape(r["title"])}</a>'
+        f"（{r['articles']}件）</li>\n"
+        for r in recent
+    )
+    links = "".join(f'<li><a href="archive/{m}.html">{m}</a></li>\n' for m in months)
+    body = (
+        '<p><a href="search.html">記事を検索</a></p>\n'
+        f"<h2>最新のレポート</h2>\n<ul>\n{items}</ul>\n"
+        f"<h2>アーカイブ</h2>\n<ul>\n{links}</ul>\n"
+    )
+    return _page(REPORT_TITLE, body, depth=0)
@@ -0,0 +1,177 @@
+# src/unsplash.py
+import functools
+import os
+import re
+import threading
+import time
+
+from . import local_cache
+from .lazy_modules import lazy_import
+from .run_summary import run_summary
+from .utils import UNSPLASH_QUERY_BUDGET, normalize_text
+
+requests = lazy_import("requests")
+
+UNSPLASH_SEARCH_URL = "https://api.unsplash.com/search/photos"
+UNSPLASH_TIMEOUT = 5
+# 並行して検索する際に再利用する接続数
+UNSPLASH_POOL_SIZE = 8
+# 検索結果のキャッシュと、APIの利用回数の保存先
+CACHE_NAME = "unsplash_cache.json"
+QUOTA_NAME = "unsplash_quota.json"
+# 検索結果のキャッシュの有効期間（時間、UNSPLASH_CACHE_TTL_HOURS で変更可能）
+DEFAULT_CACHE_TTL_HOURS = 168
+# 1時間あたりのリクエスト数の上限（UNSPLASH_HOURLY_LIMIT で変更可能）。デモアプリの上限に合わせる
+DEFAULT_HOURLY_LIMIT = 50
+QUOTA_WINDOW_SECONDS = 3600
+
+_KEYWORD_SEPARATORS = re.compile(r"[,、，\s]+")
+# キャッシュと利用回数は複数のスレッドから更新されるため、読み書きはロックで保護する
+_lock = threading.Lock()
+
+
+def unsplash_query(keywords: str) -> str:
+    """キーワードを正規化し、検索クエリの上限に収まるよう単語の区切りで短くする。"""
+    normalized = " ".join(normalize_text(keywords).split())
+    query = UNSPLASH_QUERY_BUDGET.fit(normalized)
+    if len(query) < len(normalized) and " " in query:
+        query = query.rsplit(" ", 1)[0]
+    return query
+
+
+def keyword_key(keywords: str) -> str:
+    """キーワードの集合（順序・大文字小文字・重複を区別しない）をキャッシュのキーにする。"""
+    words = _KEYWORD_SEPARATORS.split(normalize_text(keywords).lower())
+    return ",".join(sorted({word for word in words if word}))
+
+
+@functools.cache
+def _session():
+    """並行に検索しても接続を再利用できるよう、接続プール付きのセッションを共有する。"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=UNSPLASH_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def _cache_ttl_seconds() -> float:
+    hours = float(os.environ.get("UNSPLASH_CACHE_TTL_HOURS", DEFAULT_CACHE_TTL_HOURS))
+    return hours * 3600
+
+
+def _cached_result(key: str, now: float) -> tuple:
+    """(キャッシュにあるか, 画像URL) を返す。画像が見つからなかった結果もキャッシュする。"""
+    with _lock:
+        entry = local_cache.load_json(CACHE_NAME, {}).get(key)
+    if entry is None or now - entry["fetched_at"] >= _cache_ttl_seconds():
+        return False, None
+    return True, entry["url"]
+
+
+def _store_result(key: str, url: str | None, now: float):
+    with _lock:
+        ttl = _cache_ttl_seconds()
+        cache = {
+            k: v
+            for k, v in local_cache.load_json(CACHE_NAME, {}).items()
+            if now - v["fetched_at"] < ttl
+        }
+        cache[key] = {"url": url, "fetched_at": now}
+        local_cache.save_json(CACHE_NAME, cache)
+
+
+def _reserve_request(now: float) -> bool:
+    """
+    直近1時間のリクエスト数が上限未満で、APIが返した残り回数も0でなければ、
+    リクエスト1回分を記録して True を返す。
+    """
+    limit = int(os.environ.get("UNSPLASH_HOURLY_LIMIT", DEFAULT_HOURLY_LIMIT))
+    with _lock:
+        quota = local_cache.load_json(QUOTA_NAME, {})
+        recent = [
+            t for t in quota.get("requests", []) if now - t < QUOTA_WINDOW_SECONDS
+        ]
+        exhausted = (
+            quota.get("remaining") == 0
+            and now - quota.get("remaining_at", 0) < QUOTA_WINDOW_SECONDS
+        )
+        if len(recent) >= limit or exhausted:
+            return False
+        quota["requests"] = [*recent, now]
+        local_cache.save_json(QUOTA_NAME, quota)
+        return True
+
+
+def _record_remaining(headers, now: float):
+    """APIが返した残りのリクエスト数（X-Ratelimit-Remaining）を記録する。"""
+    remaining = headers.get("X-Ratelimit-Remaining")
+    if remaining is None:
+        return
+    with _lock:
+        quota = local_cache.load_json(QUOTA_NAME, {})
+        quota["remaining"] = int(remaining)
+        quota["remaining_at"] = now
+        local_cache.save_json(QUOTA_NAME, quota)
+
+
+def search_image_from_unsplash(keywords: str) -> str | None:
+    """
+    Unsplash APIを使用して、キーワードに基づいて画像を検索し、画像URLを返す。
+    結果はキーワードの集合ごとにキャッシュし、1時間あたりの上限に達する場合は検索しない。
+    """
+    unsplash_access_key = os.environ.get("UNSPLASH_ACCESS_KEY")
+    if not unsplash_access_key:
+        print(
+            "警告: UNSPLASH_ACCESS_KEY 環境変数が設定されていません。Unsplashからの画像検索をスキップします。"
+        )
+        return None
+
+    if not keywords:
+        return None
+    keywords = unsplash_query(keywords)
+    key = keyword_key(keywords)
+    now = time.time()
+    hit, image_url = _cached_result(key, now)
+    if hit:
+        run_summary.incr("unsplash_cache_hits")
+        return image_url
+    if not _reserve_request(now):
+        print(
+            "警告: Unsplash APIの1時間あたりの上限に達するため、画像検索をスキップします。"
+        )
+        run_summary.incr("unsplash_quota_skipped")
+        return None
+
+    try:
+        response = _session().get(
+            UNSPLASH_SEARCH_URL,
+            headers={"Authorization": f"Client-ID {unsplash_access_key}"},
+            params={
+                "query": keywords,
+                "orientation": "landscape",  # 横長の画像を優先
+                "per_page": 1,
+            },
+            timeout=UNSPLASH_TIMEOUT,
+        )
+        _record_remaining(response.headers, now)
+        response.raise_for_status()
+        data = response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Unsplash API呼び出し中にエラーが発生しました: {e}")
+        return None
+    except ValueError as e:
+        # JSONとして読めないレスポンスや、数値でない X-Ratelimit-Remaining
+        print(f"Unsplashからの画像検索中に予期せぬエラーが発生しました: {e}")
+        return None
+
+    if data and data["results"]:
+        # 最初の結果のregularサイズの画像URLを返す
+        image_url = data["results"][0]["urls"]["regular"]
+    else:
+        print(
+            f"Unsplashでキーワード '{keywords}' に一致する画像が見つかりませんでした。"
+        )
+    _store_result(key, image_url, now)
+    return image_url
@@ -1,16 +1,156 @@
 # src/utils.py
+import functools
+import html
 import re
-import html  # 追加
+import unicodedata
+from dataclasses import dataclass
+
+# script/styleの本文・コメント・タグを1つのパターンで除去する（アクセスのたびにコンパイルしない）
+_MARKUP_PATTERN = re.compile(
+    r"<(script|style)\b[^>]*>.*?</\1\s*>"  # script/style は本文ごと除去
+    r"|<!--.*?-->"
+    r"|</?[a-zA-Z!?][^>]*>",
+    re.DOTALL | re.IGNORECASE,
+)
+_ENTITY_PATTERN = re.compile(r"&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);?")
+
+# 直前の文字と1つの書記素（見た目の1文字）になる文字
+_ZERO_WIDTH_JOINER = "\u200d"
+# 結合文字（濁点・アクセントなど）
+_EXTENDING_CATEGORIES = frozenset({"Mn", "Me", "Mc"})
+_EXTENDING_RANGES = (
+    (0xFE00, 0xFE0F),  # 異体字セレクタ（絵文字表示の指定など）
+    (0x1F3FB, 0x1F3FF),  # 絵文字の肌の色
+    (0xE0020, 0xE007F),  # タグ文字（サブディビジョンの旗）
+    (0xE0100, 0xE01EF),  # 異体字セレクタ補助
+)
+_REGIONAL_INDICATORS = (0x1F1E6, 0x1F1FF)  # 2文字で1つの国旗になる
+
+
+@functools.lru_cache(maxsize=512)
+def _decode_entity(entity: str) -> str:
+    return html.unescape(entity)
+
+
+def _replace_entity(match) -> str:
+    return _decode_entity(match.group(0))
 
 
 def remove_html_tags(text: str) -> str:
     """
-    テキストからHTMLタグとHTMLエンティティを除去します。
+    テキストからHTMLタグ（script/styleは本文ごと）を除去し、HTMLエンティティをデコードして、
+    連続する空白（改行・ノーブレークスペースを含む）を1つのスペースにまとめる。
+    タグを除去してからデコードするため、エスケープされた &lt;b&gt; は文字として残る。
+    タグ・エンティティを含まないテキストでは、その処理は行わない。
+    """
+    if "<" in text:
+        text = _MARKUP_PATTERN.sub("", text)
+    if "&" in text:
+        text = _ENTITY_PATTERN.sub(_replace_entity, text)
+    return " ".join(text.split())
+
+
+def utf16_length(text: str) -> int:
+    """NotionなどUTF-16で文字数を数えるシンク向けの長さを返す。"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def normalize_text(text: str) -> str:
+    """テキストをNFKC正規化する（全角英数字・半角カナ・互換文字などを統一する）。"""
+    if unicodedata.is_normalized("NFKC", text):
+        return text
+    return unicodedata.normalize("NFKC", text)
+
+
+def _extends_previous(char: str) -> bool:
+    code = ord(char)
+    return (
+        char == _ZERO_WIDTH_JOINER
+        or unicodedata.category(char) in _EXTENDING_CATEGORIES
+        or any(start <= code <= end for start, end in _EXTENDING_RANGES)
+    )
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return _REGIONAL_INDICATORS[0] <= ord(char) <= _REGIONAL_INDICATORS[1]
+
+
+def grapheme_boundary(text: str, index: int) -> int:
+    """index 以下で、書記素の途中（結合文字・ZWJシーケンス・国旗など）にならない最大の位置を返す。"""
+    while 0 < index < len(text) and (
+        _extends_previous(text[index]) or text[index - 1] == _ZERO_WIDTH_JOINER
+    ):
+        index -= 1
+    if 0 < index < len(text) and _is_regional_indicator(text[index]):
+        run = 0
+        while run < index and _is_regional_indicator(text[index - run - 1]):
+            run += 1
+        # 国旗（Regional Indicatorの2文字）の1文字目と2文字目の間では切らない
+        if run % 2:
+            index -= 1
+    return index
+
+
+def truncate_text(
+    text: str, limit: int, *, utf16: bool = False, ellipsis: str = "…"
+) -> str:
+    """
+    テキストを limit 文字以内に、書記素の途中で切らないように切り詰める。
+    切り詰めた場合は末尾に ellipsis を付ける（付けた後の長さも limit 以内に収める）。
+    utf16=True の場合はUTF-16の長さ（サロゲートペアは2文字）で数える。
     """
-    # まずHTMLエンティティをデコード
-    decoded_text = html.unescape(text)
-    # ノーブレークスペースを通常のスペースに変換
-    decoded_text = decoded_text.replace("\xa0", " ")
-    # その後HTMLタグを除去
-    clean = re.compile("<.*?>")
-    return re.sub(clean, "", decoded_text)
+    length = utf16_length if utf16 else len
+    if length(text) <= limit:
+        return text
+    budget = limit - length(ellipsis)
+    if budget <= 0:
+        return ""
+    if utf16:
+        cut = len(text)
+        used = 0
+        for index, char in enumerate(text):
+            used += 2 if ord(char) > 0xFFFF else 1
+            if used > budget:
+                cut = index
+                break
+    else:
+        cut = budget
+    return text[: grapheme_boundary(text, cut)] + ellipsis
+
+
+@dataclass(slots=True, frozen=True)
+class TextBudget:
+    """シンクのテキスト1つあたりの長さの上限と、その数え方・切り詰め方。"""
+
+    limit: int
+    utf16: bool = False
+    ellipsis: str = "…"
+
+    def fit(self, text: str) -> str:
+        return truncate_text(text, self.limit, utf16=self.utf16, ellipsis=self.ellipsis)
+
+
+# シンクごとのテキスト1つあたりの上限
+# Notion: rich_textの1要素（UTF-16で数える）
+NOTION_TEXT_BUDGET = TextBudget(2000, utf16=True)
+# Slack: sectionのテキストとheaderのテキスト
+SLACK_SECTION_BUDGET = TextBudget(3000)
+SLACK_HEADER_BUDGET = TextBudget(150)
+# Unsplash: 検索クエリ（長すぎるクエリは一致しなくなるため、省略記号を付けずに短くする）
+UNSPLASH_QUERY_BUDGET = TextBudget(100, ellipsis="")
+
+
+def remove_html_tags_batch(texts) -> list:
+    """複数のテキストをまとめて remove_html_tags で整形する。"""
+    return [remove_html_tags(text) for text in texts]
+
+
+def clean_article_texts(articles, fields=("title", "summary")):
+    """記事の一覧について、指定したフィールドのテキストをまとめて整形する（記事を直接更新する）。"""
+    for field in fields:
+        cleaned = remove_html_tags_batch(
+            getattr(article, field) for article in articles
+        )
+        for article, text in zip(articles, cleaned):
+            setattr(article, field, text)
+    return articles
@@ -1,9 +1,22 @@
 import os
 import json
+import difflib
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from notion_client.errors import APIResponseError
 from dotenv import load_dotenv
-from typing import Optional
+
+from . import local_cache
+from .notion_rate_limit import RateLimitedNotionClient
+from .report_model import (
+    REPORT_TITLE,
+    Report,
+    ReportArticle,
+    build_report,
+    utf16_length,
+)
 
 load_dotenv()  # .envファイルを読み込む
 
@@ -13,15 +26,46 @@ PROP_DATE = os.environ.get("NOTION_PROPERTY_DATE", "Date")
 PROP_STATUS = os.environ.get("NOTION_PROPERTY_STATUS", "Status")
 PROP_ABSTRACT = os.environ.get("NOTION_PROPERTY_ABSTRACT", "Abstract")
 PROP_URL = os.environ.get("NOTION_PROPERTY_URL", "URL")
+# 記事一覧データベース（NOTION_ARTICLES_DATABASE_ID）で使うプロパティ
+PROP_CATEGORY = os.environ.get("NOTION_PROPERTY_CATEGORY", "Category")
+PROP_POINTS = os.environ.get("NOTION_PROPERTY_POINTS", "Points")
 
+NOTION_API_VERSION = "2022-06-28"
 
-def ensure_notion_database_properties(notion, database_id):
-    if not database_id:
-        print("エラー: NotionデータベースIDが指定されていません。")
-        return False
+# Notion APIの上限: 1リクエストの子ブロック数、ネストを含む総ブロック数、rich_textの文字数と要素数
+NOTION_MAX_CHILDREN = 100
+NOTION_MAX_BLOCKS_PER_REQUEST = 1000
+NOTION_MAX_TEXT_LENGTH = 2000
+NOTION_MAX_RICH_TEXT_ITEMS = 100
+# カテゴリごとのブロック追加を並列に行う数（Notionの平均3リクエスト/秒に合わせる）
+NOTION_APPEND_CONCURRENCY = 3
 
+# 検証済みのデータベーススキーマを保存するキャッシュファイル名
+SCHEMA_CACHE_NAME = "notion_schema.json"
+# スキーマ検証結果の有効期間（時間）。0の場合はキャッシュを使わない
+DEFAULT_SCHEMA_CACHE_TTL_HOURS = 168
+# 複数のデータベースの確認が並行して行われても、キャッシュファイルの更新が競合しないようにする
+_schema_cache_lock = threading.Lock()
+
+
+def create_notion_client(api_key: str):
+    """
+    レート制限と再試行を行うNotionクライアントを作成する。notion_clientはここで初めて読み込む。
+    """
+    from notion_client import Client
+
+    try:
+        # 再試行は RateLimitedNotionClient が行うため、クライアント内蔵の再試行は無効にする
+        client = Client(auth=api_key, notion_version=NOTION_API_VERSION, retry=False)
+    except TypeError:
+        # 再試行オプションのない notion-client 2.x
+        client = Client(auth=api_key, notion_version=NOTION_API_VERSION)
+    return RateLimitedNotionClient(client)
+
+
+def _expected_properties_config() -> dict:
     # Define expected properties with their types and configurations
-    expected_properties_config = {
+    return {
         PROP_NAME: {"type": "title", "config": {"title": {}}},
         PROP_DATE: {"type": "date", "config": {"date": {}}},
         PROP_STATUS: {
@@ -34,6 +78,93 @@ def ensure_notion_database_properties(notion, database_id):
         PROP_URL: {"type": "url", "config": {"url": {}}},
     }
 
+
+def schema_fingerprint(expected_properties_config: dict) -> str:
+    """検証するスキーマ（プロパティ名・タイプ・ステータスの選択肢）のフィンガープリントを返す。"""
+    schema = {
+        name: [
+            details["type"],
+            sorted(
+                option["name"]
+                for option in details["config"].get("status", {}).get("options", [])
+            ),
+        ]
+        for name, details in expected_properties_config.items()
+    }
+    encoded = json.dumps(schema, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _schema_cache_ttl_seconds() -> float:
+    ttl_hours = os.environ.get(
+        "NOTION_SCHEMA_CACHE_TTL_HOURS", DEFAULT_SCHEMA_CACHE_TTL_HOURS
+    )
+    return float(ttl_hours) * 3600
+
+
+def is_schema_verified(database_id, fingerprint: str) -> bool:
+    """同じスキーマがTTL以内に検証済みであればTrueを返す。"""
+    ttl_seconds = _schema_cache_ttl_seconds()
+    if ttl_seconds <= 0:
+        return False
+    entry = local_cache.load_json(SCHEMA_CACHE_NAME, {}).get(database_id)
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    return time.time() - entry.get("verified_at", 0) < ttl_seconds
+
+
+def _record_schema_verified(database_id, fingerprint: str):
+    with _schema_cache_lock:
+        cache = local_cache.load_json(SCHEMA_CACHE_NAME, {})
+        cache[database_id] = {"fingerprint": fingerprint, "verified_at": time.time()}
+        local_cache.save_json(SCHEMA_CACHE_NAME, cache)
+
+
+def invalidate_schema_cache(database_id):
+    """データベースの検証済みスキーマを破棄し、次回の確認でNotionに問い合わせるようにする。"""
+    with _schema_cache_lock:
+        cache = local_cache.load_json(SCHEMA_CACHE_NAME, {})
+        if cache.pop(database_id, None) is not None:
+            local_cache.save_json(SCHEMA_CACHE_NAME, cache)
+
+
+def expected_article_properties_config() -> dict:
+    """記事一覧データベース（1記事1行）に必要なプロパティ。"""
+    return {
+        PROP_NAME: {"type": "title", "config": {"title": {}}},
+        PROP_URL: {"type": "url", "config": {"url": {}}},
+        PROP_CATEGORY: {"type": "select", "config": {"select": {}}},
+        PROP_ABSTRACT: {"type": "rich_text", "config": {"rich_text": {}}},
+        PROP_POINTS: {"type": "rich_text", "config": {"rich_text": {}}},
+        PROP_DATE: {"type": "date", "config": {"date": {}}},
+    }
+
+
+def ensure_notion_database_properties(
+    notion,
+    database_id,
+    force: bool = False,
+    expected_properties_config: dict | None = None,
+):
+    """
+    データベースに必要なプロパティが揃っているかを確認し、不足分を追加する。
+    検証済みのスキーマはローカルにキャッシュし、TTL以内は確認をスキップする（force=Trueで必ず確認）。
+    expected_properties_config を省略した場合はレポートページ用のプロパティを確認する。
+    """
+    from notion_client.errors import APIResponseError
+
+    if not database_id:
+        print("エラー: NotionデータベースIDが指定されていません。")
+        return False
+
+    if expected_properties_config is None:
+        expected_properties_config = _expected_properties_config()
+    fingerprint = schema_fingerprint(expected_properties_config)
+    if not force and is_schema_verified(database_id, fingerprint):
+        print("Notionデータベースのプロパティは検証済みのため、確認をスキップします。")
+        return True
+    invalidate_schema_cache(database_id)
+
     try:
         db_info = notion.databases.retrieve(database_id=database_id)
         print(
@@ -105,6 +236,7 @@ def ensure_notion_database_properties(notion, database_id):
                 "Notionデータベースのプロパティはすべて存在し、タイプも一致しています。"
             )
 
+        _record_schema_verified(database_id, fingerprint)
         return True
     except APIResponseError as e:
         error_message = "No message provided"
@@ -126,8 +258,18 @@ def ensure_notion_database_properties(notion, database_id):
 
 
 def create_notion_report_page(
-    notion, processed_articles, cover_image_url: Optional[str] = None
+    notion,
+    processed_articles,
+    cover_image_url: str | None = None,
+    report_date: str | None = None,
+    report: Report | None = None,
 ):
+    """
+    レポートページを作成（同じ日付のページがあれば更新）し、そのURLを返す。
+    組み立て済みの report を渡した場合は processed_articles の代わりにそれを使う。
+    """
+    from notion_client.errors import APIResponseError
+
     database_id = os.environ.get("NOTION_DATABASE_ID")
     if not database_id:
         print(
@@ -135,8 +277,13 @@ def create_notion_report_page(
         )
         return None
 
-    report_date_str = os.getenv("REPORT_DATE", datetime.now().strftime("%Y-%m-%d"))
-    page_title = f"AIニュースレポート - {report_date_str}"
+    report_date_str = (
+        report.report_date
+        if report is not None
+        else report_date
+        or os.getenv("REPORT_DATE", datetime.now().strftime("%Y-%m-%d"))
+    )
+    page_title = f"{REPORT_TITLE} - {report_date_str}"
     introduction_text = "データサイエンス、データエンジニアリング、データ分析の学習者向けに、AIの最新ニュースを毎日お届けします。"
 
     # Notionのページプロパティを構築
@@ -156,80 +303,57 @@ def create_notion_report_page(
             "external": {"url": cover_image_url},
         }
 
-    # ページコンテンツのブロックを構築
-    children = [
+    # ページ作成時はヘッダー（導入文と区切り線）のみを送り、本文は後から分割して追加する
+    header_blocks = [
         {
             "object": "block",
             "type": "paragraph",
-            "paragraph": {
-                "rich_text": [{"type": "text", "text": {"content": introduction_text}}]
-            },
+            "paragraph": {"rich_text": rich_text(introduction_text)},
         },
         {"object": "block", "type": "divider", "divider": {}},
     ]
 
-    # カテゴリごとにニュースを整理
-    categories = {}
-    for article in processed_articles:
-        category = article.get("category", "その他")
-        if category not in categories:
-            categories[category] = []
-        categories[category].append(article)
-
-    for category, articles in categories.items():
-        children.append(
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {"type": "text", "text": {"content": f"【{category}】"}}
-                    ]
-                },
-            }
-        )
-        for article in articles:
-            children.append(
-                {
-                    "object": "block",
-                    "type": "heading_3",
-                    "heading_3": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {
-                                    "content": article.get("title", "タイトルなし"),
-                                    "link": {"url": article.get("url", "#")},
-                                },
-                            }
-                        ]
-                    },
-                }
-            )
-            children.append(
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": article.get("summary", "")},
-                            }
-                        ]
-                    },
-                }
-            )
-        children.append({"object": "block", "type": "divider", "divider": {}})
+    if report is None:
+        report = build_report(processed_articles, report_date_str)
+    sections = render_notion_sections(report)
 
     print(f"Attempting to create Notion report page: {page_title}")
     try:
-        response = notion.pages.create(
-            parent={"database_id": database_id},
-            properties=properties,
-            children=children,
-            cover=cover,
-        )
+        # 同じ日付のページがあれば作り直さず、変更のあったブロックだけを更新する
+        existing_page = find_report_page(notion, database_id, report_date_str)
+        if existing_page is not None:
+            items = [(block, None) for block in header_blocks]
+            items += _section_items(sections)
+            changes = update_report_page(notion, existing_page, items, cover)
+            print(
+                f"既存のNotionレポートページを更新しました（{changes}ブロックを変更）: {existing_page['url']}"
+            )
+            return existing_page["url"]
+
+        try:
+            response = notion.pages.create(
+                parent={"database_id": database_id},
+                properties=properties,
+                children=header_blocks,
+                cover=cover,
+            )
+        except APIResponseError as e:
+            # キャッシュ済みのスキーマが古い可能性があるため、再検証して1度だけ再試行する
+            if not is_schema_error(e) or not ensure_notion_database_properties(
+                notion, database_id, force=True
+            ):
+                raise
+            print(
+                "スキーマを再検証したため、Notionレポートページの作成を再試行します。"
+            )
+            response = notion.pages.create(
+                parent={"database_id": database_id},
+                properties=properties,
+                children=header_blocks,
+                cover=cover,
+            )
+        if sections:
+            append_report_sections(notion, response["id"], sections)
         print(f"Notionレポートページが正常に作成されました: {response['url']}")
         return response["url"]
     except APIResponseError as e:
@@ -249,3 +373,287 @@ def create_notion_report_page(
     except Exception as e:
         print(f"予期せぬエラーが発生しました: {e}")
         return None
+
+
+def is_schema_error(error) -> bool:
+    """ページ作成のエラーが、データベースのプロパティ不一致によるものかを判定する。"""
+    if error.code != "validation_error":
+        return False
+    # 例: "Status is not a property that exists." / "Date is expected to be date."
+    message = str(error)
+    return "is not a property" in message or "is expected to be" in message
+
+
+def split_text(text: str, limit: int = NOTION_MAX_TEXT_LENGTH) -> list:
+    """
+    テキストを limit 文字以下のセグメントに分割する。
+    NotionはUTF-16の長さで数えるため、絵文字などのサロゲートペアは2文字として扱う。
+    """
+    segments = []
+    current = []
+    length = 0
+    for char in text:
+        width = 2 if ord(char) > 0xFFFF else 1
+        if length + width > limit:
+            segments.append("".join(current))
+            current = []
+            length = 0
+        current.append(char)
+        length += width
+    if current or not segments:
+        segments.append("".join(current))
+    return segments
+
+
+def rich_text(content: str, link: str | None = None, length: int | None = None) -> list:
+    """
+    Notionの上限に収まるように分割したrich_textの配列を返す。
+    UTF-16での長さ length が分かっていて上限以下の場合は、分割の走査を省く。
+    """
+    if length is None:
+        length = utf16_length(content)
+    if length <= NOTION_MAX_TEXT_LENGTH:
+        segments = [content]
+    else:
+        segments = split_text(content)[:NOTION_MAX_RICH_TEXT_ITEMS]
+    items = []
+    for segment in segments:
+        text = {"content": segment}
+        if link:
+            text["link"] = {"url": link}
+        items.append({"type": "text", "text": text})
+    return items
+
+
+def _article_blocks(article: ReportArticle) -> list:
+    """記事1件分のブロック（リンク付きの見出しと要約）を返す。"""
+    return [
+        {
+            "object": "block",
+            "type": "heading_3",
+            "heading_3": {
+                "rich_text": rich_text(
+                    article.title, link=article.url, length=article.title_length
+                )
+            },
+        },
+        {
+            "object": "block",
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": rich_text(article.summary, length=article.summary_length)
+            },
+        },
+    ]
+
+
+def render_notion_sections(report: Report) -> list:
+    """レポートを、カテゴリ名と記事ブロックの組の一覧に変換する。"""
+    return [
+        (
+            category.name,
+            [block for a in category.articles for block in _article_blocks(a)],
+        )
+        for category in report.categories
+    ]
+
+
+def _block_count(block) -> int:
+    """ネストした子ブロックを含むブロック数を返す。"""
+    children = block.get(block["type"], {}).get("children", [])
+    return 1 + sum(_block_count(child) for child in children)
+
+
+def chunk_blocks(blocks: list) -> list:
+    """1リクエストあたりの子ブロック数・総ブロック数の上限に収まるようにブロックを分割する。"""
+    chunks = []
+    current = []
+    current_count = 0
+    for block in blocks:
+        count = _block_count(block)
+        if current and (
+            len(current) >= NOTION_MAX_CHILDREN
+            or current_count + count > NOTION_MAX_BLOCKS_PER_REQUEST
+        ):
+            chunks.append(current)
+            current = []
+            current_count = 0
+        current.append(block)
+        current_count += count
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def append_blocks(notion, block_id: str, blocks: list, after: str | None = None):
+    """
+    ブロックを上限ごとに分割して順番に追加し、作成された最上位ブロックのIDを返す。
+    after を指定した場合は、そのブロックの直後に挿入する。
+    """
+    block_ids = []
+    for chunk in chunk_blocks(blocks):
+        position = {"after": after} if after else {}
+        response = notion.blocks.children.append(
+            block_id=block_id, children=chunk, **position
+        )
+        block_ids.extend(result["id"] for result in response["results"])
+        if after and block_ids:
+            after = block_ids[-1]
+    return block_ids
+
+
+def _with_children(block: dict, children: list) -> dict:
+    block_type = block["type"]
+    return {**block, block_type: {**block[block_type], "children": children}}
+
+
+def append_block_items(
+    notion, parent_id: str, items: list, after: str | None = None
+) -> list:
+    """
+    (ブロック, 子ブロックのリストまたはNone) の組を追加し、最上位ブロックのIDを返す。
+    子ブロックは上限まで同じリクエストに含め、収まらない分は
+    親ブロックごとに独立しているため並列に追加する。
+    """
+    blocks = []
+    overflows = []
+    for index, (block, children) in enumerate(items):
+        if children:
+            block = _with_children(block, children[:NOTION_MAX_CHILDREN])
+            if len(children) > NOTION_MAX_CHILDREN:
+                overflows.append((index, children[NOTION_MAX_CHILDREN:]))
+        blocks.append(block)
+
+    block_ids = append_blocks(notion, parent_id, blocks, after=after)
+    if overflows:
+        with ThreadPoolExecutor(max_workers=NOTION_APPEND_CONCURRENCY) as executor:
+            futures = [
+                executor.submit(append_blocks, notion, block_ids[index], children)
+                for index, children in overflows
+            ]
+            for future in futures:
+                future.result()
+    return block_ids
+
+
+def _section_items(sections: list) -> list:
+    """カテゴリごとのトグル見出し（子ブロックは記事）と区切り線の組を返す。"""
+    items = []
+    for category, child_blocks in sections:
+        heading = {
+            "object": "block",
+            "type": "heading_2",
+            "heading_2": {
+                "rich_text": rich_text(f"【{category}】"),
+                "is_toggleable": True,
+            },
+        }
+        items.append((heading, child_blocks))
+        items.append(({"object": "block", "type": "divider", "divider": {}}, None))
+    return items
+
+
+def append_report_sections(notion, page_id: str, sections: list):
+    """カテゴリごとのトグル見出しと記事ブロックをページに追加する。"""
+    append_block_items(notion, page_id, _section_items(sections))
+
+
+def find_report_page(notion, database_id: str, report_date_str: str):
+    """日付プロパティが一致する既存のレポートページを返す。存在しない場合はNoneを返す。"""
+    response = notion.request(
+        path=f"databases/{database_id}/query",
+        method="POST",
+        body={
+            "filter": {"property": PROP_DATE, "date": {"equals": report_date_str}},
+            "page_size": 1,
+        },
+    )
+    pages = list(response["results"])
+    return pages[0] if pages else None
+
+
+def list_child_blocks(notion, block_id: str) -> list:
+    """ブロックの子ブロックをページネーションしてすべて取得する。"""
+    blocks = []
+    cursor = None
+    while True:
+        position = {"start_cursor": cursor} if cursor else {}
+        response = notion.blocks.children.list(
+            block_id=block_id, page_size=NOTION_MAX_CHILDREN, **position
+        )
+        blocks.extend(response["results"])
+        if not response.get("has_more"):
+            return blocks
+        cursor = response["next_cursor"]
+
+
+def block_signature(block: dict) -> tuple:
+    """ブロックIDを除いた内容（タイプ・テキスト・リンク・トグル）で比較するためのキーを返す。"""
+    block_type = block["type"]
+    content = block.get(block_type) or {}
+    texts = tuple(
+        (
+            (item.get("text") or {}).get("content", item.get("plain_text", "")),
+            ((item.get("text") or {}).get("link") or {}).get("url"),
+        )
+        for item in content.get("rich_text", [])
+    )
+    return (block_type, texts, bool(content.get("is_toggleable")))
+
+
+def sync_blocks(notion, parent_id: str, existing_blocks: list, items: list) -> int:
+    """
+    既存の子ブロックと新しい内容 (ブロック, 子ブロック) の差分を取り、
+    変更のあったブロックだけを削除・挿入する。変更したブロック数を返す。
+    """
+    matcher = difflib.SequenceMatcher(
+        a=[block_signature(block) for block in existing_blocks],
+        b=[block_signature(block) for block, _ in items],
+        autojunk=False,
+    )
+    changes = 0
+    anchor = None  # 直前に残っている（または挿入した）ブロックのID
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for existing, (_, children) in zip(existing_blocks[i1:i2], items[j1:j2]):
+                if children is None:
+                    continue
+                existing_children = (
+                    list_child_blocks(notion, existing["id"])
+                    if existing.get("has_children")
+                    else []
+                )
+                changes += sync_blocks(
+                    notion,
+                    existing["id"],
+                    existing_children,
+                    [(child, None) for child in children],
+                )
+            anchor = existing_blocks[i2 - 1]["id"]
+            continue
+
+        if anchor is None and j2 > j1 and i2 < len(existing_blocks):
+            # 先頭には挿入できないため、以降のブロックをすべて作り直す
+            for existing in existing_blocks[i1:]:
+                notion.blocks.delete(block_id=existing["id"])
+            append_block_items(notion, parent_id, items[j1:])
+            return changes + len(existing_blocks) - i1 + len(items) - j1
+
+        for existing in existing_blocks[i1:i2]:
+            notion.blocks.delete(block_id=existing["id"])
+        changes += i2 - i1
+        if j2 > j1:
+            inserted = append_block_items(notion, parent_id, items[j1:j2], after=anchor)
+            anchor = inserted[-1] if inserted else anchor
+            changes += j2 - j1
+    return changes
+
+
+def update_report_page(notion, page: dict, items: list, cover) -> int:
+    """既存のレポートページを新しい内容に合わせて差分更新し、変更したブロック数を返す。"""
+    changes = 0
+    if page.get("cover") != cover:
+        notion.pages.update(page_id=page["id"], cover=cover)
+        changes += 1
+    existing_blocks = list_child_blocks(notion, page["id"])
+    return changes + sync_blocks(notion, page["id"], existing_blocks, items)
@@ -0,0 +1,71 @@
+import pytest
+
+from src.article import Article, as_article, load_articles, save_articles
+
+
+def test_article_uses_slots():
+    """Articleが__slots__を使用し、インスタンス辞書を持たないことをテスト"""
+    article = Article(url="http://example.com/1")
+    assert not hasattr(article, "__dict__")
+    with pytest.raises(AttributeError):
+        article.unknown_field = "x"
+
+
+def test_article_requires_url():
+    """urlのない辞書からはArticleを生成できないことをテスト"""
+    with pytest.raises(KeyError):
+        Article.from_dict({"title": "URLなし"})
+    with pytest.raises(TypeError):
+        Article()
+
+
+def test_article_category_is_interned():
+    """カテゴリ文字列がinternされ、記事間で同じオブジェクトを共有することをテスト"""
+    category = "データ分析"
+    # 同じ値で別のオブジェクトの文字列
+    same_value = category.encode().decode()
+    assert same_value is not category
+    a = Article(url="http://example.com/a", category=category)
+    b = Article(url="http://example.com/b")
+    b.category = same_value
+    assert a.category is b.category
+
+
+def test_article_dict_style_read_access():
+    """既存のシンク向けに辞書形式の読み取りができることをテスト"""
+    article = Article(url="http://example.com/1", title="タイトル")
+    assert article["title"] == "タイトル"
+    assert article.get("category", "その他") == "その他"
+    assert article.get("unknown", "default") == "default"
+    with pytest.raises(KeyError):
+        article["unknown"]
+
+
+def test_as_article_converts_dict_and_passes_through_article():
+    """辞書はArticleに変換され、Articleはそのまま返されることをテスト"""
+    article = Article(url="http://example.com/1")
+    assert as_article(article) is article
+    converted = as_article(
+        {"title": "T", "url": "http://example.com/2", "summary": "S", "points": None}
+    )
+    assert converted.url == "http://example.com/2"
+    assert converted.points == []
+
+
+def test_save_and_load_articles_round_trip(tmp_path):
+    """チェックポイントへの保存と復元で内容が保たれることをテスト"""
+    articles = [
+        Article(
+            url="http://example.com/1",
+            title="記事1",
+            summary="要約1",
+            points=["P1", "P2", "P3"],
+            category="人工知能",
+        ),
+        Article(url="http://example.com/2", title="記事2"),
+    ]
+    path = tmp_path / "checkpoint.jsonl"
+    save_articles(str(path), articles)
+    restored = load_articles(str(path))
+    assert restored == articles
+    assert restored[0].category is articles[0].category
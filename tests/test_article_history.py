@@ -0,0 +1,138 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src import local_cache
+from src.article import Article
+from src.article_history import (
+    EMBEDDINGS_NAME,
+    ArticleHistory,
+    HashingEmbedder,
+    load_embedder,
+)
+
+TODAY = "2026-01-14"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("EMBEDDING_BACKEND", raising=False)
+
+
+def _article(url, title, summary=""):
+    return Article(url=url, title=title, summary=summary)
+
+
+def _date(text):
+    return date.fromisoformat(text)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    """同じテキストは常に同じ正規化済みベクトルになり、似たテキストほど類似度が高いことをテスト"""
+    embedder = HashingEmbedder()
+    vectors = embedder.embed(
+        [
+            "OpenAIが新しい言語モデルを発表",
+            "OpenAI、新しい言語モデルを発表した",
+            "家庭菜園の始め方",
+            "",
+        ]
+    )
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (4, embedder.dim)
+    np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1.0, rtol=1e-5)
+    assert not vectors[3].any()
+    np.testing.assert_array_equal(
+        vectors,
+        embedder.embed(
+            [
+                "OpenAIが新しい言語モデルを発表",
+                "OpenAI、新しい言語モデルを発表した",
+                "家庭菜園の始め方",
+                "",
+            ]
+        ),
+    )
+    assert vectors[0] @ vectors[1] > 0.8
+    assert vectors[0] @ vectors[2] < 0.3
+
+
+def test_filter_novel_drops_recently_reported_articles():
+    """直近に配信した記事と似ている候補のみが除外されることをテスト"""
+    history = ArticleHistory()
+    history.filter_novel(
+        [_article("a", "OpenAIが新しい言語モデルを発表")], _date(TODAY)
+    )
+    history.record([_article("a", "OpenAIが新しい言語モデルを発表")], "2026-01-12")
+
+    history = ArticleHistory()
+    candidates = [
+        _article("b", "OpenAI、新しい言語モデルを発表"),
+        _article("c", "家庭菜園の始め方"),
+    ]
+    kept, dropped = history.filter_novel(candidates, _date(TODAY))
+    assert [a.url for a in kept] == ["c"]
+    assert [(a.url, title) for a, _, title in dropped] == [
+        ("b", "OpenAIが新しい言語モデルを発表")
+    ]
+    assert dropped[0][1] >= history.threshold
+
+    # 比較する期間より前に配信した記事とは比較しない
+    kept, dropped = history.filter_novel(candidates, _date("2026-02-14"))
+    assert len(kept) == 2 and not dropped
+
+
+def test_record_appends_memmap_and_prunes_old_rows():
+    """履歴はメモリマップの行列に追記され、期間外の行は取り除かれることをテスト"""
+    history = ArticleHistory(window_days=7)
+    history.record([_article("a", "記事A"), _article("b", "記事B")], "2026-01-01")
+    history.record([_article("c", "記事C"), _article("a", "記事A")], "2026-01-05")
+
+    reopened = ArticleHistory(window_days=7)
+    assert [row["url"] for row in reopened.rows] == ["a", "b", "c"]
+    matrix = reopened.matrix()
+    assert isinstance(matrix, np.memmap)
+    np.testing.assert_array_equal(
+        matrix, HashingEmbedder().embed(["記事A ", "記事B ", "記事C "])
+    )
+
+    reopened.record([_article("d", "記事D")], "2026-01-10")
+    assert [row["url"] for row in reopened.rows] == ["c", "d"]
+    np.testing.assert_array_equal(
+        ArticleHistory(window_days=7).matrix(),
+        HashingEmbedder().embed(["記事C ", "記事D "]),
+    )
+
+
+def test_history_is_reset_for_other_backend_or_missing_embeddings():
+    """埋め込みの次元が異なる場合や、埋め込みのファイルが欠けている場合は空の履歴として扱うことをテスト"""
+    ArticleHistory().record([_article("a", "記事A")], TODAY)
+    assert ArticleHistory(embedder=HashingEmbedder(dim=64)).rows == []
+
+    with open(local_cache.cache_path(EMBEDDINGS_NAME), "wb"):
+        pass
+    history = ArticleHistory()
+    kept, dropped = history.filter_novel([_article("a", "記事A")], _date(TODAY))
+    assert len(kept) == 1 and not dropped
+
+
+class FixedEmbedder:
+    name = "fixed"
+    dim = 2
+
+    def embed(self, texts):
+        return np.tile(np.array([1.0, 0.0], dtype=np.float32), (len(texts), 1))
+
+
+def test_load_embedder_supports_plugin_backend(monkeypatch):
+    """EMBEDDING_BACKEND に "モジュール:ファクトリ" を指定して埋め込みを差し替えられることをテスト"""
+    assert isinstance(load_embedder(), HashingEmbedder)
+    monkeypatch.setenv("EMBEDDING_BACKEND", "tests.test_article_history:FixedEmbedder")
+    history = ArticleHistory()
+    # テストモジュールはパス経由でも読み込まれるため、クラス名で確認する
+    assert type(history.embedder).__name__ == "FixedEmbedder"
+    history.record([_article("a", "A")], TODAY)
+    kept, _ = ArticleHistory().filter_novel([_article("b", "B")], _date(TODAY))
+    assert kept == []
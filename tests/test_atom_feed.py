@@ -0,0 +1,86 @@
+import xml.etree.ElementTree as ET
+from datetime import UTC, datetime, timedelta
+
+from src.atom_feed import MAX_REPORT_ENTRIES, FeedWriter, entry_id
+from src.report_model import build_report
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+NOW = datetime(2026, 1, 5, 22, 30, tzinfo=UTC)
+
+
+def _report(date, summary="要約", categories=("人工知能",)):
+    return build_report(
+        [
+            {
+                "url": f"https://example.com/{date}/{category}",
+                "title": f"{category} & 記事",
+                "summary": summary,
+                "category": category,
+            }
+            for category in categories
+        ],
+        date,
+    )
+
+
+def _entries(xml):
+    feed = ET.fromstring(xml)
+    return [
+        {
+            "id": entry.findtext(f"{ATOM}id"),
+            "title": entry.findtext(f"{ATOM}title"),
+            "published": entry.findtext(f"{ATOM}published"),
+            "updated": entry.findtext(f"{ATOM}updated"),
+        }
+        for entry in feed.iter(f"{ATOM}entry")
+    ]
+
+
+def _add(root, report, now=NOW, slugs=None):
+    slugs = slugs or {c.name: c.name for c in report.categories}
+    return FeedWriter(root, base_url="https://news.example.com").add_report(
+        report, "", slugs, now=now
+    )
+
+
+def test_new_reports_are_prepended_and_capped(tmp_path):
+    """新しいレポートが先頭に追加され、件数の上限で切り詰められることをテスト"""
+    root = str(tmp_path)
+    for day in range(1, MAX_REPORT_ENTRIES + 3):
+        feeds = _add(root, _report(f"2026-01-{day:02d}"), NOW + timedelta(days=day))
+    entries = _entries(feeds["feeds/atom.xml"])
+    assert len(entries) == MAX_REPORT_ENTRIES
+    assert entries[0]["id"] == entry_id(f"report:2026-01-{MAX_REPORT_ENTRIES + 2:02d}")
+    feed = ET.fromstring(feeds["feeds/atom.xml"])
+    assert feed.findtext(f"{ATOM}updated") == entries[0]["updated"]
+    assert feed.find(f"{ATOM}link[@rel='self']").get("href") == (
+        "https://news.example.com/feeds/atom.xml"
+    )
+
+
+def test_unchanged_entries_keep_their_timestamps(tmp_path):
+    """内容が同じならupdatedを保ち、内容が変わった場合もpublishedは保つことをテスト"""
+    root = str(tmp_path)
+    first = _add(root, _report("2026-01-05"))
+    again = _add(root, _report("2026-01-05"), NOW + timedelta(hours=1))
+    assert again == first
+
+    changed = _add(root, _report("2026-01-05", "新しい要約"), NOW + timedelta(hours=2))
+    entry = _entries(changed["feeds/atom.xml"])[0]
+    assert entry["published"] == "2026-01-05T22:30:00Z"
+    assert entry["updated"] == "2026-01-06T00:30:00Z"
+
+
+def test_category_feeds_drop_articles_of_removed_categories(tmp_path):
+    """カテゴリごとのフィードに記事が載り、同じ日付で消えたカテゴリからは取り除かれることをテスト"""
+    root = str(tmp_path)
+    feeds = _add(root, _report("2026-01-05", categories=("人工知能", "統計")))
+    assert [e["title"] for e in _entries(feeds["feeds/統計.xml"])] == ["統計 & 記事"]
+
+    feeds = _add(
+        root,
+        _report("2026-01-05", categories=("人工知能",)),
+        slugs={"人工知能": "人工知能", "統計": "統計"},
+    )
+    assert _entries(feeds["feeds/統計.xml"]) == []
+    assert len(_entries(feeds["feeds/人工知能.xml"])) == 1
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+from src.deadline import STAGE_RESERVES, RunDeadline, seconds_until
+from src.run_summary import reset_run_summary
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def summary():
+    return reset_run_summary()
+
+
+def test_allows_until_stage_reserve_is_reached():
+    """残り時間がステージの予備時間を下回ると allows() がFalseになることをテスト"""
+    clock = FakeClock()
+    deadline = RunDeadline(600, clock=clock)
+    assert deadline.allows("images")
+    clock.now += 600 - STAGE_RESERVES["images"] + 1
+    assert not deadline.allows("images")
+    assert deadline.allows("closing_comment")
+
+
+def test_degrade_is_recorded_in_run_summary(summary, capsys):
+    """縮退した処理が実行サマリーに出力されることをテスト"""
+    RunDeadline(0).degrade("images", "画像検索をスキップしました")
+    report = summary.report()
+    assert "[images] 画像検索をスキップしました" in report
+    assert "締め切りが近いため縮退します [images]" in capsys.readouterr().out
+
+
+def test_run_summary_without_degradation():
+    """縮退がない場合は「なし」と出力されることをテスト"""
+    assert "縮退した処理: なし" in reset_run_summary().report()
+
+
+def test_seconds_until_same_day_and_rollover():
+    """締め切り時刻までの秒数と、大きく過ぎた時刻の翌日扱いをテスト"""
+    now = datetime(2026, 1, 5, 7, 30)
+    assert seconds_until("08:00", now) == 30 * 60
+    assert seconds_until("07:00", now) == -30 * 60
+    assert seconds_until("06:00", datetime(2026, 1, 5, 22, 0)) == 8 * 3600
+
+
+def test_from_env_uses_earlier_of_budget_and_deadline(monkeypatch):
+    """RUN_TIME_BUDGET_MINUTES と RUN_DEADLINE のうち早い方が採用されることをテスト"""
+    monkeypatch.setenv("RUN_TIME_BUDGET_MINUTES", "30")
+    monkeypatch.setenv("RUN_DEADLINE", "08:00")
+    deadline = RunDeadline.from_env(now=datetime(2026, 1, 5, 7, 50))
+    assert 590 < deadline.remaining() <= 600
+
+    monkeypatch.delenv("RUN_DEADLINE")
+    deadline = RunDeadline.from_env()
+    assert 1790 < deadline.remaining() <= 1800
+
+
+def test_from_env_without_settings_has_no_deadline(monkeypatch):
+    """RUN_TIME_BUDGET_MINUTES も RUN_DEADLINE もない場合は、どのステージも縮退しないことをテスト"""
+    monkeypatch.delenv("RUN_TIME_BUDGET_MINUTES", raising=False)
+    monkeypatch.delenv("RUN_DEADLINE", raising=False)
+    deadline = RunDeadline.from_env()
+    assert deadline.remaining() == float("inf")
+    assert all(deadline.allows(stage) for stage in STAGE_RESERVES)
+
+
+def test_from_env_ignores_deadline_passed_at_startup(monkeypatch, capsys):
+    """開始時点で過ぎている RUN_DEADLINE（同じ日の手動の再実行）は無視されることをテスト"""
+    monkeypatch.delenv("RUN_TIME_BUDGET_MINUTES", raising=False)
+    monkeypatch.setenv("RUN_DEADLINE", "08:00")
+    deadline = RunDeadline.from_env(now=datetime(2026, 1, 5, 15, 30))
+    assert deadline.allows("enrich")
+    assert "締め切りを適用しません" in capsys.readouterr().out
+
+    monkeypatch.setenv("RUN_TIME_BUDGET_MINUTES", "30")
+    deadline = RunDeadline.from_env(now=datetime(2026, 1, 5, 15, 30))
+    assert 1790 < deadline.remaining() <= 1800
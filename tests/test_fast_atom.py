@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import feedparser
+import pytest
+
+from src.fast_atom import is_atom_feed, parse_atom
+from src.rss_single_fetch import _feedparser_fields, fetch_all_entries
+
+
+def alerts_feed(count: int) -> bytes:
+    """Googleアラートと同じ構造のAtomフィードを生成する"""
+    entries = "".join(
+        f"""<entry>
+<id>tag:google.com,2013:googlealerts/feed:{i}</id>
+<title type="html">&lt;b&gt;AI&lt;/b&gt; ニュース {i} &amp;amp; データ</title>
+<link href="https://www.google.com/url?rct=j&amp;sa=t&amp;url=https://example.com/{i}&amp;ct=ga"></link>
+<published>2026-10-{1 + i % 28:02d}T05:14:45Z</published>
+<updated>2026-10-{1 + i % 28:02d}T06:00:00Z</updated>
+<content type="html">{"機械学習 &lt;b&gt;AI&lt;/b&gt; の最新動向 " * 8}&amp;nbsp;{i}</content>
+<author><name></name></author>
+</entry>"""
+        for i in range(count)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:idx="urn:atom-extension:indexing">'
+        "<id>tag:google.com,2005:reader/user/0/state/com.google/alerts/1</id>"
+        "<title>Google アラート - AI</title>"
+        f"<updated>2026-10-19T00:00:00Z</updated>{entries}</feed>"
+    ).encode()
+
+
+def test_parse_atom_matches_feedparser():
+    """Googleアラートのフィードで、feedparserと同じタイトル・リンク・要約・公開日時を返すことをテスト"""
+    content = alerts_feed(30)
+    expected = [_feedparser_fields(e) for e in feedparser.parse(content).entries]
+    assert parse_atom(content) == expected
+    title, link, _, published = expected[0]
+    assert title == "<b>AI</b> ニュース 0 &amp; データ"
+    assert link.startswith("https://www.google.com/url?rct=j&sa=t&url=")
+    assert published == "2026-10-01T05:14:45Z"
+
+
+def test_parse_atom_defaults_and_timestamps():
+    """欠けた要素の既定値と、タイムゾーン付きの日時のUTCへの変換をテスト"""
+    content = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<entry><summary>S</summary><content>C</content>
+<link rel="self" href="http://self"/><link href="http://alt"/>
+<published>2026-10-19T09:30:00.123+09:00</published></entry>
+<entry><updated>2026-10-19T00:00:00Z</updated></entry>
+<entry><published>invalid</published></entry>
+</feed>"""
+    assert parse_atom(content) == [
+        ("タイトルなし", "http://alt", "S", "2026-10-19T00:30:00Z"),
+        ("タイトルなし", "#", "", "2026-10-19T00:00:00Z"),
+        ("タイトルなし", "#", "", None),
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        # Atomの名前空間を宣言しているRSS 2.0
+        b'<?xml version="1.0"?><rss xmlns:atom="http://www.w3.org/2005/Atom"><channel/></rss>',
+        b"<feed><entry><title>no namespace</title></entry></feed>",
+        "<feed xmlns='http://www.w3.org/2005/Atom'></feed>",
+    ],
+)
+def test_non_atom_feeds_are_not_recognized(content):
+    """Atom以外のフィードは専用パーサーの対象外と判定されることをテスト"""
+    assert not is_atom_feed(content)
+    assert parse_atom(content) is None
+
+
+def test_malformed_atom_falls_back_to_feedparser(mocker):
+    """XMLとして壊れたAtomはfeedparserで読み直すことをテスト"""
+    content = b'<feed xmlns="http://www.w3.org/2005/Atom"><entry><title>A</title>'
+    assert parse_atom(content) is None
+    mocker.patch(
+        "src.rss_single_fetch.requests.get",
+        return_value=MagicMock(content=content),
+    )
+    spy = mocker.spy(feedparser, "parse")
+    articles = fetch_all_entries("http://example.com/alerts")
+    spy.assert_called_once_with(content)
+    assert [a.title for a in articles] == ["A"]
+
+
+def test_fetch_all_entries_uses_fast_path_for_alerts(mocker):
+    """GoogleアラートのフィードはfeedparserなしでArticleに変換されることをテスト"""
+    mocker.patch(
+        "src.rss_single_fetch.requests.get",
+        return_value=MagicMock(content=alerts_feed(2)),
+    )
+    parse = mocker.patch("src.rss_single_fetch.feedparser.parse")
+    articles = fetch_all_entries("http://example.com/alerts")
+    parse.assert_not_called()
+    assert [a.published for a in articles] == [
+        "2026-10-01T05:14:45Z",
+        "2026-10-02T05:14:45Z",
+    ]
@@ -0,0 +1,29 @@
+import feedparser
+import pytest
+
+from src.fast_atom import parse_atom
+from tests.test_fast_atom import alerts_feed
+
+pytest.importorskip("pytest_benchmark")
+
+# 数MBのGoogleアラート相当のフィード（約0.8KB/エントリ）
+BENCHMARK_ENTRIES = 2500
+
+
+@pytest.fixture(scope="module")
+def large_feed():
+    content = alerts_feed(BENCHMARK_ENTRIES)
+    assert len(content) > 2_000_000
+    return content
+
+
+@pytest.mark.benchmark(group="feed_parse")
+def test_benchmark_feedparser(benchmark, large_feed):
+    feed = benchmark.pedantic(feedparser.parse, args=(large_feed,), rounds=1)
+    assert len(feed.entries) == BENCHMARK_ENTRIES
+
+
+@pytest.mark.benchmark(group="feed_parse")
+def test_benchmark_fast_atom(benchmark, large_feed):
+    entries = benchmark.pedantic(parse_atom, args=(large_feed,), rounds=3)
+    assert len(entries) == BENCHMARK_ENTRIES
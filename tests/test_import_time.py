@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# src.main のimportにかかる累積時間の上限（マイクロ秒）。重いSDKを読み込むと数百ms以上になる。
+IMPORT_TIME_THRESHOLD_US = 250_000
+
+# 起動時には読み込まれてはいけない重いモジュール
+HEAVY_MODULES = [
+    "google.generativeai",
+    "notion_client",
+    "feedparser",
+    "langdetect",
+    "numpy",
+]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _measure_import_time(module: str) -> dict:
+    """-X importtime の出力を解析し、モジュール名→累積時間(μs)の辞書を返す。"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+@pytest.fixture(scope="module")
+def main_import_timings():
+    return _measure_import_time("src.main")
+
+
+@pytest.mark.parametrize("heavy_module", HEAVY_MODULES)
+def test_main_import_does_not_load_heavy_sdk(main_import_timings, heavy_module):
+    """src.mainのimport時に重いSDKが読み込まれないことをテスト"""
+    assert heavy_module not in main_import_timings
+
+
+def test_main_import_time_under_threshold(main_import_timings):
+    """src.mainのimport時間が閾値以内であることをテスト"""
+    assert main_import_timings["src.main"] < IMPORT_TIME_THRESHOLD_US
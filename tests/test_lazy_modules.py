@@ -0,0 +1,44 @@
+import sys
+
+import pytest
+
+from src.lazy_modules import lazy_import
+
+
+@pytest.fixture
+def lazy_sample_module(tmp_path, monkeypatch):
+    """読み込み時に副作用（カウンタの加算）を持つ一時モジュールを用意するフィクスチャ"""
+    (tmp_path / "lazy_sample_mod.py").write_text(
+        "import builtins\n"
+        "builtins._lazy_sample_loads = getattr(builtins, '_lazy_sample_loads', 0) + 1\n"
+        "VALUE = 42\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_sample_mod", raising=False)
+    import builtins
+
+    monkeypatch.setattr(builtins, "_lazy_sample_loads", 0, raising=False)
+    yield "lazy_sample_mod"
+    sys.modules.pop("lazy_sample_mod", None)
+
+
+def test_lazy_import_missing_module_raises():
+    """存在しないモジュールを指定した場合にModuleNotFoundErrorが送出されることをテスト"""
+    with pytest.raises(ModuleNotFoundError, match="no_such_module_for_lazy_test"):
+        lazy_import("no_such_module_for_lazy_test")
+
+
+def test_lazy_import_defers_execution_until_attribute_access(lazy_sample_module):
+    """属性に初めてアクセスするまでモジュールが実行されないことをテスト"""
+    import builtins
+
+    module = lazy_import(lazy_sample_module)
+    assert builtins._lazy_sample_loads == 0
+    assert sys.modules[lazy_sample_module] is module
+
+    assert module.VALUE == 42
+    assert builtins._lazy_sample_loads == 1
+
+    # 2回目以降は再実行されない
+    assert lazy_import(lazy_sample_module).VALUE == 42
+    assert builtins._lazy_sample_loads == 1
@@ -1,15 +1,28 @@
 import pytest
 import os
-from datetime import datetime
+import threading
+from datetime import UTC, datetime
 
 # テスト対象のmain関数をインポート
-from src.main import main
+from src import local_cache
+from src.article import Article
+from src.article_history import ArticleHistory
+from src.main import (
+    LAST_COLLECTION_NAME,
+    collect_articles,
+    collection_since,
+    main,
+    select_articles,
+)
+from src.run_summary import reset_run_summary
 
 
 # main関数が依存する外部関数をモックするための準備
 @pytest.fixture(autouse=True)
-def mock_env_vars(monkeypatch):
+def mock_env_vars(monkeypatch, tmp_path):
     """環境変数をモックするフィクスチャ"""
+    monkeypatch.setitem(os.environ, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setitem(os.environ, "OUTBOX_DRAIN_SECONDS", "0")
     monkeypatch.setitem(os.environ, "GOOGLE_ALERTS_RSS_URLS", "http://example.com/rss")
     monkeypatch.setitem(os.environ, "NOTION_API_KEY", "mock_notion_key")
     monkeypatch.setitem(os.environ, "NOTION_DATABASE_ID", "mock_database_id")
@@ -141,7 +154,7 @@ def mock_remove_html_tags(mocker):
 
 @pytest.fixture
 def mock_notion_client(mocker):
-    return mocker.patch("src.main.Client")  # Notion Clientのモック
+    return mocker.patch("src.main.create_notion_client")  # Notion Clientのモック
 
 
 def test_main_successful_pipeline(
@@ -164,7 +177,7 @@ def test_main_successful_pipeline(
     main関数が正常に全パイプラインを実行するケースをテスト
     """
     # main関数を実行
-    main()
+    main([])
 
     # 各関数が期待通りに呼び出されたか検証
     mock_initialize_gemini.assert_called_once()
@@ -173,21 +186,25 @@ def test_main_successful_pipeline(
     assert mock_translate_and_summarize_with_gemini.call_count == 2
     assert mock_categorize_article_with_gemini.call_count == 2
     mock_select_and_summarize_articles_with_gemini.assert_called_once()
-    assert (
-        mock_generate_image_keywords_with_gemini.call_count == 2
-    )  # 2つの記事に対して呼ばれる
-    assert mock_search_image_from_unsplash.call_count == 2  # 2つの記事に対して呼ばれる
+    # 画像を表示するのはNotionのカバー（先頭の記事）のみのため、先頭の記事に対してのみ呼ばれる
+    mock_generate_image_keywords_with_gemini.assert_called_once()
+    mock_search_image_from_unsplash.assert_called_once()
     mock_generate_closing_comment_with_gemini.assert_called_once()
     mock_ensure_notion_database_properties.assert_called_once()
-    mock_create_notion_report_page.assert_called_once_with(
-        mock_notion_client.return_value,
-        mock_select_and_summarize_articles_with_gemini.return_value,
-        cover_image_url="http://unsplash.com/image.jpg",  # 最初の記事のimage_urlが渡される
-    )
+    mock_create_notion_report_page.assert_called_once()
+    args, kwargs = mock_create_notion_report_page.call_args
+    assert args[0] is mock_notion_client.return_value
+    # 選定結果はArticleに変換され、urlが保持されたまま渡される
+    assert [a.url for a in args[1]] == [
+        a["url"] for a in mock_select_and_summarize_articles_with_gemini.return_value
+    ]
+    assert (
+        kwargs["cover_image_url"] == "http://unsplash.com/image.jpg"
+    )  # 最初の記事のimage_urlが渡される
     mock_send_slack_message.assert_called_once()
     assert (
-        mock_remove_html_tags.call_count == 4
-    )  # 2つの記事のsummaryと2つの記事のtitleに対して呼ばれる
+        mock_remove_html_tags.call_count == 2
+    )  # 2つの記事のsummaryに対して呼ばれる（titleは収集時にまとめて整形する）
 
     # REPORT_DATEが設定されていることを確認
     assert "REPORT_DATE" in os.environ
@@ -200,7 +217,7 @@ def test_main_no_rss_urls_env_var(
 ):
     """GOOGLE_ALERTS_RSS_URLS 環境変数が設定されていない場合に早期終了することをテスト"""
     monkeypatch.delitem(os.environ, "GOOGLE_ALERTS_RSS_URLS")
-    main()
+    main([])
     captured = capsys.readouterr()
     assert (
         "エラー: GOOGLE_ALERTS_RSS_URLS 環境変数が設定されていません。GoogleアラートのRSSフィードURLを設定してください。"
@@ -215,7 +232,7 @@ def test_main_no_articles_fetched(
 ):
     """fetch_all_entriesが空のリストを返した場合に早期終了することをテスト"""
     mock_fetch_all_entries.return_value = []
-    main()
+    main([])
     captured = capsys.readouterr()
     assert "No articles fetched. Exiting." in captured.out
     mock_initialize_gemini.assert_called_once()
@@ -225,6 +242,9 @@ def test_main_no_articles_fetched(
 def test_main_no_articles_selected(
     mock_initialize_gemini,
     mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
     mock_select_and_summarize_articles_with_gemini,
     capsys,
 ):
@@ -237,7 +257,7 @@ def test_main_no_articles_selected(
         }
     ]
     mock_select_and_summarize_articles_with_gemini.return_value = []
-    main()
+    main([])
     captured = capsys.readouterr()
     assert "No articles selected for the report. Exiting." in captured.out
     mock_initialize_gemini.assert_called_once()
@@ -248,9 +268,16 @@ def test_main_no_articles_selected(
 def test_main_notion_db_properties_failure(
     mock_initialize_gemini,
     mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
     mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
     mock_ensure_notion_database_properties,
     mock_create_notion_report_page,
+    mock_send_slack_message,
     capsys,
 ):
     """Notionデータベースのプロパティ準備に失敗した場合にNotionページ作成がスキップされることをテスト"""
@@ -272,19 +299,26 @@ def test_main_notion_db_properties_failure(
         }
     ]
     mock_ensure_notion_database_properties.return_value = False
-    main()
+    main([])
     captured = capsys.readouterr()
     assert (
         "エラー: Notionデータベースのプロパティの準備に失敗しました。Notionページ作成をスキップします。"
         in captured.out
     )
     mock_create_notion_report_page.assert_not_called()
+    mock_send_slack_message.assert_not_called()
 
 
 def test_main_no_slack_webhook_url(
     mock_initialize_gemini,
     mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
     mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
     mock_ensure_notion_database_properties,
     mock_create_notion_report_page,
     mock_send_slack_message,
@@ -312,7 +346,7 @@ def test_main_no_slack_webhook_url(
     ]
     mock_ensure_notion_database_properties.return_value = True
     mock_create_notion_report_page.return_value = "http://notion.so/report"
-    main()
+    main([])
     captured = capsys.readouterr()
     assert (
         "Skipping Slack notification. SLACK_WEBHOOK_URL or Notion report URL not available."
@@ -323,3 +357,426 @@ def test_main_no_slack_webhook_url(
         in captured.out
     )
     mock_send_slack_message.assert_not_called()
+
+
+def test_main_profile_flag_writes_summary(
+    mock_initialize_gemini, mock_fetch_all_entries, tmp_path
+):
+    """--profile指定時にステージごとのプロファイル結果が実行ディレクトリに出力されることをテスト"""
+    mock_fetch_all_entries.return_value = []
+    run_dir = tmp_path / "run"
+    main(["--profile", "--run-dir", str(run_dir)])
+    assert (run_dir / "01_collect.pstats").exists()
+    assert (run_dir / "01_collect.collapsed").exists()
+    assert (run_dir / "profile_summary.txt").exists()
+
+
+def test_main_expired_deadline_degrades_optional_stages(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    monkeypatch,
+    capsys,
+):
+    """締め切りを過ぎた場合も、LLM選定・画像・クロージングコメントを縮退させて配信することをテスト"""
+    monkeypatch.setitem(os.environ, "RUN_TIME_BUDGET_MINUTES", "0")
+    mock_ensure_notion_database_properties.return_value = True
+    mock_create_notion_report_page.return_value = "http://notion.so/report"
+    main([])
+
+    mock_select_and_summarize_articles_with_gemini.assert_not_called()
+    mock_generate_image_keywords_with_gemini.assert_not_called()
+    mock_search_image_from_unsplash.assert_not_called()
+    mock_generate_closing_comment_with_gemini.assert_not_called()
+    mock_create_notion_report_page.assert_called_once()
+    mock_send_slack_message.assert_called_once()
+    captured = capsys.readouterr()
+    assert "--- 実行サマリー ---" in captured.out
+    assert "[images]" in captured.out
+
+
+def test_main_max_enrich_articles_keeps_highest_priority(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    monkeypatch,
+):
+    """MAX_ENRICH_ARTICLES の上限内で、優先度の高い記事から要約されることをテスト"""
+    monkeypatch.setitem(os.environ, "MAX_ENRICH_ARTICLES", "1")
+    mock_fetch_all_entries.return_value = [
+        {"title": "Gardening tips", "url": "http://example.com/1", "summary": "S"},
+        {"title": "New LLM for Python", "url": "http://example.com/2", "summary": "S"},
+    ]
+    main([])
+
+    assert mock_translate_and_summarize_with_gemini.call_count == 1
+    enriched = mock_select_and_summarize_articles_with_gemini.call_args.args[0]
+    assert [article.url for article in enriched] == ["http://example.com/2"]
+
+
+def test_main_publish_overlaps_independent_steps(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+):
+    """Notionのスキーマ確認とクロージングコメント生成が並行に実行されることをテスト"""
+    # 両方が同時に実行されていなければバリアがタイムアウトする
+    barrier = threading.Barrier(2, timeout=5)
+
+    def ensure_properties(*args, **kwargs):
+        barrier.wait()
+        return True
+
+    def closing_comment(*args, **kwargs):
+        barrier.wait()
+        return "Closing"
+
+    mock_ensure_notion_database_properties.side_effect = ensure_properties
+    mock_generate_closing_comment_with_gemini.side_effect = closing_comment
+    mock_create_notion_report_page.return_value = "http://notion.so/report"
+    main([])
+
+    mock_send_slack_message.assert_called_once()
+    args, _ = mock_send_slack_message.call_args
+    assert args[2] == "http://notion.so/report"
+    assert args[5] == "Closing"
+
+
+def test_main_flush_outbox_redelivers_failed_slack_message(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    capsys,
+):
+    """Slack通知に失敗した場合、--flush-outbox でフィードやGeminiを使わずに再配信できることをテスト"""
+    mock_send_slack_message.return_value = False
+    main([])
+    assert "--flush-outbox で再配信できます" in capsys.readouterr().out
+
+    mock_initialize_gemini.reset_mock()
+    mock_fetch_all_entries.reset_mock()
+    mock_create_notion_report_page.reset_mock()
+    mock_send_slack_message.reset_mock()
+    mock_send_slack_message.return_value = True
+    main(["--flush-outbox"])
+
+    mock_initialize_gemini.assert_not_called()
+    mock_fetch_all_entries.assert_not_called()
+    # Notionレポートは配信済みのため、Slack通知のみ再配信される
+    mock_create_notion_report_page.assert_not_called()
+    mock_send_slack_message.assert_called_once()
+    args, _ = mock_send_slack_message.call_args
+    assert args[2] == "http://notion.so/report"
+    assert args[5] == "Closing comment."
+
+    main(["--flush-outbox"])
+    assert "未配信の項目はありません。" in capsys.readouterr().out
+    mock_send_slack_message.assert_called_once()
+
+
+def test_main_fans_out_to_slack_targets_in_parallel(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    monkeypatch,
+    capsys,
+):
+    """SLACK_TARGETS の配信先に、共通のメッセージを並行に送信することをテスト"""
+    monkeypatch.setitem(os.environ, "COMMUNITY_WEBHOOK", "http://example.com/c")
+    monkeypatch.setitem(
+        os.environ,
+        "SLACK_TARGETS",
+        '[{"name": "main", "webhook_env": "SLACK_WEBHOOK_URL", "channel": "#a"},'
+        ' {"name": "community", "webhook_env": "COMMUNITY_WEBHOOK", "channel": "#b"}]',
+    )
+    barrier = threading.Barrier(2, timeout=5)
+
+    def send(*args, **kwargs):
+        barrier.wait()
+        return True
+
+    mock_send_slack_message.side_effect = send
+    main([])
+
+    assert mock_send_slack_message.call_count == 2
+    calls = mock_send_slack_message.call_args_list
+    assert {(c.args[0], c.args[1]) for c in calls} == {
+        ("http://example.com/slack", "#a"),
+        ("http://example.com/c", "#b"),
+    }
+    # メッセージは一度だけ組み立てられ、全配信先で共有される
+    assert calls[0].kwargs["groups"] is calls[1].kwargs["groups"]
+    out = capsys.readouterr().out
+    assert "[slack:main] 成功" in out
+    assert "[slack:community] 成功" in out
+
+
+def test_main_updates_static_site_when_site_dir_is_set(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    monkeypatch,
+    tmp_path,
+):
+    """SITE_DIR が設定されている場合、静的サイトにレポートが追加されることをテスト"""
+    monkeypatch.setitem(os.environ, "SITE_DIR", str(tmp_path / "site"))
+    main([])
+    report_date = os.environ["REPORT_DATE"]
+    report_page = tmp_path / "site" / "reports" / f"{report_date}.md"
+    assert "Closing comment." in report_page.read_text(encoding="utf-8")
+    assert (tmp_path / "site" / "index.html").exists()
+
+
+def test_collection_since_uses_window_or_last_successful_run(monkeypatch):
+    """収集の下限が、設定した期間・前回成功した実行・既定の期間の順で決まることをテスト"""
+    now = datetime(2026, 1, 5, 12, 0, tzinfo=UTC)
+    assert collection_since(now) == "2026-01-02T12:00:00Z"
+    local_cache.save_json(LAST_COLLECTION_NAME, {"started_at": "2026-01-03T08:00:00Z"})
+    assert collection_since(now) == "2026-01-03T08:00:00Z"
+    monkeypatch.setitem(os.environ, "COLLECT_WINDOW_HOURS", "6")
+    assert collection_since(now) == "2026-01-05T06:00:00Z"
+
+
+def test_collect_articles_drops_old_and_capped_entries(
+    mock_fetch_all_entries, monkeypatch, capsys
+):
+    """フィードごとに古い記事と上限を超えた記事を除外し、件数をサマリーに記録することをテスト"""
+    monkeypatch.setitem(os.environ, "MAX_ENTRIES_PER_FEED", "1")
+    mock_fetch_all_entries.return_value = [
+        {"url": "http://example.com/old", "published": "2026-01-01T00:00:00Z"},
+        {"url": "http://example.com/1", "published": "2026-01-04T00:00:00Z"},
+        {"url": "http://example.com/2", "published": "2026-01-05T00:00:00Z"},
+    ]
+    summary = reset_run_summary()
+
+    articles = collect_articles(
+        ["http://a.com/rss", "http://b.com/rss"], "2026-01-02T00:00:00Z"
+    )
+
+    assert [a.url for a in articles] == ["http://example.com/2"] * 2
+    assert summary.counters == {
+        "feed_entries_dropped_old": 2,
+        "feed_entries_dropped_over_cap": 2,
+    }
+    # LLMの処理の前に、除外した件数が出力される
+    assert (
+        "以前の公開で除外: 2件、フィードごとの上限で除外: 2件"
+        in capsys.readouterr().out
+    )
+
+
+def test_main_records_successful_collection(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+):
+    """レポートを配信した実行の収集開始日時が、次回の収集の下限として保存されることをテスト"""
+    started_at = datetime.now(UTC).replace(microsecond=0)
+    main([])
+
+    recorded = local_cache.load_json(LAST_COLLECTION_NAME)["started_at"]
+    assert recorded >= started_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    assert collection_since(datetime.now(UTC)) == recorded
+
+
+def test_main_keeps_collection_window_when_report_is_not_queued(
+    monkeypatch,
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    capsys,
+):
+    """Notionの設定がなくレポートを配信も登録もできない場合は、収集済みとして記録しないことをテスト"""
+    monkeypatch.delitem(os.environ, "NOTION_API_KEY")
+    main([])
+
+    assert local_cache.load_json(LAST_COLLECTION_NAME) is None
+    assert "次回も同じ期間の記事を収集します" in capsys.readouterr().out
+
+
+def test_main_skips_articles_reported_in_previous_run(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+    capsys,
+):
+    """前回配信した記事と同じ記事は、LLMの処理の前に除外されることをテスト"""
+    main([])
+    assert mock_translate_and_summarize_with_gemini.call_count == 2
+    capsys.readouterr()
+
+    main([])
+
+    # 2回目の実行では、どちらの記事も配信済みのためGeminiを呼ばない
+    assert mock_translate_and_summarize_with_gemini.call_count == 2
+    output = capsys.readouterr().out
+    assert "配信済みの記事と類似のため除外した記事: 2件" in output
+    assert "articles_dropped_reported: 2" in output
+
+
+def test_main_records_history_only_after_notion_delivery(
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_notion_client,
+):
+    """Notionレポートを配信できなかった記事は履歴に追加せず、再配信できた時点で追加することをテスト"""
+    mock_create_notion_report_page.return_value = None
+    main([])
+    assert ArticleHistory().rows == []
+
+    mock_create_notion_report_page.return_value = "http://notion.so/report"
+    main(["--flush-outbox"])
+    assert [row["url"] for row in ArticleHistory().rows] == [
+        "http://example.com/1",
+        "http://example.com/2",
+    ]
+
+
+def test_select_articles_sends_fixed_number_of_candidates(
+    mock_select_and_summarize_articles_with_gemini, monkeypatch
+):
+    """LLMによる選定のプロンプトには、カテゴリごとに設定した件数の記事のみを載せることをテスト"""
+    monkeypatch.setitem(os.environ, "SELECTION_PROMPT_ARTICLES", "3")
+    articles = [
+        Article(
+            url=f"http://example.com/{i}",
+            title=f"記事{i}",
+            summary="S",
+            category="人工知能" if i % 2 else "プログラミング",
+        )
+        for i in range(40)
+    ]
+
+    select_articles(articles, history=ArticleHistory())
+
+    candidates = mock_select_and_summarize_articles_with_gemini.call_args.args[0]
+    assert len(candidates) == 6
+
+
+@pytest.mark.parametrize("mode, expected_calls", [("all", 2), ("none", 0)])
+def test_main_image_fetch_mode(
+    monkeypatch,
+    mode,
+    expected_calls,
+    mock_initialize_gemini,
+    mock_fetch_all_entries,
+    mock_is_foreign_language,
+    mock_translate_and_summarize_with_gemini,
+    mock_categorize_article_with_gemini,
+    mock_select_and_summarize_articles_with_gemini,
+    mock_generate_image_keywords_with_gemini,
+    mock_search_image_from_unsplash,
+    mock_generate_closing_comment_with_gemini,
+    mock_ensure_notion_database_properties,
+    mock_create_notion_report_page,
+    mock_send_slack_message,
+    mock_remove_html_tags,
+    mock_notion_client,
+):
+    """IMAGE_FETCH_MODE で画像を取得する記事の範囲を変更できる"""
+    monkeypatch.setenv("IMAGE_FETCH_MODE", mode)
+
+    main([])
+
+    assert mock_generate_image_keywords_with_gemini.call_count == expected_calls
+    assert mock_search_image_from_unsplash.call_count == expected_calls
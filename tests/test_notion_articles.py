@@ -0,0 +1,119 @@
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError
+
+from src.article import Article
+from src.notion_articles import article_properties, upsert_article_rows
+from src.run_summary import reset_run_summary
+from src.write_to_notion import PROP_CATEGORY, PROP_NAME, PROP_POINTS, PROP_URL
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def summary():
+    return reset_run_summary()
+
+
+class FakePages:
+    """作成・更新されたページを記録するNotionのpagesエンドポイントのモック"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.created = []
+        self.updated = []
+        self.deleted = set()
+
+    def create(self, parent, properties):
+        with self.lock:
+            page_id = f"page-{len(self.created) + 1}"
+            self.created.append((page_id, properties))
+        return {"id": page_id}
+
+    def update(self, page_id, properties):
+        if page_id in self.deleted:
+            raise APIResponseError(
+                code="object_not_found",
+                status=404,
+                message="Could not find page",
+                headers=httpx.Headers(),
+                raw_body_text="",
+            )
+        with self.lock:
+            self.updated.append((page_id, properties))
+        return {"id": page_id}
+
+
+def _articles():
+    return [
+        Article(
+            url=f"https://example.com/{i}",
+            title=f"記事{i}",
+            summary="要約",
+            points=["P1", "P2"],
+            category="人工知能",
+        )
+        for i in range(5)
+    ]
+
+
+def test_article_properties():
+    """1記事分のプロパティ（URL、selectのカテゴリ、ポイント）が組み立てられることをテスト"""
+    properties = article_properties(_articles()[0], "2026-01-05")
+    assert properties[PROP_URL] == {"url": "https://example.com/0"}
+    assert properties[PROP_CATEGORY] == {"select": {"name": "人工知能"}}
+    assert properties[PROP_POINTS]["rich_text"][0]["text"]["content"] == "・P1\n・P2"
+
+
+def test_article_properties_empty_title_falls_back():
+    """タイトルが空の記事は「タイトルなし」で書き込まれることをテスト"""
+    properties = article_properties(Article(url="https://example.com/x"), "2026-01-05")
+    assert properties[PROP_NAME]["title"][0]["text"]["content"] == "タイトルなし"
+
+
+def test_repeat_articles_are_updated_instead_of_created(summary):
+    """2回目の書き込みではURLインデックスにより作成ではなく更新になることをテスト"""
+    pages = FakePages()
+    notion = SimpleNamespace(pages=pages)
+
+    assert upsert_article_rows(notion, "db", _articles(), "2026-01-05") == 5
+    assert len(pages.created) == 5
+
+    assert upsert_article_rows(notion, "db", _articles()[:3], "2026-01-07") == 3
+    assert len(pages.created) == 5
+    assert sorted(page_id for page_id, _ in pages.updated) == [
+        "page-1",
+        "page-2",
+        "page-3",
+    ]
+    assert summary.counters["notion_article_rows_updated"] == 3
+
+
+def test_deleted_page_is_recreated(summary):
+    """インデックスのページが削除済みの場合は作り直してインデックスを更新することをテスト"""
+    pages = FakePages()
+    notion = SimpleNamespace(pages=pages)
+    upsert_article_rows(notion, "db", _articles()[:1], "2026-01-05")
+    pages.deleted.add(pages.created[0][0])
+
+    upsert_article_rows(notion, "db", _articles()[:1], "2026-01-06")
+    upsert_article_rows(notion, "db", _articles()[:1], "2026-01-07")
+
+    assert len(pages.created) == 2
+    assert [page_id for page_id, _ in pages.updated] == ["page-2"]
+
+
+def test_index_is_kept_per_database(summary):
+    """別のデータベースには既存のインデックスが使われないことをテスト"""
+    pages = FakePages()
+    notion = SimpleNamespace(pages=pages)
+    upsert_article_rows(notion, "db1", _articles()[:2], "2026-01-05")
+    upsert_article_rows(notion, "db2", _articles()[:2], "2026-01-05")
+    assert len(pages.created) == 4
+    assert pages.updated == []
@@ -0,0 +1,174 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from notion_client.errors import APIResponseError, RequestTimeoutError
+
+from src.notion_rate_limit import RateLimitedNotionClient, TokenBucket
+from src.run_summary import reset_run_summary
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _api_error(status, code, headers=None):
+    return APIResponseError(
+        code=code,
+        status=status,
+        message=f"{status} {code}",
+        headers=httpx.Headers(headers or {}),
+        raw_body_text="",
+    )
+
+
+class FlakyMethod:
+    """指定した例外を順に送出し、最後に結果を返すAPIメソッドのモック"""
+
+    def __init__(self, *errors, result="ok"):
+        self.errors = list(errors)
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+@pytest.fixture
+def summary():
+    return reset_run_summary()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _client(clock, **methods):
+    pages = SimpleNamespace(
+        create=methods.get("create", FlakyMethod()),
+        retrieve=methods.get("retrieve", FlakyMethod()),
+    )
+    blocks = SimpleNamespace(
+        children=SimpleNamespace(append=methods.get("append", FlakyMethod()))
+    )
+    notion = SimpleNamespace(pages=pages, blocks=blocks)
+    bucket = TokenBucket(rate=3, clock=clock, sleep=clock.sleep)
+    return RateLimitedNotionClient(notion, bucket=bucket, sleep=clock.sleep)
+
+
+def test_token_bucket_enforces_average_rate(clock):
+    """バーストの後は平均レートまで待機することをテスト"""
+    bucket = TokenBucket(rate=3, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(6)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(wait == pytest.approx(1 / 3) for wait in waits[3:])
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_nested_endpoints_are_proxied(clock):
+    """blocks.children.append のようなネストしたエンドポイントも呼び出せることをテスト"""
+    append = FlakyMethod(result={"results": []})
+    notion = _client(clock, append=append)
+    assert notion.blocks.children.append(block_id="b", children=[]) == {"results": []}
+    assert append.calls == 1
+
+
+def test_rate_limited_call_honors_retry_after(clock, summary):
+    """429の場合はRetry-Afterの秒数だけ待って、冪等でないメソッドも再試行することをテスト"""
+    create = FlakyMethod(_api_error(429, "rate_limited", {"Retry-After": "7"}))
+    notion = _client(clock, create=create)
+    assert notion.pages.create(parent={}) == "ok"
+    assert create.calls == 2
+    assert 7 in clock.sleeps
+    assert summary.counters["notion_rate_limited"] == 1
+    assert summary.counters["notion_retries"] == 1
+
+
+def test_server_error_retries_idempotent_calls_with_backoff(clock, summary):
+    """サーバーエラーとタイムアウトは冪等なメソッドのみ指数バックオフで再試行することをテスト"""
+    retrieve = FlakyMethod(
+        _api_error(502, "bad_gateway"), RequestTimeoutError(), result={"id": "p"}
+    )
+    notion = _client(clock, retrieve=retrieve)
+    assert notion.pages.retrieve(page_id="p") == {"id": "p"}
+    assert retrieve.calls == 3
+    backoffs = [s for s in clock.sleeps if s >= 1]
+    assert backoffs[0] == pytest.approx(1.0, rel=0.1)
+    assert backoffs[1] == pytest.approx(2.0, rel=0.1)
+    assert summary.counters["notion_retries"] == 2
+
+
+def test_server_error_is_not_retried_for_create(clock):
+    """冪等でないメソッドはサーバーエラーで再試行しない（重複作成を防ぐ）ことをテスト"""
+    create = FlakyMethod(_api_error(502, "bad_gateway"))
+    notion = _client(clock, create=create)
+    with pytest.raises(APIResponseError):
+        notion.pages.create(parent={})
+    assert create.calls == 1
+
+
+def test_client_errors_are_not_retried(clock):
+    """400系のエラーは再試行しないことをテスト"""
+    retrieve = FlakyMethod(_api_error(400, "validation_error"))
+    notion = _client(clock, retrieve=retrieve)
+    with pytest.raises(APIResponseError):
+        notion.pages.retrieve(page_id="p")
+    assert retrieve.calls == 1
+
+
+def test_gives_up_after_max_retries(clock):
+    """最大再試行回数を超えると例外を送出することをテスト"""
+    errors = [_api_error(429, "rate_limited", {"Retry-After": "1"})] * 10
+    create = FlakyMethod(*errors)
+    notion = _client(clock, create=create)
+    with pytest.raises(APIResponseError):
+        notion.pages.create(parent={})
+    assert create.calls == 5
+
+
+def test_top_level_request_is_rate_limited(clock, summary):
+    """クライアント直下のメソッド（request）もレート制限と再試行の対象になることをテスト"""
+    request = FlakyMethod(_api_error(429, "rate_limited", {"Retry-After": "2"}))
+    bucket = TokenBucket(rate=3, clock=clock, sleep=clock.sleep)
+    notion = RateLimitedNotionClient(
+        SimpleNamespace(request=request), bucket=bucket, sleep=clock.sleep
+    )
+    assert notion.request(path="databases/d/query", method="POST") == "ok"
+    assert request.calls == 2
+    assert summary.counters["notion_retries"] == 1
+
+
+def test_read_only_request_retries_server_errors(clock):
+    """request() によるデータベースのクエリは、サーバーエラーとタイムアウトで再試行することをテスト"""
+    request = FlakyMethod(_api_error(502, "bad_gateway"), RequestTimeoutError())
+    bucket = TokenBucket(rate=3, clock=clock, sleep=clock.sleep)
+    notion = RateLimitedNotionClient(
+        SimpleNamespace(request=request), bucket=bucket, sleep=clock.sleep
+    )
+    assert notion.request(path="databases/d/query", method="POST", body={}) == "ok"
+    assert request.calls == 3
+
+
+def test_writing_request_is_not_retried_for_server_errors(clock):
+    """request() による書き込みはサーバーエラーで再試行しないことをテスト"""
+    request = FlakyMethod(_api_error(502, "bad_gateway"))
+    bucket = TokenBucket(rate=3, clock=clock, sleep=clock.sleep)
+    notion = RateLimitedNotionClient(
+        SimpleNamespace(request=request), bucket=bucket, sleep=clock.sleep
+    )
+    with pytest.raises(APIResponseError):
+        notion.request(path="pages", method="POST", body={})
+    assert request.calls == 1
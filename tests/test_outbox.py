@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+
+from src.outbox import (
+    BASE_RETRY_DELAY,
+    MAX_DELIVERY_ATTEMPTS,
+    DeliveryError,
+    Outbox,
+    deliver_due,
+    drain,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def outbox(tmp_path, clock):
+    return Outbox(str(tmp_path / "outbox.sqlite3"), clock=clock)
+
+
+def test_enqueue_is_idempotent_per_key(outbox):
+    assert outbox.enqueue("slack:1", "slack", {"text": "a"})
+    assert outbox.enqueue("slack:1", "slack", {"text": "b"})
+    assert outbox.pending_count() == 1
+    assert outbox.get("slack:1").payload == {"text": "b"}
+
+    outbox.mark_delivered("slack:1")
+    # 配信済みの項目は redeliver=True の場合のみ再配信する
+    assert not outbox.enqueue("slack:1", "slack", {"text": "c"})
+    assert outbox.get("slack:1").status == "delivered"
+    assert outbox.enqueue("slack:1", "slack", {"text": "c"}, redeliver=True)
+    assert outbox.get("slack:1").status == "pending"
+
+
+def test_failed_delivery_backs_off_and_gives_up(outbox, clock):
+    outbox.enqueue("slack:1", "slack", {})
+
+    def fail(item):
+        raise DeliveryError("down")
+
+    assert deliver_due(outbox, {"slack": fail}) == 0
+    item = outbox.get("slack:1")
+    assert item.attempts == 1
+    assert item.next_attempt_at == clock.now + BASE_RETRY_DELAY
+    # 次の試行時刻までは配信しない
+    assert outbox.due_items() == []
+
+    for _ in range(MAX_DELIVERY_ATTEMPTS - 1):
+        deliver_due(outbox, {"slack": fail}, ignore_schedule=True)
+    assert outbox.get("slack:1").status == "dead"
+    assert outbox.pending_count() == 0
+
+
+def test_dependent_item_waits_for_dependency(outbox):
+    outbox.enqueue("notion", "notion", {})
+    outbox.enqueue("slack", "slack", {}, depends_on="notion")
+    calls = []
+
+    def notion(item):
+        calls.append(item.key)
+        raise DeliveryError("down")
+
+    def slack(item):
+        calls.append(item.key)
+
+    deliver_due(outbox, {"notion": notion, "slack": slack})
+    assert calls == ["notion"]
+    assert outbox.get("slack").next_attempt_at == outbox.get("notion").next_attempt_at
+
+    deliver_due(outbox, {"notion": lambda item: "url", "slack": slack}, True)
+    assert outbox.get("notion").result == "url"
+    assert outbox.get("slack").status == "delivered"
+
+
+def test_dependent_item_is_dropped_with_dead_dependency(outbox):
+    outbox.enqueue("notion", "notion", {})
+    outbox.enqueue("slack", "slack", {}, depends_on="notion")
+    outbox.mark_dead("notion", "gone")
+    deliver_due(outbox, {"slack": lambda item: None})
+    assert outbox.get("slack").status == "dead"
+
+
+def test_progress_survives_retry_and_blocks_replacement(outbox):
+    outbox.enqueue("slack", "slack", {"parts": 3})
+    outbox.set_progress("slack", 2)
+    outbox.mark_failed("slack", "down")
+    # 途中まで送信した項目は内容を置き換えず、続きから送る
+    assert not outbox.enqueue("slack", "slack", {"parts": 5})
+    item = outbox.get("slack")
+    assert item.progress == 2
+    assert item.payload == {"parts": 3}
+
+
+def test_drain_retries_with_backoff_until_delivered(outbox, clock):
+    outbox.enqueue("slack", "slack", {})
+    results = iter([DeliveryError("down"), DeliveryError("down"), None])
+
+    def flaky(item):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+
+    assert drain(outbox, {"slack": flaky}, wait_seconds=60, sleep=clock.sleep)
+    assert outbox.get("slack").status == "delivered"
+    assert clock.now == 1000.0 + BASE_RETRY_DELAY * 3
+
+
+def test_drain_gives_up_after_wait_seconds(outbox, clock):
+    outbox.enqueue("slack", "slack", {})
+
+    def fail(item):
+        raise DeliveryError("down")
+
+    assert not drain(outbox, {"slack": fail}, wait_seconds=1, sleep=clock.sleep)
+    assert outbox.pending_count() == 1
+
+
+def test_independent_items_are_delivered_concurrently(outbox):
+    outbox.enqueue("notion", "notion", {})
+    outbox.enqueue("slack:a", "slack", {}, depends_on="notion")
+    outbox.enqueue("slack:b", "slack", {}, depends_on="notion")
+    # 2つの配信先が同時に送信していなければバリアがタイムアウトする
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slack(item):
+        barrier.wait()
+
+    handlers = {"notion": lambda item: "url", "slack": slack}
+    assert deliver_due(outbox, handlers) == 3
+    assert outbox.pending_count() == 0
@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.article import Article
+from src.article_history import ArticleHistory
+from src.preselect import category_profiles, mmr_order, preselect_for_prompt
+
+TODAY = date(2026, 1, 14)
+
+
+@pytest.fixture
+def history(monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("EMBEDDING_BACKEND", raising=False)
+    return ArticleHistory()
+
+
+def _article(url, title, category="人工知能"):
+    return Article(url=url, title=title, summary="", category=category)
+
+
+def test_mmr_order_prefers_relevant_and_diverse_articles():
+    """関連度の高い記事から選び、選んだ記事とほぼ同じ記事は後回しにすることをテスト"""
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.6, 0.8]], dtype=np.float32)
+    relevance = np.array([0.9, 0.89, 0.8], dtype=np.float32)
+    assert mmr_order(relevance, vectors, 2) == [0, 2]
+    assert mmr_order(relevance, vectors, 5) == [0, 2, 1]
+
+
+def test_category_profiles_follow_reported_articles(history):
+    """直近に配信したカテゴリの記事の重心が、プロファイルに反映されることをテスト"""
+    before = category_profiles(history, ["人工知能"], TODAY)
+    np.testing.assert_allclose(np.linalg.norm(before, axis=1), 1.0, rtol=1e-5)
+    reported = _article("r", "画像生成モデルの新しいベンチマーク")
+    history.record([reported], "2026-01-12")
+
+    after = category_profiles(history, ["人工知能"], TODAY)
+    target = history.embed_articles([_article("x", "画像生成モデルのベンチマーク")])[0]
+    assert after[0] @ target > before[0] @ target
+
+
+def test_preselect_for_prompt_caps_each_category(history):
+    """カテゴリごとに上位の記事に絞り、件数が上限以下のカテゴリはそのまま残すことをテスト"""
+    articles = [
+        _article(f"dup{i}", "LLMの推論を高速化する手法 gemini gpt") for i in range(5)
+    ]
+    articles += [
+        _article("garden", "家庭菜園の始め方"),
+        _article("llm", "生成AIとdeep learningの最新研究 claude"),
+        _article("py", "Pythonの型ヒント入門", category="プログラミング"),
+    ]
+    candidates = preselect_for_prompt(
+        articles, ["人工知能", "プログラミング"], history, TODAY, count=2
+    )
+    urls = [a.url for a in candidates]
+    assert len(urls) == 3
+    assert urls[-1] == "py"
+    # 同じ内容の記事は1件のみ、関係の薄い記事は選ばれない
+    assert sum(url.startswith("dup") for url in urls) == 1
+    assert "llm" in urls and "garden" not in urls
@@ -0,0 +1,61 @@
+from datetime import UTC, datetime
+
+from src.article import Article
+from src.prioritize import (
+    domain_weight,
+    keyword_matches,
+    prioritize_articles,
+    recency_score,
+    source_domain,
+)
+
+NOW = datetime(2026, 1, 5, 12, 0, tzinfo=UTC)
+CATEGORIES = ["人工知能", "プログラミング"]
+
+
+def test_source_domain_resolves_google_alerts_redirect():
+    """GoogleアラートのリダイレクトURLから転送先のドメインが取り出されることをテスト"""
+    url = "https://www.google.com/url?rct=j&sa=t&url=https://www.zenn.dev/articles/x&ct=ga"
+    assert source_domain(url) == "zenn.dev"
+    assert source_domain("https://blog.arxiv.org/post") == "blog.arxiv.org"
+    assert domain_weight("blog.arxiv.org") == domain_weight("arxiv.org")
+    assert domain_weight("unknown.example") == 1.0
+
+
+def test_recency_score_halves_per_half_life():
+    """公開からの経過時間に応じて新しさのスコアが減衰することをテスト"""
+    assert recency_score("2026-01-05T12:00:00Z", NOW) == 1.0
+    assert recency_score("2026-01-04T12:00:00Z", NOW) == 0.5
+    assert recency_score(None, NOW) == recency_score("not a date", NOW)
+
+
+def test_keyword_matches_uses_word_boundaries_for_ascii():
+    """英数字のキーワードが単語単位で照合されることをテスト"""
+    assert keyword_matches("New LLM release for Python", CATEGORIES) == 2
+    assert keyword_matches("Said the chairman", CATEGORIES) == 0
+    assert keyword_matches("人工知能の最新動向", CATEGORIES) == 1
+
+
+def test_prioritize_articles_orders_by_score_and_merges_duplicates():
+    """スコアの高い順に並び、重複記事が1件にまとめられることをテスト"""
+    old = Article(
+        url="http://example.com/old",
+        title="Gardening tips",
+        published="2025-12-01T00:00:00Z",
+    )
+    fresh = Article(
+        url="http://example.com/fresh",
+        title="LLM agents in Python",
+        published="2026-01-05T11:00:00Z",
+    )
+    duplicate = Article(url="http://example.org/fresh", title="LLM  agents in Python")
+
+    ordered = list(prioritize_articles([old, fresh, duplicate], CATEGORIES, now=NOW))
+
+    assert ordered == [fresh, old]
+
+
+def test_prioritize_articles_keeps_feed_order_on_ties():
+    """スコアが同じ場合は元の順序が保たれることをテスト"""
+    articles = [Article(url=f"http://example.com/{i}", title=f"T{i}") for i in range(5)]
+    assert list(prioritize_articles(articles, CATEGORIES, now=NOW)) == articles
@@ -0,0 +1,80 @@
+import cProfile
+import os
+import pstats
+
+from src.profiling import (
+    NullProfiler,
+    StageProfiler,
+    collapse_stacks,
+    create_profiler,
+)
+
+
+def _busy_work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_create_profiler_disabled_returns_null_profiler(tmp_path):
+    """--profile未指定時はNullProfilerが返され、ファイルが作成されないことをテスト"""
+    run_dir = tmp_path / "run"
+    profiler = create_profiler(False, str(run_dir))
+    assert isinstance(profiler, NullProfiler)
+    with profiler.stage("collect"):
+        _busy_work(100)
+    assert profiler.write_summary() is None
+    assert not run_dir.exists()
+
+
+def test_stage_profiler_writes_reports(tmp_path):
+    """ステージごとに統計ファイル、collapsed stack、メモリ確保レポートが出力されることをテスト"""
+    profiler = StageProfiler(str(tmp_path), top_n=5)
+    with profiler.stage("enrich"):
+        _busy_work(20000)
+        [bytearray(1024) for _ in range(100)]
+
+    files = sorted(os.listdir(tmp_path))
+    assert files == [
+        "01_enrich.alloc.txt",
+        "01_enrich.collapsed",
+        "01_enrich.cumulative.txt",
+        "01_enrich.pstats",
+        "01_enrich.tottime.txt",
+    ]
+    assert (
+        (tmp_path / "01_enrich.alloc.txt").read_text().startswith("peak traced memory:")
+    )
+    for line in (tmp_path / "01_enrich.collapsed").read_text().splitlines():
+        stack, weight = line.rsplit(" ", 1)
+        assert stack
+        assert int(weight) >= 1
+
+    summary = profiler.write_summary()
+    assert "[enrich]" in summary
+    assert "_busy_work" in summary
+    assert (tmp_path / "profile_summary.txt").exists()
+
+
+def test_stage_profiler_numbers_stages_in_order(tmp_path):
+    """複数ステージが実行順の連番付きで出力されることをテスト"""
+    profiler = StageProfiler(str(tmp_path))
+    with profiler.stage("collect"):
+        _busy_work(10)
+    with profiler.stage("select"):
+        _busy_work(10)
+    assert (tmp_path / "01_collect.pstats").exists()
+    assert (tmp_path / "02_select.pstats").exists()
+
+
+def test_collapse_stacks_nests_callee_under_caller():
+    """呼び出し元→呼び出し先の順にフレームが連結されることをテスト"""
+    profile = cProfile.Profile()
+    profile.enable()
+    _busy_work(50000)
+    profile.disable()
+
+    collapsed = collapse_stacks(pstats.Stats(profile))
+    assert any(
+        "_busy_work" in stack and stack.index("_busy_work") < stack.index("<genexpr>")
+        for stack in collapsed
+        if "<genexpr>" in stack
+    )
@@ -0,0 +1,110 @@
+import time
+
+from src.article import Article
+from src.report_model import build_report, render_markdown, utf16_length
+from src.send_slack_message import render_slack_groups
+from src.utils import NOTION_TEXT_BUDGET, SLACK_SECTION_BUDGET
+from src.write_to_notion import render_notion_sections
+
+# 1,000記事のレポートを3つのシンク向けに変換する時間の上限（秒）。1回の走査なら数十ms程度
+RENDER_1000_ARTICLES_THRESHOLD = 0.5
+
+
+def _articles(count):
+    return [
+        Article(
+            url=f"https://example.com/{i}",
+            title=f"記事{i} & <b>",
+            summary="要約" * 50,
+            points=["P1", "P2"],
+            category=f"カテゴリ{i % 6}",
+        )
+        for i in range(count)
+    ]
+
+
+def test_build_report_groups_categories_in_first_seen_order():
+    """カテゴリは初出順にまとめられ、カテゴリのない記事は「その他」になることをテスト"""
+    articles = [
+        {"url": "u1", "title": "A", "category": "人工知能"},
+        {"url": "u2", "title": "B"},
+        {"url": "u3", "title": "C", "category": "人工知能"},
+    ]
+    report = build_report(articles, "2026-01-05")
+    assert [c.name for c in report.categories] == ["人工知能", "その他"]
+    assert [a.title for a in report.categories[0].articles] == ["A", "C"]
+    assert [a.url for a in report.articles()] == ["u1", "u3", "u2"]
+    assert report.article_count == 3
+    assert report.title == "AIニュースレポート - 2026-01-05"
+
+
+def test_report_article_precomputes_escaped_text_and_lengths():
+    """Slack用のエスケープとUTF-16の長さが組み立て時に計算されることをテスト"""
+    report = build_report(
+        [{"url": "u", "title": "A & <B> \U0001f600", "points": ["x<y"]}], "d"
+    )
+    article = next(report.articles())
+    assert article.slack_title == "A &amp; &lt;B&gt; \U0001f600"
+    assert article.slack_points == ("x&lt;y",)
+    assert article.title_length == utf16_length(article.title) == 10
+    assert article.summary == ""
+
+
+def test_report_article_fits_sink_budgets():
+    """テキストはNFKC正規化され、Notionの上限とSlackのsectionの上限に収まることをテスト"""
+    long_summary = "＆" * 5000
+    report = build_report(
+        [
+            {
+                "url": "https://example.com/a",
+                "title": "ＡＩ ﾆｭｰｽ",
+                "summary": long_summary,
+            }
+        ],
+        "d",
+    )
+    article = next(report.articles())
+    assert article.title == "AI ニュース"
+    assert article.summary_length == NOTION_TEXT_BUDGET.limit
+    assert article.summary.endswith("&…")
+
+    section = render_slack_groups(report, None, "")[1][1]["text"]["text"]
+    assert len(section) <= SLACK_SECTION_BUDGET.limit
+    # 要約の側で上限に収めているため、エスケープ（&amp;）の途中では切れない
+    assert section.endswith("&amp;…")
+
+
+def test_renderers_share_one_report():
+    """Notion・Slack・Markdownが同じモデルから同じ順序で記事を出力することをテスト"""
+    report = build_report(_articles(3), "2026-01-05")
+    sections = render_notion_sections(report)
+    groups = render_slack_groups(report, "https://notion.so/r", "Bye")
+    markdown = render_markdown(report, "https://notion.so/r", "Bye")
+
+    notion_titles = [
+        block["heading_3"]["rich_text"][0]["text"]["content"]
+        for _, blocks in sections
+        for block in blocks
+        if block["type"] == "heading_3"
+    ]
+    assert notion_titles == [a.title for a in report.articles()]
+    first_article_text = groups[1][1]["text"]["text"]
+    assert "*<https://example.com/0|記事0 &amp; &lt;b&gt;>*" in first_article_text
+    assert "### [記事0 & \\<b\\>](https://example.com/0)" in markdown
+    assert markdown.rstrip().endswith("Bye")
+
+
+def test_render_1000_articles_in_one_pass():
+    """1,000記事のレポートを、組み立てから3つのシンク向けの変換まで上限時間内に行えることをテスト"""
+    articles = _articles(1000)
+    started = time.perf_counter()
+    report = build_report(articles, "2026-01-05")
+    sections = render_notion_sections(report)
+    groups = render_slack_groups(report, "https://notion.so/r", "Bye")
+    markdown = render_markdown(report)
+    elapsed = time.perf_counter() - started
+
+    assert sum(len(blocks) for _, blocks in sections) == 2000
+    assert len(groups) == 1002
+    assert markdown.count("\n### ") == 1000
+    assert elapsed < RENDER_1000_ARTICLES_THRESHOLD
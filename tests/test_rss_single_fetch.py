@@ -1,5 +1,7 @@
+import time
 from unittest.mock import patch
-from src.rss_single_fetch import fetch_all_entries
+from src.article import Article
+from src.rss_single_fetch import fetch_all_entries, select_recent_entries
 import requests
 
 
@@ -339,3 +341,46 @@ def test_fetch_all_entries_timeout_on_article_fetch(
     assert articles[0]["title"] == "Article Timeout"
     assert articles[0]["url"] == article_url
     assert articles[0]["image_url"] is None  # エラーのため画像は取得されない
+
+
+@patch("src.rss_single_fetch.requests.get")
+@patch("src.rss_single_fetch.feedparser.parse")
+def test_fetch_all_entries_published_date(mock_feedparser_parse, mock_requests_get):
+    """公開日時がUTCのISO 8601形式で記事に設定されることをテスト"""
+    mock_requests_get.return_value = MockResponse(b"<rss></rss>")
+    dated_entry = MockFeedEntry(
+        title="Dated", link="http://example.com/dated", summary="S"
+    )
+    dated_entry.published_parsed = time.struct_time((2026, 1, 5, 6, 30, 0, 0, 5, 0))
+    undated_entry = MockFeedEntry(
+        title="Undated", link="http://example.com/undated", summary="S"
+    )
+    mock_feedparser_parse.return_value = MockFeedParser(
+        entries=[dated_entry, undated_entry]
+    )
+
+    articles = fetch_all_entries("http://example.com/rss")
+
+    assert articles[0].published == "2026-01-05T06:30:00Z"
+    assert articles[1].published is None
+
+
+def test_select_recent_entries_window_and_cap():
+    """下限より前の記事を除外し、上限を超えた分は古い記事から除外することをテスト"""
+    articles = [
+        Article(url="old", published="2026-01-01T00:00:00Z"),
+        Article(url="undated"),
+        Article(url="newer", published="2026-01-06T00:00:00Z"),
+        Article(url="new", published="2026-01-05T00:00:00Z"),
+        Article(url="boundary", published="2026-01-02T00:00:00Z"),
+    ]
+    recent, too_old, over_cap = select_recent_entries(
+        articles, "2026-01-02T00:00:00Z", max_entries=2
+    )
+    assert [a.url for a in recent] == ["newer", "new"]
+    assert (too_old, over_cap) == (2, 1)
+
+    # 上限がない場合はフィードの順序のまま、公開日時のない記事も残す
+    recent, too_old, over_cap = select_recent_entries(articles, None)
+    assert recent == articles
+    assert (too_old, over_cap) == (0, 0)
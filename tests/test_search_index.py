@@ -0,0 +1,94 @@
+from src.report_model import build_report
+from src.search_index import (
+    INDEX_SHARDS,
+    SearchIndex,
+    render_search_page,
+    shard_of,
+    tokenize,
+)
+
+
+def _report(date, articles):
+    return build_report(
+        [
+            {"url": f"https://example.com/{date}/{i}", "category": "人工知能", **a}
+            for i, a in enumerate(articles)
+        ],
+        date,
+    )
+
+
+def test_tokenize_uses_words_and_bigrams():
+    """英数字は単語、日本語は文字のバイグラムに分割し、全角英数字は正規化することをテスト"""
+    assert tokenize("ＧＰＴ-5 の機械学習") == {
+        "gpt",
+        "5",
+        "の機",
+        "機械",
+        "械学",
+        "学習",
+    }
+    assert tokenize("AI と") == {"ai", "と"}
+
+
+def test_shard_of_is_stable_fnv1a():
+    """シャード番号がFNV-1aで計算され、範囲内に収まることをテスト"""
+    assert shard_of("a", 2**32) == 0xE40C292C
+    assert all(0 <= shard_of(t) < INDEX_SHARDS for t in ["ai", "機械", "gpt"])
+
+
+def test_search_finds_articles_across_reports(tmp_path):
+    """複数回の更新で追加した記事を、すべてのトークンを含むものに絞って新しい順に返すことをテスト"""
+    root = str(tmp_path)
+    SearchIndex(root).add_report(
+        _report("2026-01-05", [{"title": "機械学習の基礎", "summary": "Python入門"}])
+    )
+    SearchIndex(root).add_report(
+        _report(
+            "2026-01-07",
+            [
+                {"title": "深層学習", "summary": "GPU", "points": ["機械学習の応用"]},
+                {"title": "Rust", "summary": "高速化"},
+            ],
+        )
+    )
+    index = SearchIndex(root)
+    assert [d["title"] for d in index.search("機械学習")] == [
+        "深層学習",
+        "機械学習の基礎",
+    ]
+    assert [d["title"] for d in index.search("機械学習 python")] == ["機械学習の基礎"]
+    assert index.search("存在しない") == []
+
+
+def test_update_only_touches_shards_of_new_tokens(tmp_path, mocker):
+    """更新では、新しい記事のトークンを含むシャードのみを書き込むことをテスト"""
+    root = str(tmp_path)
+    SearchIndex(root).add_report(_report("2026-01-05", [{"title": "機械学習"}]))
+
+    index = SearchIndex(root)
+    save = mocker.spy(index, "_save")
+    index.add_report(_report("2026-01-07", [{"title": "AI"}]))
+    saved = {call.args[0] for call in save.call_args_list}
+    assert saved == {
+        f"index/{shard_of('ai'):02x}.json",
+        "docs/0.json",
+        "reports/2026-01-07.json",
+        "meta.json",
+    }
+
+
+def test_rebuilding_a_report_replaces_its_articles(tmp_path):
+    """同じ日付のレポートを追加し直すと、以前の記事が検索結果から消えることをテスト"""
+    root = str(tmp_path)
+    SearchIndex(root).add_report(_report("2026-01-05", [{"title": "古い記事"}]))
+    SearchIndex(root).add_report(_report("2026-01-05", [{"title": "新しい記事"}]))
+    index = SearchIndex(root)
+    assert index.search("古い") == []
+    assert [d["title"] for d in index.search("記事")] == ["新しい記事"]
+
+
+def test_search_page_uses_same_shard_count():
+    page = render_search_page()
+    assert f"SHARDS = {INDEX_SHARDS}" in page
+    assert "__SHARDS__" not in page
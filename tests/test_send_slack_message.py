@@ -0,0 +1,228 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.report_model import truncate_mrkdwn
+from src.send_slack_message import (
+    SLACK_MAX_BLOCKS,
+    SLACK_MAX_SECTION_TEXT,
+    SlackTarget,
+    apply_target_options,
+    build_message_groups,
+    load_slack_targets,
+    pack_messages,
+    send_slack_message,
+)
+
+
+def _response(status_code=200, headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {}, text="")
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            f"HTTP Error: {status_code}"
+        )
+    return response
+
+
+@pytest.fixture
+def session(mocker):
+    session = MagicMock()
+    session.post.return_value = _response()
+    mocker.patch("src.send_slack_message._session", return_value=session)
+    return session
+
+
+@pytest.fixture
+def mock_sleep(mocker):
+    return mocker.patch("src.send_slack_message.time.sleep")
+
+
+def _articles(count, category="人工知能"):
+    return [
+        {
+            "title": f"記事{i}",
+            "url": f"https://example.com/{i}",
+            "summary": "要約",
+            "points": ["P1", "P2"],
+            "category": category,
+        }
+        for i in range(count)
+    ]
+
+
+def _sent_payloads(session):
+    return [json.loads(call.kwargs["data"]) for call in session.post.call_args_list]
+
+
+def test_truncate_mrkdwn_keeps_limit_links_and_escapes():
+    """上限文字数以内に切り詰められ、リンクやエスケープの途中では切れないことをテスト"""
+    assert truncate_mrkdwn("abc", 3) == "abc"
+    assert truncate_mrkdwn("abcdef", 4) == "abc…"
+    truncated = truncate_mrkdwn("要約 <https://example.com/long|タイトル>", 20)
+    assert truncated == "要約 …"
+    assert truncate_mrkdwn("A &amp; B", 6) == "A …"
+    assert len(truncate_mrkdwn("あ" * 5000, SLACK_MAX_SECTION_TEXT)) == (
+        SLACK_MAX_SECTION_TEXT
+    )
+
+
+def test_small_report_is_sent_as_one_message(session):
+    """ブロック数が上限内の場合は1通で送信されることをテスト"""
+    assert send_slack_message(
+        "http://hook", "#ch", "http://notion", _articles(3), "2026-01-05", "Bye"
+    )
+    payloads = _sent_payloads(session)
+    assert len(payloads) == 1
+    assert payloads[0]["channel"] == "#ch"
+    assert payloads[0]["blocks"][0]["type"] == "header"
+    assert payloads[0]["blocks"][-1]["text"]["text"] == "Bye"
+
+
+def test_large_report_is_split_in_order(session):
+    """18記事のレポートが50ブロック以内の複数メッセージに順番に分割されることをテスト"""
+    articles = _articles(9) + _articles(9, category="プログラミング")
+    assert send_slack_message(
+        "http://hook", "#ch", "http://notion", articles, "2026-01-05", "Bye"
+    )
+    payloads = _sent_payloads(session)
+    assert len(payloads) == 2
+    assert all(len(p["blocks"]) <= SLACK_MAX_BLOCKS for p in payloads)
+    assert "続き 2/2" in payloads[1]["blocks"][0]["elements"][0]["text"]
+    texts = [
+        block["text"]["text"]
+        for payload in payloads
+        for block in payload["blocks"]
+        if block["type"] == "section"
+    ]
+    titles = [t for t in texts if t.startswith("*<https://example.com/")]
+    assert len(titles) == 18
+    assert texts[-1] == "Bye"
+    # 記事のブロック（見出し・ポイント・区切り線）はメッセージをまたがない
+    for payload in payloads:
+        assert payload["blocks"][-1]["type"] in ("divider", "section")
+
+
+def test_pack_messages_keeps_groups_together():
+    """グループが分割されずに詰められることをテスト"""
+    groups = [[1, 2], [3, 4, 5], [6]]
+    assert pack_messages(groups, max_blocks=4) == [[1, 2], [3, 4, 5, 6]]
+
+
+def test_category_heading_stays_with_first_article():
+    """カテゴリ見出しが最初の記事と同じグループになることをテスト"""
+    groups = build_message_groups(None, _articles(2), "2026-01-05", "")
+    assert groups[1][0]["text"]["text"] == "*【人工知能】*"
+    assert len(groups) == 3
+
+
+def test_rate_limited_post_honors_retry_after(session, mock_sleep):
+    """429の場合はRetry-Afterの秒数待ってから再送することをテスト"""
+    session.post.side_effect = [
+        _response(429, {"Retry-After": "3"}),
+        _response(),
+    ]
+    assert send_slack_message(
+        "http://hook", "#ch", None, _articles(1), "2026-01-05", ""
+    )
+    assert session.post.call_count == 2
+    mock_sleep.assert_called_once_with(3.0)
+
+
+def test_client_error_is_not_retried_and_stops_followups(session, mock_sleep):
+    """400系のエラーは再試行せず、後続のメッセージも送信しないことをテスト"""
+    session.post.return_value = _response(400)
+    articles = _articles(20)
+    assert not send_slack_message(
+        "http://hook", "#ch", None, articles, "2026-01-05", ""
+    )
+    assert session.post.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+def test_connection_error_is_retried_with_backoff(session, mock_sleep):
+    """通信エラーは指数バックオフで再試行し、上限を超えると失敗することをテスト"""
+    session.post.side_effect = requests.exceptions.ConnectionError("down")
+    assert not send_slack_message(
+        "http://hook", "#ch", None, _articles(1), "2026-01-05", ""
+    )
+    assert session.post.call_count == 4
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0, 4.0]
+
+
+def test_resume_skips_parts_already_sent(session):
+    """start_part 通目までは送信せず、送信するごとに送信済みの通数を通知することをテスト"""
+    articles = _articles(9) + _articles(9, category="プログラミング")
+    sent = []
+    assert send_slack_message(
+        "http://hook",
+        "#ch",
+        "http://notion",
+        articles,
+        "2026-01-05",
+        "Bye",
+        start_part=1,
+        on_part_sent=sent.append,
+    )
+    payloads = _sent_payloads(session)
+    assert len(payloads) == 1
+    assert "続き 2/2" in payloads[0]["blocks"][0]["elements"][0]["text"]
+    assert sent == [2]
+
+
+def test_load_slack_targets_from_json(monkeypatch):
+    """SLACK_TARGETS の配信先を、webhook_env の環境変数からWebhook URLを引いて読み込むことをテスト"""
+    monkeypatch.setenv("COMMUNITY_WEBHOOK", "http://hook/community")
+    monkeypatch.setenv(
+        "SLACK_TARGETS",
+        json.dumps(
+            [
+                {"name": "main", "webhook_url": "http://hook/main", "channel": "#a"},
+                {
+                    "name": "community",
+                    "webhook_env": "COMMUNITY_WEBHOOK",
+                    "include_points": False,
+                    "mention": "<!here>",
+                },
+                {"name": "missing", "webhook_env": "UNSET_WEBHOOK"},
+            ]
+        ),
+    )
+    targets = load_slack_targets()
+    assert [t.name for t in targets] == ["main", "community"]
+    assert targets[0].channel == "#a"
+    assert targets[1].webhook_url == "http://hook/community"
+    assert not targets[1].include_points
+    assert targets[1].mention == "<!here>"
+
+
+def test_load_slack_targets_falls_back_to_single_webhook(monkeypatch):
+    """SLACK_TARGETS がない場合は SLACK_WEBHOOK_URL の1件になることをテスト"""
+    monkeypatch.delenv("SLACK_TARGETS", raising=False)
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "http://hook")
+    monkeypatch.setenv("SLACK_CHANNEL", "#news")
+    assert load_slack_targets() == [SlackTarget("#news", "http://hook", "#news")]
+    monkeypatch.delenv("SLACK_WEBHOOK_URL")
+    assert load_slack_targets() == []
+
+
+def test_target_options_filter_prerendered_groups():
+    """組み立て済みのグループから、配信先のオプションでブロックを取り除けることをテスト"""
+    groups = build_message_groups("http://notion", _articles(2), "2026-01-05", "Bye")
+    target = SlackTarget(
+        "community",
+        "http://hook",
+        "#ch",
+        include_points=False,
+        include_closing_comment=False,
+        mention="<!here>",
+    )
+    filtered = apply_target_options(groups, target)
+    texts = [b["text"]["text"] for g in filtered for b in g if b["type"] == "section"]
+    assert texts[0] == "<!here>"
+    assert not any(t.startswith("*初学者向けポイント") for t in texts)
+    assert "Bye" not in texts
+    assert texts[-1].startswith("Notionで詳細を見る")
+    # 元のグループは変更されない
+    assert any(b.get("block_id") == "closing_comment" for g in groups for b in g)
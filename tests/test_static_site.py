@@ -0,0 +1,136 @@
+import json
+import os
+
+import pytest
+
+from src.report_model import build_report
+from src.static_site import SiteBuilder, category_slug
+
+
+def _report(date, categories=("人工知能",), count=1):
+    articles = [
+        {
+            "url": f"https://example.com/{date}/{category}/{i}",
+            "title": f"{category}の記事{i}",
+            "summary": "要約",
+            "points": ["P1"],
+            "category": category,
+        }
+        for category in categories
+        for i in range(count)
+    ]
+    return build_report(articles, date)
+
+
+@pytest.fixture
+def site(tmp_path):
+    return str(tmp_path / "site")
+
+
+def _read(site, path):
+    with open(os.path.join(site, path), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_category_slug():
+    assert category_slug("人工知能") == "人工知能"
+    assert category_slug("Data / AI") == "data-ai"
+    assert category_slug("!!!") == "other"
+
+
+def test_first_report_builds_all_pages(site):
+    """最初のレポートで、レポート・カテゴリ・アーカイブ・トップページが生成されることをテスト"""
+    written = SiteBuilder(site).add_report(
+        _report("2026-01-05", ("人工知能", "プログラミング")), "Bye"
+    )
+    assert set(written) == {
+        "reports/2026-01-05.md",
+        "reports/2026-01-05.html",
+        "categories/人工知能/2026-01.html",
+        "categories/人工知能/index.html",
+        "categories/プログラミング/2026-01.html",
+        "categories/プログラミング/index.html",
+        "archive/2026-01.html",
+        "index.html",
+        "search.html",
+        "feeds/atom.xml",
+        "feeds/人工知能.xml",
+        "feeds/プログラミング.xml",
+    }
+    assert "Bye" in _read(site, "reports/2026-01-05.md")
+    assert 'href="reports/2026-01-05.html"' in _read(site, "index.html")
+
+
+def test_only_http_urls_are_rendered_as_links(site):
+    """http(s)以外の記事URL（javascript: など）はリンクにせず、タイトルのみ出力することをテスト"""
+    report = build_report(
+        [
+            {
+                "url": "javascript:alert(1)",
+                "title": "危険な記事",
+                "category": "人工知能",
+            },
+            {
+                "url": "HTTPS://example.com/a",
+                "title": "安全な記事",
+                "category": "人工知能",
+            },
+        ],
+        "2026-01-05",
+    )
+    SiteBuilder(site).add_report(report)
+    for path in ("reports/2026-01-05.html", "categories/人工知能/2026-01.html"):
+        page = _read(site, path)
+        assert "javascript:" not in page
+        assert "危険な記事" in page
+        assert '<a href="HTTPS://example.com/a">安全な記事</a>' in page
+
+
+def test_unchanged_report_is_not_rebuilt(site):
+    """同じ内容のレポートを再度追加しても、ページを書き込まないことをテスト"""
+    SiteBuilder(site).add_report(_report("2026-01-05"))
+    assert SiteBuilder(site).add_report(_report("2026-01-05")) == []
+
+
+def test_new_report_only_touches_affected_pages(site):
+    """新しいレポートでは、関係するカテゴリのページのみを更新することをテスト"""
+    SiteBuilder(site).add_report(_report("2026-01-05", ("人工知能", "プログラミング")))
+    written = SiteBuilder(site).add_report(_report("2026-01-07", ("人工知能",)))
+    assert set(written) == {
+        "reports/2026-01-07.md",
+        "reports/2026-01-07.html",
+        "categories/人工知能/2026-01.html",
+        "categories/人工知能/index.html",
+        "archive/2026-01.html",
+        "index.html",
+        "feeds/atom.xml",
+        "feeds/人工知能.xml",
+    }
+    category_page = _read(site, "categories/人工知能/2026-01.html")
+    assert category_page.index("2026-01-07") < category_page.index("2026-01-05")
+
+
+def test_replaced_report_removes_articles_from_dropped_category(site):
+    """同じ日付のレポートを置き換えると、消えたカテゴリのページからも記事が取り除かれることをテスト"""
+    SiteBuilder(site).add_report(_report("2026-01-05", ("人工知能", "プログラミング")))
+    SiteBuilder(site).add_report(_report("2026-01-05", ("人工知能",), count=2))
+    assert "2026-01-05" not in _read(site, "categories/プログラミング/2026-01.html")
+    with open(
+        os.path.join(site, "_data", "months", "2026-01.json"), encoding="utf-8"
+    ) as f:
+        assert [r["articles"] for r in json.load(f)] == [2]
+
+
+def test_update_cost_does_not_grow_with_archive(site):
+    """アーカイブが増えても、1回の更新で書き込むページ数が変わらないことをテスト"""
+    SiteBuilder(site).add_report(_report("2019-12-31"))
+    first = SiteBuilder(site).add_report(_report("2020-01-01"))
+    for month in range(1, 13):
+        for day in (1, 10, 20):
+            SiteBuilder(site).add_report(_report(f"2021-{month:02d}-{day:02d}"))
+    latest = SiteBuilder(site).add_report(_report("2022-01-01"))
+    assert len(latest) == len(first)
+    # トップページは最新の一定件数のみを載せ、過去のレポートは月別アーカイブから辿る
+    index = _read(site, "index.html")
+    assert "reports/2020-01-01.html" not in index
+    assert 'href="archive/2020-01.html"' in index
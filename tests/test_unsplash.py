@@ -0,0 +1,141 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import local_cache, unsplash
+from src.run_summary import reset_run_summary
+from src.unsplash import (
+    QUOTA_NAME,
+    keyword_key,
+    search_image_from_unsplash,
+    unsplash_query,
+)
+
+IMAGE_URL = "https://images.unsplash.com/photo-1"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("UNSPLASH_ACCESS_KEY", "test-key")
+    monkeypatch.delenv("UNSPLASH_CACHE_TTL_HOURS", raising=False)
+    monkeypatch.delenv("UNSPLASH_HOURLY_LIMIT", raising=False)
+
+
+@pytest.fixture
+def summary():
+    return reset_run_summary()
+
+
+@pytest.fixture
+def mock_get(mocker):
+    """Unsplash APIのレスポンス（画像1件、残りのリクエスト数49）を返すモック"""
+    response = MagicMock()
+    response.headers = {"X-Ratelimit-Remaining": "49"}
+    response.json.return_value = {"results": [{"urls": {"regular": IMAGE_URL}}]}
+    session = MagicMock()
+    session.get.return_value = response
+    mocker.patch.object(unsplash, "_session", return_value=session)
+    return session.get
+
+
+@pytest.fixture
+def clock(mocker):
+    """time.time() を進められるモック"""
+    now = {"value": 1_000_000.0}
+    mocker.patch.object(unsplash.time, "time", side_effect=lambda: now["value"])
+    return now
+
+
+def test_unsplash_query_is_normalized_and_fits_budget():
+    """検索クエリが正規化され、上限に収まるよう単語の区切りで短くされることをテスト"""
+    assert unsplash_query("ＡＩ,  ｄａｔａ\n") == "AI, data"
+    query = unsplash_query("keyword " * 30)
+    assert len(query) <= 100
+    assert query.split() == ["keyword"] * len(query.split())
+
+
+def test_keyword_key_ignores_order_case_and_duplicates():
+    """キャッシュのキーがキーワードの順序・大文字小文字・重複・区切り文字によらないことをテスト"""
+    assert keyword_key("robot, AI") == keyword_key("ai robot robot")
+    assert keyword_key("ＡＩ、Robot") == "ai,robot"
+    assert keyword_key("robot, AI") != keyword_key("robot, data")
+
+
+def test_search_uses_cache_for_same_keyword_set(mock_get, clock, summary):
+    """同じキーワードの集合は、順序や大文字小文字が違ってもAPIを呼ばずキャッシュから返すことをテスト"""
+    assert search_image_from_unsplash("AI, robot") == IMAGE_URL
+    assert search_image_from_unsplash("Robot, ai") == IMAGE_URL
+
+    mock_get.assert_called_once()
+    assert mock_get.call_args.kwargs["params"]["query"] == "AI, robot"
+    assert summary.counters["unsplash_cache_hits"] == 1
+
+
+def test_search_cache_expires_after_ttl(monkeypatch, mock_get, clock):
+    """キャッシュの有効期間を過ぎた結果は再検索することをテスト"""
+    monkeypatch.setenv("UNSPLASH_CACHE_TTL_HOURS", "1")
+    search_image_from_unsplash("AI")
+    clock["value"] += 3599
+    search_image_from_unsplash("AI")
+    assert mock_get.call_count == 1
+
+    clock["value"] += 1
+    search_image_from_unsplash("AI")
+    assert mock_get.call_count == 2
+
+
+def test_search_caches_empty_results(mock_get, clock):
+    """画像が見つからなかった結果もキャッシュし、同じキーワードで再検索しないことをテスト"""
+    mock_get.return_value.json.return_value = {"results": []}
+
+    assert search_image_from_unsplash("obscure") is None
+    assert search_image_from_unsplash("obscure") is None
+    mock_get.assert_called_once()
+
+
+def test_search_does_not_cache_errors(mock_get, clock):
+    """APIのエラーはキャッシュせず、次回は再検索することをテスト"""
+    mock_get.return_value.raise_for_status.side_effect = (
+        unsplash.requests.exceptions.HTTPError("500")
+    )
+    assert search_image_from_unsplash("AI") is None
+
+    mock_get.return_value.raise_for_status.side_effect = None
+    assert search_image_from_unsplash("AI") == IMAGE_URL
+    assert mock_get.call_count == 2
+
+
+def test_search_skips_when_hourly_limit_reached(monkeypatch, mock_get, clock, summary):
+    """直近1時間のリクエスト数が上限に達したら検索せず、1時間経つと再開することをテスト"""
+    monkeypatch.setenv("UNSPLASH_HOURLY_LIMIT", "2")
+    assert search_image_from_unsplash("one") == IMAGE_URL
+    assert search_image_from_unsplash("two") == IMAGE_URL
+    assert search_image_from_unsplash("three") is None
+    assert mock_get.call_count == 2
+    assert summary.counters["unsplash_quota_skipped"] == 1
+
+    clock["value"] += 3600
+    assert search_image_from_unsplash("three") == IMAGE_URL
+    assert mock_get.call_count == 3
+
+
+def test_search_stops_when_api_reports_no_remaining(mock_get, clock):
+    """APIが返した残りのリクエスト数が0なら、1時間は検索しないことをテスト"""
+    mock_get.return_value.headers = {"X-Ratelimit-Remaining": "0"}
+    search_image_from_unsplash("one")
+    assert local_cache.load_json(QUOTA_NAME)["remaining"] == 0
+
+    assert search_image_from_unsplash("two") is None
+    mock_get.assert_called_once()
+
+    clock["value"] += 3600
+    mock_get.return_value.headers = {"X-Ratelimit-Remaining": "49"}
+    assert search_image_from_unsplash("two") == IMAGE_URL
+
+
+def test_search_without_access_key_skips(monkeypatch, mock_get):
+    """UNSPLASH_ACCESS_KEY がない場合は検索しないことをテスト"""
+    monkeypatch.delenv("UNSPLASH_ACCESS_KEY")
+    assert search_image_from_unsplash("AI") is None
+    mock_get.assert_not_called()
@@ -1,5 +1,17 @@
 import pytest
-from src.utils import remove_html_tags
+
+from src.article import Article
+from src.utils import (
+    NOTION_TEXT_BUDGET,
+    UNSPLASH_QUERY_BUDGET,
+    clean_article_texts,
+    grapheme_boundary,
+    normalize_text,
+    remove_html_tags,
+    remove_html_tags_batch,
+    truncate_text,
+    utf16_length,
+)
 
 
 @pytest.mark.parametrize(
@@ -20,12 +32,13 @@ def test_remove_html_tags_various_cases(input_text, expected_text):
     "input_text, expected_text",
     [
         ("Hello&nbsp;World!", "Hello World!"),
-        ("&lt;p&gt;Hello&amp;World!&lt;/p&gt;", "Hello&World!"),
+        # エスケープされたタグは文字として残る
+        ("&lt;p&gt;Hello&amp;World!&lt;/p&gt;", "<p>Hello&World!</p>"),
         (
             "Text with &#x27;single quotes&#x27; and &#34;double quotes&#34;.",
             "Text with 'single quotes' and \"double quotes\".",
         ),
-        ("Multiple&nbsp;&nbsp;spaces", "Multiple  spaces"),
+        ("Multiple&nbsp;&nbsp;spaces", "Multiple spaces"),
     ],
 )
 def test_remove_html_tags_with_html_entities(input_text, expected_text):
@@ -36,7 +49,7 @@ def test_remove_html_tags_with_html_entities(input_text, expected_text):
 def test_remove_html_tags_malformed_tags():
     """壊れたHTMLタグが与えられた場合に可能な限り除去されることをテスト"""
     html_text = "Text with <broken tag and <another one>"
-    expected_text = "Text with "
+    expected_text = "Text with"
     assert remove_html_tags(html_text) == expected_text
 
 
@@ -46,8 +59,67 @@ def test_remove_html_tags_multiple_lines():
     <h1>Title</h1>
     <p>Paragraph content.</p>
 </div>"""
-    expected_text = """
-    Title
-    Paragraph content.
-"""
+    expected_text = "Title Paragraph content."
     assert remove_html_tags(html_text) == expected_text
+
+
+@pytest.mark.parametrize(
+    "input_text, expected_text",
+    [
+        ("<script>var a = '<b>';</script>本文", "本文"),
+        ("<STYLE type='text/css'>p { color: red }</STYLE>本文", "本文"),
+        ("前<!-- <p>コメント</p> -->後", "前後"),
+        ("a < b &amp;&amp; c > d", "a < b && c > d"),
+        ("\n  タブ\tと\r\n改行\u3000 ", "タブ と 改行"),
+    ],
+)
+def test_remove_html_tags_script_style_and_whitespace(input_text, expected_text):
+    """script/styleの本文・コメントの除去、タグでない < の保持、空白の正規化をテスト"""
+    assert remove_html_tags(input_text) == expected_text
+
+
+def test_batch_and_article_cleaning():
+    """テキストの一覧と記事の一覧をまとめて整形できることをテスト"""
+    assert remove_html_tags_batch(["<b>a</b>", "b&nbsp;c"]) == ["a", "b c"]
+    articles = [Article(url="u", title="<b>T</b>", summary=" S &amp; ")]
+    clean_article_texts(articles)
+    assert (articles[0].title, articles[0].summary) == ("T", "S &")
+
+
+def test_normalize_text_nfkc():
+    """全角英数字・半角カナ・互換文字がNFKCで統一されることをテスト"""
+    assert normalize_text("ＡＩ　ﾆｭｰｽ①") == "AI ニュース1"
+    text = "正規化済みのテキスト"
+    assert normalize_text(text) is text
+
+
+@pytest.mark.parametrize(
+    "text, limit, expected",
+    [
+        ("abc", 3, "abc"),
+        ("abcdef", 4, "abc…"),
+        # 濁点の結合文字（か + ゛）を分けない
+        ("abか\u3099cd", 4, "ab…"),
+        # 肌の色付きの絵文字とZWJシーケンスを分けない
+        ("a\U0001f44d\U0001f3fdbc", 3, "a…"),
+        ("a\U0001f468\u200d\U0001f4bbb", 4, "a…"),
+        # 国旗（Regional Indicatorの2文字）を分けない
+        ("x\U0001f1ef\U0001f1f5\U0001f1fa\U0001f1f8", 4, "x\U0001f1ef\U0001f1f5…"),
+        ("ab", 0, ""),
+    ],
+)
+def test_truncate_text_keeps_graphemes(text, limit, expected):
+    """上限以内に切り詰められ、書記素の途中では切れないことをテスト"""
+    truncated = truncate_text(text, limit)
+    assert truncated == expected
+    assert len(truncated) <= limit
+
+
+def test_truncate_text_utf16_and_budgets():
+    """UTF-16で数えるシンクと、シンクごとの上限に収まることをテスト"""
+    assert truncate_text("\U0001f600" * 3, 4, utf16=True) == "\U0001f600…"
+    fitted = NOTION_TEXT_BUDGET.fit("\U0001f600" * 1500)
+    assert utf16_length(fitted) <= NOTION_TEXT_BUDGET.limit
+    assert fitted.endswith("\U0001f600…")
+    assert UNSPLASH_QUERY_BUDGET.fit("a" * 200) == "a" * 100
+    assert grapheme_boundary("ab\u0301c", 2) == 1
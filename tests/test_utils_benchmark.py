@@ -0,0 +1,50 @@
+import html
+import re
+
+import pytest
+
+from src.utils import remove_html_tags, remove_html_tags_batch
+
+pytest.importorskip("pytest_benchmark")
+
+SNIPPET_COUNT = 100_000
+
+
+def legacy_remove_html_tags(text: str) -> str:
+    """変更前の実装（そのまま）。呼び出しのたびにパターンを作り、エンティティを先にデコードする"""
+    # まずHTMLエンティティをデコード
+    decoded_text = html.unescape(text)
+    # ノーブレークスペースを通常のスペースに変換
+    decoded_text = decoded_text.replace("\xa0", " ")
+    # その後HTMLタグを除去
+    clean = re.compile("<.*?>")
+    return re.sub(clean, "", decoded_text)
+
+
+@pytest.fixture(scope="module")
+def snippets():
+    """フィードの summary/title を模した、タグ・エンティティ・プレーンテキストの混在データ"""
+    samples = [
+        "<p>Google、新しい<b>Gemini</b>モデルを発表&nbsp;&mdash; 推論性能が向上</p>",
+        "OpenAI releases new API for developers",
+        "<div><a href='https://example.com/a?x=1&amp;y=2'>記事へのリンク</a>&#8230;</div>",
+        "機械学習パイプラインの最適化手法",
+        "<br/>Rust &amp; Python: <i>performance</i> tips<br/>",
+    ]
+    return [f"{samples[i % len(samples)]} #{i}" for i in range(SNIPPET_COUNT)]
+
+
+@pytest.mark.benchmark(group="remove_html_tags")
+def test_benchmark_legacy(benchmark, snippets):
+    benchmark.pedantic(
+        lambda: [legacy_remove_html_tags(s) for s in snippets], rounds=3, iterations=1
+    )
+
+
+@pytest.mark.benchmark(group="remove_html_tags")
+def test_benchmark_compiled_batch(benchmark, snippets):
+    result = benchmark.pedantic(
+        remove_html_tags_batch, args=(snippets,), rounds=3, iterations=1
+    )
+    assert result[0] == remove_html_tags(snippets[0])
+    assert "<" not in result[0] and "&" not in result[0]
@@ -1,10 +1,19 @@
 import pytest
 import os
+from types import SimpleNamespace
 from unittest.mock import MagicMock
+
+import httpx
 from notion_client.errors import APIResponseError
 from src.write_to_notion import (
     ensure_notion_database_properties,
     create_notion_report_page,
+    invalidate_schema_cache,
+    is_schema_error,
+    chunk_blocks,
+    rich_text,
+    split_text,
+    NOTION_MAX_CHILDREN,
     PROP_NAME,
     PROP_DATE,
     PROP_STATUS,
@@ -14,7 +23,7 @@ from src.write_to_notion import (
 
 
 @pytest.fixture(autouse=True)
-def mock_env_vars(monkeypatch):
+def mock_env_vars(monkeypatch, tmp_path):
     """環境変数をモックするフィクスチャ"""
     monkeypatch.setenv("NOTION_DATABASE_ID", "test_database_id")
     monkeypatch.setenv("REPORT_DATE", "2023-11-01")
@@ -23,6 +32,7 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("NOTION_PROPERTY_STATUS", "Status")
     monkeypatch.setenv("NOTION_PROPERTY_ABSTRACT", "Abstract")
     monkeypatch.setenv("NOTION_PROPERTY_URL", "URL")
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
 
 
 @pytest.fixture
@@ -240,7 +250,10 @@ class TestCreateNotionReportPage:
     ):
         """記事データを含むNotionページが正常に作成される場合のテスト"""
         expected_url = "https://notion.so/test_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # cover_image_urlを明示的に渡すように修正
         result = create_notion_report_page(
@@ -266,34 +279,41 @@ class TestCreateNotionReportPage:
             kwargs["cover"]["external"]["url"] == "https://example.com/mock_cover.jpg"
         )
 
-        # 子要素の構成を確認 (一部抜粋)
+        # ページ作成時は導入文と区切り線のみ
         children = kwargs["children"]
-        assert len(children) > 0
+        assert len(children) == 2
         assert (
             children[0]["paragraph"]["rich_text"][0]["text"]["content"]
             == "データサイエンス、データエンジニアリング、データ分析の学習者向けに、AIの最新ニュースを毎日お届けします。"
         )
-        assert any(
-            c.get("heading_2", {})
-            .get("rich_text", [{}])[0]
-            .get("text", {})
-            .get("content")
-            == "【テクノロジー】"
-            for c in children
-        )
-        assert any(
-            c.get("heading_3", {})
-            .get("rich_text", [{}])[0]
-            .get("text", {})
-            .get("content")
+
+        # カテゴリごとのトグル見出しが記事ブロックを含んで追加される
+        mock_notion_client.blocks.children.append.assert_called_once()
+        append_kwargs = mock_notion_client.blocks.children.append.call_args.kwargs
+        assert append_kwargs["block_id"] == "test_page_id"
+        headings = [
+            c["heading_2"]
+            for c in append_kwargs["children"]
+            if c["type"] == "heading_2"
+        ]
+        assert [h["rich_text"][0]["text"]["content"] for h in headings] == [
+            "【テクノロジー】",
+            "【AI】",
+            "【データサイエンス】",
+        ]
+        assert all(h["is_toggleable"] for h in headings)
+        assert (
+            headings[0]["children"][0]["heading_3"]["rich_text"][0]["text"]["content"]
             == "量子コンピューティングの進展"
-            for c in children
         )
 
     def test_create_page_success_empty_articles(self, mock_notion_client):
         """記事データが空の場合でもNotionページが正常に作成される場合のテスト"""
         expected_url = "https://notion.so/test_empty_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # cover_image_url=Noneを明示的に渡す
         result = create_notion_report_page(mock_notion_client, [], cover_image_url=None)
@@ -318,7 +338,10 @@ class TestCreateNotionReportPage:
     ):
         """記事データにimage_urlがない場合のテスト (cover_image_url=Noneで呼び出す)"""
         expected_url = "https://notion.so/test_no_image_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # 最初の記事のimage_urlをNoneに設定し直す (このテストでは不要になるが、fixtureの整合性のため残す)
         articles_no_image = sample_processed_articles.copy()
@@ -341,7 +364,10 @@ class TestCreateNotionReportPage:
     ):
         """記事データにimage_urlキー自体がない場合のテスト (cover_image_url=Noneで呼び出す)"""
         expected_url = "https://notion.so/test_no_image_key_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # cover_image_url=Noneを明示的に渡す
         result = create_notion_report_page(
@@ -362,7 +388,10 @@ class TestCreateNotionReportPage:
     ):
         """記事データにimage_urlが空文字列の場合のテスト (cover_image_url=Noneで呼び出す)"""
         expected_url = "https://notion.so/test_empty_image_url_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # cover_image_url=Noneを明示的に渡す
         result = create_notion_report_page(
@@ -383,7 +412,10 @@ class TestCreateNotionReportPage:
     ):
         """記事データにimage_urlが不正なURLの場合のテスト (cover_image_url=Noneで呼び出す)"""
         expected_url = "https://notion.so/test_invalid_image_url_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
 
         # cover_image_url=Noneを明示的に渡す
         result = create_notion_report_page(
@@ -402,7 +434,10 @@ class TestCreateNotionReportPage:
     def test_create_page_success_with_mocked_cover_image_url(self, mock_notion_client):
         """モックされた有効なcover_image_urlでNotionページが正常に作成される場合のテスト"""
         expected_url = "https://notion.so/test_mocked_cover_page_url"
-        mock_notion_client.pages.create.return_value = {"url": expected_url}
+        mock_notion_client.pages.create.return_value = {
+            "id": "test_page_id",
+            "url": expected_url,
+        }
         mock_cover_url = "https://unsplash.com/photos/mock_image.jpg"
 
         result = create_notion_report_page(
@@ -457,3 +492,311 @@ class TestCreateNotionReportPage:
             mock_notion_client, sample_processed_articles, cover_image_url=None
         )
         assert result is None
+
+
+def _api_error(code, message, status=400):
+    return APIResponseError(
+        code=code,
+        status=status,
+        message=message,
+        headers=httpx.Headers(),
+        raw_body_text="",
+    )
+
+
+@pytest.fixture
+def valid_database(mock_notion_client):
+    mock_notion_client.databases.retrieve.return_value = {
+        "properties": {
+            PROP_NAME: {"type": "title"},
+            PROP_DATE: {"type": "date"},
+            PROP_STATUS: {
+                "type": "status",
+                "status": {"options": [{"name": "Published", "color": "green"}]},
+            },
+            PROP_ABSTRACT: {"type": "rich_text"},
+            PROP_URL: {"type": "url"},
+        }
+    }
+    mock_notion_client.pages.create.return_value = {
+        "id": "test_page_id",
+        "url": "http://notion.so/page",
+    }
+    return mock_notion_client
+
+
+# スキーマ検証結果のキャッシュのテスト
+class TestNotionSchemaCache:
+    def test_verified_schema_skips_retrieve(self, valid_database):
+        """検証済みのスキーマはTTL以内であれば再確認されないことをテスト"""
+        assert ensure_notion_database_properties(valid_database, "test_database_id")
+        assert ensure_notion_database_properties(valid_database, "test_database_id")
+        valid_database.databases.retrieve.assert_called_once()
+
+    def test_expired_or_disabled_cache_retrieves_again(
+        self, valid_database, monkeypatch
+    ):
+        """TTLが0の場合は毎回スキーマを確認することをテスト"""
+        monkeypatch.setenv("NOTION_SCHEMA_CACHE_TTL_HOURS", "0")
+        ensure_notion_database_properties(valid_database, "test_database_id")
+        ensure_notion_database_properties(valid_database, "test_database_id")
+        assert valid_database.databases.retrieve.call_count == 2
+
+    def test_cache_is_keyed_by_database_id(self, valid_database):
+        """別のデータベースIDではキャッシュが使われないことをテスト"""
+        ensure_notion_database_properties(valid_database, "test_database_id")
+        ensure_notion_database_properties(valid_database, "other_database_id")
+        invalidate_schema_cache("test_database_id")
+        ensure_notion_database_properties(valid_database, "test_database_id")
+        assert valid_database.databases.retrieve.call_count == 3
+
+    def test_failed_validation_is_not_cached(self, valid_database):
+        """型の不一致で検証に失敗した場合はキャッシュされないことをテスト"""
+        valid_database.databases.retrieve.return_value["properties"][PROP_DATE] = {
+            "type": "rich_text"
+        }
+        assert not ensure_notion_database_properties(valid_database, "test_database_id")
+        assert not ensure_notion_database_properties(valid_database, "test_database_id")
+        assert valid_database.databases.retrieve.call_count == 2
+
+    def test_schema_error_on_create_revalidates_and_retries_once(
+        self, valid_database, sample_processed_articles
+    ):
+        """ページ作成がスキーマエラーで失敗した場合、再検証して1度だけ再試行することをテスト"""
+        ensure_notion_database_properties(valid_database, "test_database_id")
+        valid_database.pages.create.side_effect = [
+            _api_error("validation_error", "Status is not a property that exists."),
+            {"id": "test_page_id", "url": "http://notion.so/page"},
+        ]
+        result = create_notion_report_page(valid_database, sample_processed_articles)
+        assert result == "http://notion.so/page"
+        assert valid_database.pages.create.call_count == 2
+        assert valid_database.databases.retrieve.call_count == 2
+
+    def test_repeated_schema_error_gives_up(
+        self, valid_database, sample_processed_articles
+    ):
+        """再試行後もスキーマエラーの場合はNoneを返すことをテスト"""
+        valid_database.pages.create.side_effect = _api_error(
+            "validation_error", "Date is expected to be date."
+        )
+        result = create_notion_report_page(valid_database, sample_processed_articles)
+        assert result is None
+        assert valid_database.pages.create.call_count == 2
+
+    def test_is_schema_error(self):
+        """プロパティ不一致のエラーのみスキーマエラーと判定されることをテスト"""
+        assert is_schema_error(
+            _api_error("validation_error", "Name is not a property that exists.")
+        )
+        assert not is_schema_error(
+            _api_error("validation_error", "Invalid URL for cover image")
+        )
+        assert not is_schema_error(
+            _api_error("internal_server_error", "Date is expected to be date.", 500)
+        )
+
+
+# ブロックの分割追加のテスト
+class TestChunkedBlockAppend:
+    def test_split_text_respects_limit_and_surrogate_pairs(self):
+        """テキストが上限以下に分割され、絵文字が2文字として数えられることをテスト"""
+        assert split_text("") == [""]
+        assert split_text("a" * 4001) == ["a" * 2000, "a" * 2000, "a"]
+        assert split_text("ab\U0001f600c", limit=3) == ["ab", "\U0001f600c"]
+
+    def test_rich_text_splits_long_content_and_keeps_link(self):
+        """長いテキストが複数のrich_text要素に分割され、リンクが各要素に付くことをテスト"""
+        items = rich_text("x" * 4500, link="https://example.com")
+        assert [len(item["text"]["content"]) for item in items] == [2000, 2000, 500]
+        assert all(
+            item["text"]["link"] == {"url": "https://example.com"} for item in items
+        )
+
+    def test_chunk_blocks_limits_children_and_nested_total(self):
+        """子ブロック数100件、ネストを含む総数1000件の上限で分割されることをテスト"""
+        paragraph = {"object": "block", "type": "paragraph", "paragraph": {}}
+        assert [len(c) for c in chunk_blocks([paragraph] * 250)] == [100, 100, 50]
+
+        toggle = {
+            "type": "heading_2",
+            "heading_2": {"children": [paragraph] * 99},
+        }
+        assert [len(c) for c in chunk_blocks([toggle] * 25)] == [10, 10, 5]
+
+    def test_large_category_overflow_is_appended_to_toggle(self, mock_notion_client):
+        """1カテゴリの記事ブロックが100件を超える場合、残りがトグルに追加されることをテスト"""
+        mock_notion_client.pages.create.return_value = {
+            "id": "page",
+            "url": "http://notion.so/page",
+        }
+        mock_notion_client.blocks.children.append.side_effect = (
+            lambda block_id, children: {
+                "results": [{"id": f"{block_id}-{i}"} for i, _ in enumerate(children)]
+            }
+        )
+        articles = [
+            {"title": f"T{i}", "url": f"https://example.com/{i}", "summary": "S"}
+            for i in range(60)
+        ] + [{"title": "AI", "url": "https://example.com/ai", "category": "AI"}]
+        for article in articles[:60]:
+            article["category"] = "Big"
+
+        result = create_notion_report_page(mock_notion_client, articles)
+
+        assert result == "http://notion.so/page"
+        calls = mock_notion_client.blocks.children.append.call_args_list
+        first = calls[0].kwargs
+        assert first["block_id"] == "page"
+        assert len(first["children"][0]["heading_2"]["children"]) == NOTION_MAX_CHILDREN
+        overflow = calls[1].kwargs
+        assert overflow["block_id"] == "page-0"
+        assert len(overflow["children"]) == 120 - NOTION_MAX_CHILDREN
+
+
+class FakeNotion:
+    """ブロックの追加・削除・一覧取得を再現する、差分更新テスト用のNotionクライアント"""
+
+    def __init__(self):
+        self.children = {}
+        self.pages_by_date = {}
+        self.calls = []
+        self._next_id = 0
+        self.pages = SimpleNamespace(create=self._create_page, update=self._update)
+        self.blocks = SimpleNamespace(
+            delete=self._delete,
+            children=SimpleNamespace(append=self._append, list=self._list),
+        )
+
+    def _new_id(self):
+        self._next_id += 1
+        return f"block-{self._next_id}"
+
+    def _store(self, parent_id, blocks, index):
+        ids = []
+        for block in blocks:
+            block_type = block["type"]
+            content = dict(block[block_type])
+            children = content.pop("children", [])
+            stored = {
+                "id": self._new_id(),
+                "type": block_type,
+                block_type: content,
+                "has_children": bool(children),
+            }
+            self.children.setdefault(parent_id, []).insert(index, stored)
+            index += 1
+            self._store(stored["id"], children, 0)
+            ids.append({"id": stored["id"]})
+        return ids
+
+    def request(self, path, method, body):
+        self.calls.append(("query", body))
+        date = body["filter"]["date"]["equals"]
+        page = self.pages_by_date.get(date)
+        return {"results": [page] if page else []}
+
+    def _create_page(self, parent, properties, children, cover):
+        self.calls.append(("create",))
+        page = {"id": self._new_id(), "url": "http://notion.so/page", "cover": cover}
+        self.pages_by_date[properties[PROP_DATE]["date"]["start"]] = page
+        self._store(page["id"], children, 0)
+        return page
+
+    def _update(self, page_id, cover):
+        self.calls.append(("update", page_id))
+
+    def _append(self, block_id, children, after=None):
+        self.calls.append(("append", block_id, len(children)))
+        siblings = self.children.setdefault(block_id, [])
+        index = len(siblings)
+        if after:
+            index = [b["id"] for b in siblings].index(after) + 1
+        return {"results": self._store(block_id, children, index)}
+
+    def _list(self, block_id, page_size, start_cursor=None):
+        start = int(start_cursor or 0)
+        blocks = self.children.get(block_id, [])
+        return {
+            "results": blocks[start : start + page_size],
+            "has_more": start + page_size < len(blocks),
+            "next_cursor": str(start + page_size),
+        }
+
+    def _delete(self, block_id):
+        self.calls.append(("delete", block_id))
+        for siblings in self.children.values():
+            siblings[:] = [b for b in siblings if b["id"] != block_id]
+
+    def texts(self, block_id):
+        """子ブロックのテキストを、トグルの子も含めて順に返す"""
+        result = []
+        for block in self.children.get(block_id, []):
+            rich = block[block["type"]].get("rich_text", [])
+            result.append("".join(item["text"]["content"] for item in rich))
+            result.extend(f"  {text}" for text in self.texts(block["id"]))
+        return result
+
+
+# 同じ日付のページの差分更新のテスト
+class TestReportPageUpsert:
+    def _publish(self, notion, articles, cover=None):
+        result = create_notion_report_page(notion, articles, cover_image_url=cover)
+        page_id = notion.pages_by_date["2023-11-01"]["id"]
+        return result, page_id
+
+    def test_rerun_with_same_content_changes_nothing(self, sample_processed_articles):
+        """同じ内容で再実行した場合、ページを作成せずブロックも変更しないことをテスト"""
+        notion = FakeNotion()
+        _, page_id = self._publish(notion, sample_processed_articles)
+        before = notion.texts(page_id)
+        notion.calls.clear()
+
+        result, _ = self._publish(notion, sample_processed_articles)
+
+        assert result == "http://notion.so/page"
+        assert [call[0] for call in notion.calls] == ["query"]
+        assert notion.texts(page_id) == before
+
+    def test_changed_summary_replaces_only_that_block(self, sample_processed_articles):
+        """要約が変わった記事のブロックだけが置き換えられることをテスト"""
+        notion = FakeNotion()
+        _, page_id = self._publish(notion, sample_processed_articles)
+        notion.calls.clear()
+
+        sample_processed_articles[1]["summary"] = "更新された要約"
+        self._publish(notion, sample_processed_articles)
+
+        kinds = [call[0] for call in notion.calls]
+        assert "create" not in kinds
+        assert kinds.count("delete") == 1
+        assert [call for call in notion.calls if call[0] == "append"] == [
+            ("append", notion.children[page_id][4]["id"], 1)
+        ]
+        assert "  更新された要約" in notion.texts(page_id)
+        assert "  人工知能の発展に伴う倫理的課題に関する考察。" not in notion.texts(
+            page_id
+        )
+
+    def test_new_category_is_inserted_and_cover_updated(
+        self, sample_processed_articles
+    ):
+        """追加されたカテゴリのみが挿入され、カバー画像が変わった場合は更新されることをテスト"""
+        notion = FakeNotion()
+        _, page_id = self._publish(notion, sample_processed_articles[:2])
+        notion.calls.clear()
+
+        result, _ = self._publish(
+            notion, sample_processed_articles, cover="https://example.com/new.jpg"
+        )
+
+        assert result == "http://notion.so/page"
+        kinds = [call[0] for call in notion.calls]
+        assert kinds.count("update") == 1
+        assert "delete" not in kinds
+        assert kinds.count("append") == 1
+        assert notion.texts(page_id)[-4:-1] == [
+            "【データサイエンス】",
+            "  データプライバシーの重要性",
+            "  データプライバシー保護の技術と法規制。",
+        ]